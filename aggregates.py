@@ -0,0 +1,321 @@
+"""
+Cached rollups of a predictions frame.
+
+Streamlit reruns every tab on each interaction, and the Predictions,
+Department and Visualization tabs and the reports all need the same
+department, job-title and risk-bucket rollups. They are computed once per
+predictions frame, keyed by a content fingerprint, and served from an LRU
+cache shared by all sessions of the server process.
+
+The fingerprint covers the columns the rollups are built from (the named
+columns below and every numeric column), plus the frame's shape, column
+names and dtypes. It is memoized per frame object, so a frame must not be
+modified in place after its first rollup.
+
+Cached frames and arrays are shared between callers and must be treated
+as read-only.
+"""
+import hashlib
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from utils.utils import RISK_LEVELS, calculate_department_metrics_table
+
+# Limit, overridable through the environment
+MAX_ENTRIES = int(os.environ.get('HR_AGGREGATE_CACHE_ENTRIES', 256))
+
+# Columns hashed into the fingerprint, besides every numeric column
+# (risk_profile and the clusters may read any of them)
+FINGERPRINT_COLUMNS = [
+    'Employee_ID', 'Department', 'Job_Title', 'Turnover_Probability', 'Risk_Category',
+    'Years_At_Company', 'Performance_Score', 'Monthly_Salary', 'Work_Hours_Per_Week'
+]
+
+class AggregateCache:
+    """
+    Thread-safe LRU cache of computed rollups.
+    """
+    
+    def __init__(self, max_entries=MAX_ENTRIES):
+        """
+        Initialize the cache
+        
+        Args:
+            max_entries (int): Maximum number of cached rollups
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get_or_compute(self, key, compute):
+        """
+        Return a cached rollup, computing and storing it on a miss.
+        
+        Args:
+            key: Hashable cache key
+            compute: Callable without arguments that builds the rollup
+        
+        Returns:
+            The cached or freshly computed value
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        
+        # Computed outside the lock so other sessions are not blocked
+        value = compute()
+        
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        
+        return value
+    
+    def clear(self):
+        """
+        Remove every cached rollup.
+        """
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self):
+        """
+        Report cache usage.
+        
+        Returns:
+            Dictionary with entry count, hits and misses
+        """
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+# Shared by all sessions of the server process
+aggregate_cache = AggregateCache()
+
+# Fingerprints memoized per frame object: id -> (weak reference, fingerprint)
+_fingerprints = {}
+
+def predictions_fingerprint(predictions):
+    """
+    Compute a content fingerprint of a predictions frame.
+    
+    Args:
+        predictions: DataFrame with predictions
+    
+    Returns:
+        Hex digest identifying the frame's contents
+    """
+    key = id(predictions)
+    entry = _fingerprints.get(key)
+    if entry is not None and entry[0]() is predictions:
+        return entry[1]
+    
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((predictions.shape, list(predictions.columns),
+                        [str(dtype) for dtype in predictions.dtypes])).encode())
+    
+    columns = [col for col in FINGERPRINT_COLUMNS if col in predictions.columns]
+    columns += [col for col in predictions.select_dtypes(include='number').columns if col not in columns]
+    if columns and len(predictions):
+        digest.update(pd.util.hash_pandas_object(predictions[columns], index=False).to_numpy().tobytes())
+    
+    fingerprint = digest.hexdigest()
+    _fingerprints[key] = (weakref.ref(predictions, lambda _, key=key: _fingerprints.pop(key, None)), fingerprint)
+    
+    return fingerprint
+
+def _cached(predictions, name, compute, *args):
+    """
+    Serve a rollup of a predictions frame from the shared cache.
+    """
+    return aggregate_cache.get_or_compute((predictions_fingerprint(predictions), name) + args, compute)
+
+def risk_counts(predictions):
+    """
+    Count employees per risk category.
+    
+    Args:
+        predictions: DataFrame with predictions
+    
+    Returns:
+        Series of counts indexed by 'Low', 'Medium' and 'High'
+    """
+    return _cached(predictions, 'risk_counts', lambda: (
+        predictions['Risk_Category'].value_counts().reindex(RISK_LEVELS, fill_value=0).astype(int)
+    ))
+
+def risk_profile(predictions):
+    """
+    Average every numeric column per risk category.
+    
+    Args:
+        predictions: DataFrame with predictions
+    
+    Returns:
+        DataFrame indexed by risk category with one column per numeric feature
+    """
+    def compute():
+        numeric = predictions.select_dtypes(include='number')
+        return numeric.groupby(predictions['Risk_Category'].astype(str)).mean().reindex(RISK_LEVELS)
+    
+    return _cached(predictions, 'risk_profile', compute)
+
+def department_summary(predictions):
+    """
+    Metrics for every department (see calculate_department_metrics_table).
+    
+    Args:
+        predictions: DataFrame with predictions
+    
+    Returns:
+        DataFrame with one row per department
+    """
+    return _cached(predictions, 'department_summary', lambda: calculate_department_metrics_table(predictions))
+
+def department_metrics(predictions, department):
+    """
+    Metrics for one department, in the format of calculate_department_metrics.
+    
+    Args:
+        predictions: DataFrame with predictions
+        department: Department name
+    
+    Returns:
+        Dictionary with department metrics, or None if the department is absent
+    """
+    summary = department_summary(predictions)
+    rows = summary[summary['Department'] == department]
+    
+    return rows.iloc[0].drop('Department').to_dict() if len(rows) else None
+
+def department_positions(predictions):
+    """
+    Row positions of each department's employees.
+    
+    Args:
+        predictions: DataFrame with predictions
+    
+    Returns:
+        Dictionary mapping department name to an array of row positions
+    """
+    return _cached(predictions, 'department_positions', lambda: {
+        department: positions
+        for department, positions in predictions.groupby('Department', observed=True, sort=False).indices.items()
+    })
+
+def department_rows(predictions, department):
+    """
+    Rows of one department, without scanning the whole frame.
+    
+    Args:
+        predictions: DataFrame with predictions
+        department: Department name
+    
+    Returns:
+        DataFrame with the department's employees
+    """
+    positions = department_positions(predictions).get(department, np.empty(0, dtype=np.intp))
+    
+    return predictions.take(positions)
+
+def department_job_summary(predictions):
+    """
+    Average turnover probability and headcount per department and job title.
+    
+    Args:
+        predictions: DataFrame with predictions
+    
+    Returns:
+        DataFrame with Department, Job_Title, Turnover_Probability and Employee_Count
+    """
+    def compute():
+        grouped = predictions.groupby(['Department', 'Job_Title'], observed=True)['Turnover_Probability']
+        summary = grouped.agg(['mean', 'size']).reset_index()
+        summary.columns = ['Department', 'Job_Title', 'Turnover_Probability', 'Employee_Count']
+        return summary
+    
+    return _cached(predictions, 'department_job_summary', compute)
+
+def job_title_summary(predictions):
+    """
+    Average turnover probability and headcount per job title.
+    
+    Args:
+        predictions: DataFrame with predictions
+    
+    Returns:
+        DataFrame with Job_Title, Turnover_Probability and Employee_Count
+    """
+    def compute():
+        grouped = predictions.groupby('Job_Title', observed=True)
+        summary = grouped.agg(Turnover_Probability=('Turnover_Probability', 'mean'),
+                              Employee_Count=('Employee_ID', 'count')).reset_index()
+        return summary
+    
+    return _cached(predictions, 'job_title_summary', compute)
+
+def job_title_risk(predictions, department=None):
+    """
+    Average turnover probability per job title, highest first.
+    
+    Args:
+        predictions: DataFrame with predictions
+        department: Restrict to one department (all departments if None)
+    
+    Returns:
+        DataFrame with Job_Title and Turnover_Probability
+    """
+    if department is None:
+        summary = job_title_summary(predictions)
+    else:
+        summary = department_job_summary(predictions)
+        summary = summary[summary['Department'] == department]
+    
+    return (summary[['Job_Title', 'Turnover_Probability']]
+            .sort_values('Turnover_Probability', ascending=False)
+            .reset_index(drop=True))
+
+def high_risk_positions(predictions):
+    """
+    Row positions of high-risk employees, highest probability first.
+    
+    Args:
+        predictions: DataFrame with predictions
+    
+    Returns:
+        Array of row positions
+    """
+    def compute():
+        positions = np.flatnonzero((predictions['Risk_Category'] == 'High').to_numpy())
+        probabilities = predictions['Turnover_Probability'].to_numpy()[positions]
+        return positions[np.argsort(-probabilities, kind='stable')]
+    
+    return _cached(predictions, 'high_risk_positions', compute)
+
+def high_risk_employees(predictions, department=None):
+    """
+    High-risk employees sorted by turnover probability, highest first.
+    
+    Args:
+        predictions: DataFrame with predictions
+        department: Restrict to one department (all departments if None)
+    
+    Returns:
+        DataFrame with the high-risk employees
+    """
+    rows = predictions.take(high_risk_positions(predictions))
+    if department is not None:
+        rows = rows[rows['Department'] == department]
+    
+    return rows
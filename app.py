@@ -9,21 +9,35 @@ import matplotlib.pyplot as plt
 from datetime import datetime
 
 # Import custom modules
-from data_processing import preprocess_data, split_data, feature_importance, calculate_years_at_company
-from models import train_model, evaluate_model, predict_turnover
+from data_processing import split_data, feature_importance, calculate_years_at_company
+from models import (MODEL_TYPES, train_model, train_all_models, evaluate_model, predict_turnover_incremental,
+                    start_explaining_turnover)
+from utils.data_processor import (load_data, optimize_dtypes, frame_memory_mb, thin_predictions, join_predictions,
+                                  MissingColumnsError)
+from utils.recommender import RecommendationGenerator
 from visualizations import (plot_department_turnover, plot_feature_importance, 
-                            plot_employee_analysis, plot_risk_distribution, plot_shap_values)
+                            plot_employee_analysis, plot_risk_distribution, plot_contributions)
+from explanations import ExplanationIndex
+from clustering import (quadrant_clusters, kmeans_clusters, cluster_stats, cluster_examples,
+                        plot_positions)
+from prediction_table import PAGE_SIZES, count_matching, prediction_page
 from recommendations import generate_recommendations
-from utils.utils import assign_risk_category, calculate_department_metrics, format_feature_name
+from utils.utils import assign_risk_categories, format_feature_name
 
 # Utility functions now moved to utils/utils.py
-from database import (save_session, load_sessions, load_session_data, create_tables,
+from database import (save_session, load_sessions, load_session_data, load_session_frame, create_tables,
                      delete_session, save_trained_model, load_trained_models, 
-                     load_trained_model, delete_trained_model, get_latest_model_by_type)
+                     load_trained_model, load_model_metrics, delete_trained_model, get_latest_model_by_type,
+                     get_latest_prediction_session_id, get_trained_model_hash, save_trained_models)
 from translations import translations
 # Import Anthropic helper for AI-powered recommendations
 from anthropic_helper import generate_ai_recommendations, analyze_department_trends
-from pdf_generator import generate_pdf_report
+from pdf_generator import start_pdf_report
+from report_generator import generate_printable_report
+from preprocess_cache import cached_preprocess_data
+from tuning import MAX_TUNING_ROWS, tune_model, save_tuned_model
+from aggregates import (risk_counts, risk_profile, department_summary, department_metrics,
+                        department_rows, job_title_risk, high_risk_employees)
 from translations import translations
 
 # Set page config
@@ -34,795 +48,132 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Helper function to generate printable HTML report
-def generate_printable_report(predictions, is_individual=False, employee_id=None, department=None, lang='ar'):
-    t = lambda key: translations.get(key, {}).get(lang, key)
+# Predictions are kept thin in session state (Employee_ID plus the model
+# outputs) and joined back to the uploaded data when the full frame is needed
+def get_predictions():
+    """Return the current predictions joined with the uploaded data"""
+    data = st.session_state.get('data')
+    predictions = st.session_state.get('predictions')
+    if predictions is None:
+        return None
     
-    # Enhanced CSS for better printing experience
-    css = """
-    <style>
-        body {
-            font-family: 'Arial', 'Helvetica', sans-serif;
-            line-height: 1.6;
-            margin: 20px;
-            direction: rtl;
-            background-color: #ffffff;
-            color: #333333;
-        }
-        .header {
-            text-align: center;
-            margin-bottom: 30px;
-            border-bottom: 2px solid #333;
-            padding-bottom: 10px;
-            position: relative;
-        }
-        .header::before {
-            content: "";
-            position: absolute;
-            bottom: -2px;
-            right: 0;
-            left: 0;
-            height: 2px;
-            background: linear-gradient(to left, #3498db, #2ecc71);
-        }
-        h1 {
-            color: #2c3e50;
-            margin-bottom: 10px;
-        }
-        h2 {
-            color: #3498db;
-            border-bottom: 1px solid #eee;
-            padding-bottom: 5px;
-            margin-top: 30px;
-            page-break-after: avoid;
-        }
-        h3 {
-            color: #34495e;
-            margin-top: 20px;
-            page-break-after: avoid;
-        }
-        h4 {
-            color: #2980b9;
-            margin-top: 15px;
-            page-break-after: avoid;
-        }
-        p {
-            margin-bottom: 15px;
-        }
-        table {
-            width: 100%;
-            border-collapse: collapse;
-            margin: 20px 0;
-            page-break-inside: avoid;
-        }
-        th, td {
-            padding: 10px;
-            border: 1px solid #ddd;
-            text-align: right;
-        }
-        th {
-            background-color: #f2f2f2;
-            font-weight: bold;
-        }
-        tr {
-            page-break-inside: avoid;
-        }
-        .risk-high {
-            background-color: #ffcccc;
-            color: #cc0000;
-            font-weight: bold;
-        }
-        .risk-medium {
-            background-color: #fff4cc;
-            color: #cc7a00;
-        }
-        .risk-low {
-            background-color: #ccffcc;
-            color: #006600;
-        }
-        .metrics {
-            display: flex;
-            justify-content: space-between;
-            flex-wrap: wrap;
-            margin-bottom: 20px;
-            page-break-inside: avoid;
-        }
-        .metric-box {
-            width: 22%;
-            padding: 15px;
-            background-color: #f8f9fa;
-            border-radius: 5px;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            margin-bottom: 15px;
-            text-align: center;
-        }
-        .metric-value {
-            font-size: 24px;
-            font-weight: bold;
-            margin: 10px 0;
-            color: #2980b9;
-        }
-        .reason {
-            background-color: #f9f9f9;
-            border-right: 4px solid #e74c3c;
-            padding: 10px 15px;
-            margin-bottom: 15px;
-            border-radius: 5px;
-            page-break-inside: avoid;
-        }
-        ul, ol {
-            padding-right: 20px;
-            margin-bottom: 20px;
-        }
-        li {
-            margin-bottom: 8px;
-        }
-        .print-button {
-            background-color: #3498db;
-            color: white;
-            border: none;
-            padding: 10px 20px;
-            border-radius: 5px;
-            cursor: pointer;
-            font-size: 16px;
-            margin-bottom: 20px;
-        }
-        .print-button:hover {
-            background-color: #2980b9;
-        }
-        .print-only {
-            display: none;
-        }
-        
-        /* Page break controls */
-        .page-break {
-            page-break-after: always;
-            height: 0;
-            margin: 0;
-            padding: 0;
-        }
-        
-        /* Print-specific styles */
-        @media print {
-            @page {
-                size: A4;
-                margin: 1.5cm;
-            }
-            html, body {
-                width: 210mm;
-                height: 297mm;
-            }
-            .no-print {
-                display: none !important;
-            }
-            .print-only {
-                display: block;
-            }
-            body {
-                margin: 0;
-                padding: 15px;
-                font-size: 12pt;
-            }
-            .header {
-                position: running(header);
-            }
-            .metric-box {
-                box-shadow: none;
-                border: 1px solid #ddd;
-                break-inside: avoid;
-            }
-            h1 { font-size: 22pt; }
-            h2 { font-size: 18pt; }
-            h3 { font-size: 15pt; }
-            h4 { font-size: 13pt; }
-            
-            /* Guarantee that certain elements stay together */
-            h1, h2, h3, h4, h5, h6 {
-                page-break-after: avoid;
-            }
-            h1 + *, h2 + *, h3 + * {
-                page-break-before: avoid;
-            }
-            table, figure, .metrics, .reason {
-                page-break-inside: avoid;
-            }
-            
-            /* Display URLs after links in printed version */
-            a::after {
-                content: " (" attr(href) ")";
-                font-size: 90%;
-                color: #333;
-            }
-        }
-    </style>
-    """
+    # Reuse the joined frame across reruns so cached rollups keep their key
+    cached = st.session_state.get('_joined_predictions')
+    if cached is not None and cached[0] is data and cached[1] is predictions:
+        return cached[2]
     
-    # Improved print button with better styling and multiple browser support
-    print_button = """
-    <button class="print-button no-print" 
-            style="background: #4CAF50; 
-                   color: white; 
-                   font-size: 18px; 
-                   padding: 10px 20px; 
-                   cursor: pointer; 
-                   border: none; 
-                   border-radius: 4px; 
-                   margin: 20px 0; 
-                   display: block;">طباعة التقرير</button>
-    <script>
-        // Function to handle print button click with better cross-browser support
-        function printReport() {
-            // For most modern browsers
-            if (window.print) {
-                // Give the browser a moment to render everything properly
-                setTimeout(function() {
-                    window.print();
-                }, 300);
-            } else {
-                // Fallback message for very old browsers
-                alert("عفواً، متصفحك لا يدعم وظيفة الطباعة. يرجى تحديث المتصفح أو استخدام متصفح آخر.");
-            }
-        }
-        
-        // Immediately attach event handlers when script loads
-        (function() {
-            // Multiple approaches to ensure button works
-            var printButton = document.querySelector('.print-button');
-            if (printButton) {
-                // Modern event listener
-                printButton.addEventListener('click', printReport);
-                // Also set the onclick property for older browsers
-                printButton.onclick = printReport;
-            }
-            
-            // Add keyboard shortcut (Ctrl+P) in case button fails
-            document.addEventListener('keydown', function(e) {
-                if ((e.ctrlKey || e.metaKey) && e.key === 'p') {
-                    // Let browser handle the print dialog
-                    console.log('Print shortcut detected');
-                }
-            });
-            
-            // Auto-trigger print dialog after 2 seconds for convenience
-            setTimeout(function() {
-                var printButton = document.querySelector('.print-button');
-                if (printButton) {
-                    // Make button pulse to attract attention
-                    printButton.style.animation = 'pulse 1.5s infinite';
-                    printButton.style.webkitAnimation = 'pulse 1.5s infinite';
-                }
-            }, 1000);
-        })();
-    </script>
-    <style>
-        @keyframes pulse {
-            0% { transform: scale(1); }
-            50% { transform: scale(1.05); }
-            100% { transform: scale(1); }
-        }
-        @-webkit-keyframes pulse {
-            0% { -webkit-transform: scale(1); }
-            50% { -webkit-transform: scale(1.05); }
-            100% { -webkit-transform: scale(1); }
-        }
-    </style>
-    """
+    joined = join_predictions(data, predictions)
+    st.session_state['_joined_predictions'] = (data, predictions, joined)
+    return joined
+
+# Seconds between checks of the background explanation job
+EXPLANATION_POLL_SECONDS = 1.0
+
+def get_explanation_job():
+    """Return the background job explaining every employee for the current model and data"""
+    data = st.session_state.get('data')
+    model = st.session_state.get('model')
+    preprocessor = st.session_state.get('preprocessor')
+    if data is None or model is None or preprocessor is None:
+        return None
     
-    # Generate report content based on type
-    if is_individual and employee_id is not None:
-        # Individual employee report
-        employee = predictions[predictions['Employee_ID'] == employee_id].iloc[0]
-        
-        # Header
-        header = f"""
-        <div class="header">
-            <h1>تقرير مخاطر ترك العمل للموظف</h1>
-            <p><strong>تاريخ التقرير:</strong> {datetime.now().strftime('%Y-%m-%d')}</p>
-        </div>
-        """
-        
-        # Employee details
-        employee_details = f"""
-        <h2>معلومات الموظف</h2>
-        <div class="metrics">
-            <div class="metric-box">
-                <p>رقم الموظف</p>
-                <div class="metric-value">{employee['Employee_ID']}</div>
-            </div>
-            <div class="metric-box">
-                <p>المسمى الوظيفي</p>
-                <div class="metric-value">{employee['Job_Title']}</div>
-            </div>
-            <div class="metric-box">
-                <p>القسم</p>
-                <div class="metric-value">{employee['Department']}</div>
-            </div>
-            <div class="metric-box">
-                <p>سنوات الخدمة</p>
-                <div class="metric-value">{employee['Years_At_Company']:.1f}</div>
-            </div>
-        </div>
-        """
-        
-        # Risk assessment
-        risk_color = {
-            'High': '#cc0000',
-            'Medium': '#cc7a00',
-            'Low': '#006600'
-        }
-        
-        risk_assessment = f"""
-        <h2>تقييم مخاطر ترك العمل</h2>
-        <div style="text-align: center; padding: 20px; background-color: #f9f9f9; border-radius: 10px; margin-bottom: 30px;">
-            <h3>احتمالية ترك العمل</h3>
-            <div style="font-size: 36px; font-weight: bold; margin: 20px 0; color: {risk_color[employee['Risk_Category']]};">
-                {employee['Turnover_Probability']:.1%}
-            </div>
-            <h3>مستوى المخاطرة</h3>
-            <div style="font-size: 24px; font-weight: bold; color: {risk_color[employee['Risk_Category']]};">
-                {employee['Risk_Category']}
-            </div>
-        </div>
-        """
-        
-        # Potential resignation reasons based on employee data
-        reasons_section = """
-        <h2>الأسباب المحتملة للاستقالة</h2>
-        <div style="padding: 15px; background-color: #f5f5f5; border-radius: 5px; margin-bottom: 20px;">
-        """
-        
-        # Analyze employee data to determine potential reasons
-        reasons = []
-        
-        # Salary-related reasons
-        if 'Monthly_Salary' in employee and employee['Performance_Score'] > 3 and employee['Monthly_Salary'] < 10000:
-            reasons.append("""
-            <div class="reason">
-                <h4>العوامل المالية والمرتبات</h4>
-                <p>راتب الموظف أقل من المستوى المتوقع مقارنة بأدائه العالي، مما قد يؤدي إلى شعوره بعدم التقدير المالي لمساهماته.</p>
-            </div>
-            """)
-            
-        # Work hours related reasons
-        if 'Work_Hours_Per_Week' in employee and employee['Work_Hours_Per_Week'] > 45:
-            reasons.append("""
-            <div class="reason">
-                <h4>عبء العمل وساعات العمل</h4>
-                <p>يعمل الموظف ساعات إضافية بشكل منتظم، مما قد يؤثر على توازن حياته المهنية والشخصية ويزيد من مستوى الإجهاد.</p>
-            </div>
-            """)
-            
-        # Career growth concerns
-        if 'Years_At_Company' in employee and employee['Years_At_Company'] > 3 and employee['Performance_Score'] > 3:
-            reasons.append("""
-            <div class="reason">
-                <h4>فرص التطور المهني</h4>
-                <p>الموظف لديه أداء مرتفع وخدمة طويلة في الشركة ولكن قد يشعر بتوقف مساره الوظيفي أو محدودية فرص الترقية.</p>
-            </div>
-            """)
-            
-        # Department specific concerns
-        if 'Department' in employee:
-            if employee['Department'] == 'Sales':
-                reasons.append("""
-                <div class="reason">
-                    <h4>ضغوط العمل في قسم المبيعات</h4>
-                    <p>الموظفون في قسم المبيعات يعانون من ضغوط مستمرة لتحقيق الأهداف، مما قد يؤدي إلى الإرهاق وانخفاض الرضا الوظيفي.</p>
-                </div>
-                """)
-            elif employee['Department'] == 'IT' or employee['Department'] == 'Technology':
-                reasons.append("""
-                <div class="reason">
-                    <h4>تنافسية سوق العمل التقني</h4>
-                    <p>خبراء التكنولوجيا مطلوبون بشدة في سوق العمل، مما يعرضهم لفرص خارجية أفضل من حيث الراتب والمزايا.</p>
-                </div>
-                """)
-            elif employee['Department'] == 'HR' or employee['Department'] == 'Human Resources':
-                reasons.append("""
-                <div class="reason">
-                    <h4>التحديات المتعلقة بإدارة الموارد البشرية</h4>
-                    <p>قد يواجه موظفو الموارد البشرية تحديات في التعامل مع ضغوط ومتطلبات مختلف الإدارات، مما يزيد العبء عليهم.</p>
-                </div>
-                """)
-        
-        # Add more generic reasons if we haven't found specific ones
-        if len(reasons) < 2:
-            if employee['Risk_Category'] == 'High':
-                reasons.append("""
-                <div class="reason">
-                    <h4>عدم الرضا الوظيفي</h4>
-                    <p>قد يعاني الموظف من عدم الرضا عن بيئة العمل أو ثقافة الشركة أو أسلوب الإدارة.</p>
-                </div>
-                """)
-                reasons.append("""
-                <div class="reason">
-                    <h4>فرص سوق العمل</h4>
-                    <p>توفر فرص مهنية أفضل في سوق العمل من حيث التعويضات أو المسار المهني أو بيئة العمل.</p>
-                </div>
-                """)
-        
-        # Complete reasons section
-        for reason in reasons:
-            reasons_section += reason
-            
-        reasons_section += "</div>"
-        
-        # Personalized recommendations
-        recommendations = """
-        <h2>التوصيات المخصصة للاحتفاظ بالموظف</h2>
-        """
-        
-        # Add personalized recommendations section
-        if employee['Risk_Category'] == 'High':
-            recommendations += """
-            <div style="padding: 15px; background-color: #ffeeee; border-radius: 5px; margin-bottom: 15px;">
-                <h3>خطة احتفاظ عاجلة</h3>
-                <p>هذا الموظف معرض بدرجة كبيرة لخطر الاستقالة ويتطلب اهتمامًا فوريًا واستراتيجية احتفاظ مخصصة.</p>
-            </div>
-            """
-        elif employee['Risk_Category'] == 'Medium':
-            recommendations += """
-            <div style="padding: 15px; background-color: #fff8ee; border-radius: 5px; margin-bottom: 15px;">
-                <h3>خطة احتفاظ متوسطة الأولوية</h3>
-                <p>هذا الموظف يحتاج إلى مراقبة وخطة تطوير مخصصة لتعزيز رضاه الوظيفي وتقليل احتمالية تركه للعمل.</p>
-            </div>
-            """
-        else:
-            recommendations += """
-            <div style="padding: 15px; background-color: #eeffee; border-radius: 5px; margin-bottom: 15px;">
-                <h3>خطة تطوير مستمرة</h3>
-                <p>مخاطر استقالة هذا الموظف منخفضة، ولكن يجب الاستمرار في خطط التطوير والتحفيز الروتينية.</p>
-            </div>
-            """
-            
-        recommendations += "<ul>"
-        
-        # Generate tailored recommendations based on employee data
-        rec_list = []
-        
-        # Add specific recommendations based on identified reasons
-        for reason in reasons:
-            if "العوامل المالية" in reason:
-                rec_list.append("إجراء مراجعة فورية للراتب وتعديله بما يتناسب مع أداء الموظف وقيمته في السوق")
-                rec_list.append("تقديم مكافآت مالية مرتبطة بالأداء ومزايا إضافية لتحسين التعويض الإجمالي")
-            
-            if "عبء العمل" in reason:
-                rec_list.append("مراجعة عبء العمل وتوزيع المهام بشكل أكثر توازناً")
-                rec_list.append("النظر في برامج العمل المرنة أو العمل عن بعد لتحسين التوازن بين الحياة المهنية والشخصية")
-            
-            if "فرص التطور" in reason:
-                rec_list.append("تطوير خطة مسار وظيفي واضحة مع خطوات الترقية المحتملة والمهارات المطلوبة")
-                rec_list.append("توفير فرص للتدريب وتطوير المهارات في مجالات جديدة لتوسيع آفاق التطور المهني")
-            
-            if "قسم المبيعات" in reason:
-                rec_list.append("مراجعة أهداف المبيعات لضمان واقعيتها وتحقيق التوازن بين التحدي وإمكانية الإنجاز")
-                rec_list.append("تطوير نظام دعم أفضل لفريق المبيعات وتحسين أدوات العمل")
-            
-            if "سوق العمل التقني" in reason:
-                rec_list.append("تحديث حزمة التعويضات والمزايا لتكون منافسة في سوق تكنولوجيا المعلومات")
-                rec_list.append("توفير فرص العمل على أحدث التقنيات والمشاريع المبتكرة للحفاظ على الاهتمام المهني")
-            
-            if "الموارد البشرية" in reason:
-                rec_list.append("تقديم الدعم الإضافي لفريق الموارد البشرية وتبسيط العمليات الإدارية")
-                rec_list.append("توفير فرص التدريب المتخصص في مجالات متقدمة من إدارة الموارد البشرية")
-        
-        # Add general recommendations if we don't have enough specific ones
-        if len(rec_list) < 3:
-            if employee['Risk_Category'] == 'High':
-                rec_list.append("إجراء مقابلة احتفاظ عاجلة مع الموظف للاستماع إلى مخاوفه واحتياجاته")
-                rec_list.append("تطوير حزمة تعويضات مخصصة تشمل مكافآت مالية ومزايا إضافية")
-                rec_list.append("تقديم فرص للعمل على مشاريع مهمة ومرئية تعزز من مكانة الموظف في المؤسسة")
-            elif employee['Risk_Category'] == 'Medium':
-                rec_list.append("جدولة مقابلات دورية للتطوير المهني ومتابعة رضا الموظف")
-                rec_list.append("تقديم فرص تدريبية وتطويرية تتماشى مع اهتمامات الموظف")
-            else:
-                rec_list.append("الحفاظ على التواصل المنتظم واستمرار برامج التطوير الحالية")
-        
-        # Add recommendations to HTML
-        for r in rec_list:
-            recommendations += f"<li>{r}</li>\n"
-        
-        recommendations += "</ul>"
-        
-        # Add action plan section
-        recommendations += """
-        <h3>خطة العمل المقترحة</h3>
-        <div style="padding: 15px; background-color: #f0f8ff; border-radius: 5px;">
-            <p><strong>الخطوات التالية:</strong></p>
-            <ol>
-                <li>جدولة اجتماع مباشر مع الموظف خلال الأسبوع القادم</li>
-                <li>مناقشة مسار التطور المهني وتوثيق أهداف الموظف</li>
-                <li>مراجعة حزمة التعويضات والمزايا مع الإدارة</li>
-                <li>تطوير خطة تطوير مهني مخصصة بالتعاون مع الموظف</li>
-                <li>جدولة متابعة دورية كل ثلاثة أشهر لقياس فعالية الخطة</li>
-            </ol>
-        </div>
-        """
-        
-        # Complete the report
-        report_html = f"{css}{header}{print_button}{employee_details}{risk_assessment}{reasons_section}{recommendations}"
-        
-    elif department is not None:
-        # Department level report
-        dept_data = predictions[predictions['Department'] == department]
-        dept_metrics = calculate_department_metrics(dept_data)
-        
-        # Header
-        header = f"""
-        <div class="header">
-            <h1>تقرير مخاطر ترك العمل للقسم</h1>
-            <p><strong>القسم:</strong> {department}</p>
-            <p><strong>تاريخ التقرير:</strong> {datetime.now().strftime('%Y-%m-%d')}</p>
-        </div>
-        """
-        
-        # Department metrics
-        dept_summary = f"""
-        <h2>ملخص القسم</h2>
-        <div class="metrics">
-            <div class="metric-box">
-                <p>عدد الموظفين</p>
-                <div class="metric-value">{dept_metrics['total_employees']}</div>
-            </div>
-            <div class="metric-box">
-                <p>نسبة المخاطر العالية</p>
-                <div class="metric-value">{dept_metrics['high_risk_percentage']:.1%}</div>
-            </div>
-            <div class="metric-box">
-                <p>متوسط احتمالية ترك العمل</p>
-                <div class="metric-value">{dept_metrics['avg_probability']:.2f}</div>
-            </div>
-            <div class="metric-box">
-                <p>متوسط سنوات الخدمة</p>
-                <div class="metric-value">{dept_metrics['avg_years']:.1f}</div>
-            </div>
-        </div>
-        """
-        
-        # High risk employees table
-        high_risk = dept_data[dept_data['Risk_Category'] == 'High'].sort_values(
-            'Turnover_Probability', ascending=False
-        )
-        
-        high_risk_table = """
-        <h2>الموظفون ذوو المخاطر العالية</h2>
-        """
-        
-        if len(high_risk) > 0:
-            table = """
-            <table>
-                <tr>
-                    <th>رقم الموظف</th>
-                    <th>المسمى الوظيفي</th>
-                    <th>احتمالية ترك العمل</th>
-                    <th>درجة الأداء</th>
-                    <th>سنوات الخدمة</th>
-                </tr>
-            """
-            
-            for _, row in high_risk.iterrows():
-                table += f"""
-                <tr class="risk-high">
-                    <td>{row['Employee_ID']}</td>
-                    <td>{row['Job_Title']}</td>
-                    <td>{row['Turnover_Probability']:.1%}</td>
-                    <td>{row['Performance_Score']}</td>
-                    <td>{row['Years_At_Company']:.1f}</td>
-                </tr>
-                """
-                
-            table += "</table>"
-            high_risk_table += table
-        else:
-            high_risk_table += "<p>لا يوجد موظفون ذوو مخاطر عالية في هذا القسم.</p>"
-        
-        # Job title risk section
-        job_risk = dept_data.groupby('Job_Title')['Turnover_Probability'].mean().reset_index()
-        job_risk = job_risk.sort_values('Turnover_Probability', ascending=False)
-        
-        job_risk_table = """
-        <h2>مخاطر ترك العمل حسب المسمى الوظيفي</h2>
-        <table>
-            <tr>
-                <th>المسمى الوظيفي</th>
-                <th>متوسط احتمالية ترك العمل</th>
-                <th>مستوى المخاطرة</th>
-            </tr>
-        """
-        
-        for _, row in job_risk.iterrows():
-            risk_level = assign_risk_category(row['Turnover_Probability'])
-            risk_class = f"risk-{risk_level.lower()}"
-            
-            job_risk_table += f"""
-            <tr class="{risk_class}">
-                <td>{row['Job_Title']}</td>
-                <td>{row['Turnover_Probability']:.1%}</td>
-                <td>{risk_level}</td>
-            </tr>
-            """
-        
-        job_risk_table += "</table>"
-        
-        # Recommendations
-        recommendations = """
-        <h2>توصيات للقسم</h2>
-        """
-        
-        if dept_metrics['high_risk_percentage'] > 0.3:
-            recommendations += """
-            <div style="padding: 15px; background-color: #ffcccc; border-radius: 5px;">
-                <h3>مخاطر عالية للقسم</h3>
-                <p>هذا القسم يواجه مخاطر عالية لترك الموظفين. يجب اتخاذ إجراءات فورية لتحسين الاحتفاظ بالموظفين.</p>
-            </div>
-            <ul>
-                <li>إجراء مراجعة شاملة لسياسات الرواتب والتعويضات في القسم</li>
-                <li>تقييم عبء العمل وتوازن الحياة المهنية للموظفين</li>
-                <li>تحسين برامج التطوير المهني وفرص الترقية</li>
-                <li>معالجة قضايا الثقافة التنظيمية والقيادة</li>
-                <li>تنفيذ برامج احتفاظ خاصة للموظفين ذوي المخاطر العالية</li>
-            </ul>
-            """
-        elif dept_metrics['high_risk_percentage'] > 0.15:
-            recommendations += """
-            <div style="padding: 15px; background-color: #fff4cc; border-radius: 5px;">
-                <h3>مخاطر متوسطة للقسم</h3>
-                <p>هذا القسم يواجه بعض المخاطر المتعلقة بترك الموظفين. هناك حاجة إلى تحسينات محددة.</p>
-            </div>
-            <ul>
-                <li>تحليل أسباب مخاطر ترك العمل بين المسميات الوظيفية المختلفة</li>
-                <li>تحسين برامج التقدير والمكافآت</li>
-                <li>تقديم فرص تدريبية إضافية وبرامج تطوير المهارات</li>
-                <li>تعزيز التواصل وجمع التغذية الراجعة من الموظفين</li>
-            </ul>
-            """
-        else:
-            recommendations += """
-            <div style="padding: 15px; background-color: #ccffcc; border-radius: 5px;">
-                <h3>مخاطر منخفضة للقسم</h3>
-                <p>هذا القسم يتمتع بمعدل احتفاظ جيد بالموظفين. استمر في الممارسات الحالية مع التحسين المستمر.</p>
-            </div>
-            <ul>
-                <li>الحفاظ على التواصل المنتظم مع الموظفين</li>
-                <li>الاستمرار في تقديم فرص النمو والتطوير</li>
-                <li>مشاركة أفضل الممارسات مع الأقسام الأخرى</li>
-            </ul>
-            """
-        
-        # Complete the report
-        report_html = f"{css}{header}{print_button}{dept_summary}{high_risk_table}{job_risk_table}{recommendations}"
-        
+    # Explain all employees once per model and dataset, off the script thread;
+    # later reruns pick the job up from session state
+    cached = st.session_state.get('_explanations')
+    if cached is not None and cached[0] is model and cached[1] is preprocessor and cached[2] is data:
+        return cached[3]
+    
+    job = start_explaining_turnover(data, model, preprocessor)
+    st.session_state['_explanations'] = (model, preprocessor, data, job)
+    return job
+
+def get_employee_contributions(data_row):
+    """Return one employee's row of the batch contributions (None until they are available)"""
+    job = get_explanation_job()
+    if job is None or not job.done() or job.exception() is not None or data_row < 0:
+        return None
+    
+    return job.result()[0][data_row]
+
+def show_explanation_status(polling):
+    """Show that the contributions are being computed, or why they are unavailable"""
+    job = get_explanation_job()
+    if job is None:
+        return
+    
+    if not job.done():
+        st.info("Computing feature contributions for all employees...")
+        return
+    
+    # Finished while this fragment was polling: rerun the page once to show them
+    if polling:
+        st.rerun()
+    
+    if job.exception() is not None:
+        st.warning(f"Could not compute feature contributions: {str(job.exception())}")
+
+def get_employee_index():
+    """Return the per-employee lookup of the current predictions and the matching data rows"""
+    predictions = get_predictions()
+    if predictions is None:
+        return None, None
+    
+    # Rebuild when the predictions change or their explanations become available
+    job = get_explanation_job()
+    explained = job is not None and job.done() and job.exception() is None
+    cached = st.session_state.get('_employee_index')
+    if cached is not None and cached[0] is predictions and cached[1] is job and cached[2] == explained:
+        return cached[3], cached[4]
+    
+    # Row of each prediction in the uploaded data (-1 when missing)
+    ids = predictions['Employee_ID'].to_numpy()
+    data_ids = st.session_state.data['Employee_ID'].to_numpy()
+    if len(data_ids) == len(ids) and np.array_equal(data_ids, ids):
+        data_rows = np.arange(len(ids))
     else:
-        # Overall report for all data
-        # Header
-        header = f"""
-        <div class="header">
-            <h1>تقرير تحليل مخاطر ترك العمل</h1>
-            <p><strong>تاريخ التقرير:</strong> {datetime.now().strftime('%Y-%m-%d')}</p>
-        </div>
-        """
-        
-        # Overall metrics
-        total_employees = len(predictions)
-        high_risk = len(predictions[predictions['Risk_Category'] == 'High'])
-        medium_risk = len(predictions[predictions['Risk_Category'] == 'Medium'])
-        low_risk = len(predictions[predictions['Risk_Category'] == 'Low'])
-        
-        overall_metrics = f"""
-        <h2>الملخص العام</h2>
-        <div class="metrics">
-            <div class="metric-box">
-                <p>إجمالي الموظفين</p>
-                <div class="metric-value">{total_employees}</div>
-            </div>
-            <div class="metric-box">
-                <p>موظفون بمخاطر عالية</p>
-                <div class="metric-value">{high_risk} ({high_risk/total_employees:.1%})</div>
-            </div>
-            <div class="metric-box">
-                <p>موظفون بمخاطر متوسطة</p>
-                <div class="metric-value">{medium_risk} ({medium_risk/total_employees:.1%})</div>
-            </div>
-            <div class="metric-box">
-                <p>موظفون بمخاطر منخفضة</p>
-                <div class="metric-value">{low_risk} ({low_risk/total_employees:.1%})</div>
-            </div>
-        </div>
-        """
-        
-        # Department breakdown
-        dept_breakdown = """
-        <h2>تحليل القسم</h2>
-        <table>
-            <tr>
-                <th>القسم</th>
-                <th>عدد الموظفين</th>
-                <th>نسبة المخاطر العالية</th>
-                <th>متوسط احتمالية ترك العمل</th>
-            </tr>
-        """
-        
-        for dept in predictions['Department'].unique():
-            dept_data = predictions[predictions['Department'] == dept]
-            total_dept = len(dept_data)
-            dept_high_risk = len(dept_data[dept_data['Risk_Category'] == 'High'])
-            dept_high_pct = dept_high_risk / total_dept if total_dept > 0 else 0
-            dept_avg_prob = dept_data['Turnover_Probability'].mean()
-            
-            risk_class = ""
-            if dept_high_pct > 0.3:
-                risk_class = "risk-high"
-            elif dept_high_pct > 0.15:
-                risk_class = "risk-medium"
-            else:
-                risk_class = "risk-low"
-            
-            dept_breakdown += f"""
-            <tr class="{risk_class}">
-                <td>{dept}</td>
-                <td>{total_dept}</td>
-                <td>{dept_high_pct:.1%}</td>
-                <td>{dept_avg_prob:.2f}</td>
-            </tr>
-            """
-        
-        dept_breakdown += "</table>"
-        
-        # Top high-risk employees
-        top_risk = predictions.sort_values('Turnover_Probability', ascending=False).head(10)
-        
-        top_risk_table = """
-        <h2>أعلى 10 موظفين من حيث مخاطر ترك العمل</h2>
-        <table>
-            <tr>
-                <th>رقم الموظف</th>
-                <th>القسم</th>
-                <th>المسمى الوظيفي</th>
-                <th>احتمالية ترك العمل</th>
-                <th>درجة الأداء</th>
-                <th>سنوات الخدمة</th>
-            </tr>
-        """
-        
-        for _, row in top_risk.iterrows():
-            risk_class = "risk-high" if row['Risk_Category'] == 'High' else "risk-medium"
-            top_risk_table += f"""
-            <tr class="{risk_class}">
-                <td>{row['Employee_ID']}</td>
-                <td>{row['Department']}</td>
-                <td>{row['Job_Title']}</td>
-                <td>{row['Turnover_Probability']:.1%}</td>
-                <td>{row['Performance_Score']}</td>
-                <td>{row['Years_At_Company']:.1f}</td>
-            </tr>
-            """
-            
-        top_risk_table += "</table>"
-        
-        # Summary
-        summary = """
-        <h2>ملخص وتوصيات</h2>
-        <p>
-            يقدم هذا التقرير تحليلاً شاملاً لمخاطر ترك العمل داخل المنظمة. 
-            الإجراءات الموصى بها تشمل:
-        </p>
-        <ul>
-            <li>إعطاء الأولوية للتدخلات في الأقسام ذات نسب المخاطر العالية</li>
-            <li>وضع خطط احتفاظ مخصصة للموظفين ذوي القيمة العالية والمخاطر العالية</li>
-            <li>معالجة العوامل الرئيسية المؤثرة على ترك العمل وفقًا لتحليل النظام</li>
-            <li>تنفيذ برامج تحسين مستمرة وجمع التغذية الراجعة من الموظفين</li>
-            <li>متابعة مقاييس الاحتفاظ بالموظفين بشكل دوري ومراجعة التقدم</li>
-        </ul>
-        """
-        
-        # Complete the report
-        report_html = f"{css}{header}{print_button}{overall_metrics}{dept_breakdown}{top_risk_table}{summary}"
+        first = ~pd.Index(data_ids).duplicated()
+        positions = pd.Index(data_ids[first]).get_indexer(ids)
+        data_rows = np.where(positions >= 0, np.flatnonzero(first)[positions], -1)
+    
+    # Every employee's top contributions, taken from the batch explanations
+    values = None
+    if explained:
+        values = job.result()[0][data_rows]
+        values[data_rows < 0] = 0.0
     
-    return report_html
+    index = ExplanationIndex(ids, predictions['Turnover_Probability'].to_numpy(), values,
+                             st.session_state.feature_names if explained else [])
+    st.session_state['_employee_index'] = (predictions, job, explained, index, data_rows)
+    return index, data_rows
+
+def set_session_model(model, preprocessor, feature_names, model_type, model_id=None):
+    """
+    Make a model the current model of this browser session.
+    
+    Args:
+        model: Trained model (None clears it)
+        preprocessor: Fitted preprocessor
+        feature_names: Feature names used during training
+        model_type: Type of model
+        model_id: Database ID of the model (None for a model that is not saved)
+    """
+    st.session_state.model = model
+    st.session_state.preprocessor = preprocessor
+    st.session_state.feature_names = feature_names
+    st.session_state.model_type = model_type
+    st.session_state.loaded_model_id = model_id
+    
+    # Prediction sessions record this hash, so their probabilities are only
+    # reused for exactly this model even if the ID is later overwritten
+    st.session_state.loaded_model_hash = get_trained_model_hash(model_id) if model_id is not None else None
 
 # Function to load the latest trained model automatically
 def load_latest_model_if_available():
     """Attempt to load the latest trained model from database if no model is already loaded"""
+    # Warm reruns keep the model already held by this browser session
+    if st.session_state.get('model') is not None:
+        return True
+    
     try:
         # Check for trained models
         trained_models = load_trained_models()
@@ -834,11 +185,7 @@ def load_latest_model_if_available():
                 model, preprocessor, feature_names, metrics, model_type = load_trained_model(model_id)
                 
                 # Save model in session state
-                st.session_state.model = model
-                st.session_state.preprocessor = preprocessor
-                st.session_state.feature_names = feature_names
-                st.session_state.model_type = model_type
-                st.session_state.loaded_model_id = model_id
+                set_session_model(model, preprocessor, feature_names, model_type, model_id)
                 
                 # Save metrics if available
                 if metrics:
@@ -856,11 +203,7 @@ def load_latest_model_if_available():
                         model, preprocessor, feature_names, _, model_type = load_trained_model(model_id)
                         
                         # Save fallback model in session state
-                        st.session_state.model = model
-                        st.session_state.preprocessor = preprocessor
-                        st.session_state.feature_names = feature_names
-                        st.session_state.model_type = model_type
-                        st.session_state.loaded_model_id = model_id
+                        set_session_model(model, preprocessor, feature_names, model_type, model_id)
                         
                         print(f"Fallback model loaded: {fallback_model[1]}")
                         return True
@@ -974,6 +317,32 @@ create_tables()
 def t(key):
     return translations.get(key, {}).get(st.session_state.language, key)
 
+# Seconds between progress updates of a PDF report being generated
+PDF_POLL_SECONDS = 0.5
+
+def show_pdf_report_status(predictions, polling):
+    """Show the progress of the background PDF report, then its download button"""
+    pdf_job = st.session_state.get('_pdf_job')
+    if pdf_job is None or pdf_job[0] is not predictions:
+        return
+    
+    job = pdf_job[1]
+    if not job.done():
+        st.progress(job.progress, text=t("generating_pdf"))
+        return
+    
+    # Finished while this fragment was polling: rerun the page once so polling stops
+    if polling:
+        st.rerun()
+    
+    st.download_button(
+        label=t("download_pdf"),
+        data=job.result(),
+        file_name=f"turnover_report_{datetime.now().strftime('%Y%m%d')}.pdf",
+        mime="application/pdf",
+        key="download_pdf_btn"
+    )
+
 # Sidebar for language selection and session management
 with st.sidebar:
     # Logo and title
@@ -1014,7 +383,7 @@ with st.sidebar:
             save_session(
                 session_name, 
                 st.session_state.data, 
-                st.session_state.predictions, 
+                get_predictions(), 
                 st.session_state.model,
                 st.session_state.preprocessor,
                 st.session_state.feature_names,
@@ -1059,18 +428,18 @@ with st.sidebar:
                     notes = None
                 
                 # Update session state
+                if data is not None:
+                    data = optimize_dtypes(data)
                 st.session_state.data = data
-                st.session_state.predictions = predictions
-                st.session_state.model = model
-                st.session_state.preprocessor = preprocessor
-                st.session_state.feature_names = feature_names
+                st.session_state.predictions = thin_predictions(predictions, data) if predictions is not None else None
+                st.session_state.rescored_rows = None
                 st.session_state.session_name = selected_session
                 
-                # Store additional metadata if available
-                if model_type:
-                    st.session_state.model_type = model_type
-                if used_model_id:
-                    st.session_state.loaded_model_id = used_model_id
+                # The session's stored artifacts are not tied to a saved model, so
+                # only the ID is kept (for display); no previous scores are reused
+                set_session_model(model, preprocessor, feature_names,
+                                  model_type or st.session_state.get('model_type'), None)
+                st.session_state.loaded_model_id = used_model_id
                 
                 # Show success message with more details
                 if is_training_session:
@@ -1084,17 +453,16 @@ with st.sidebar:
             compare_btn = st.button(t("compare_session"))
             if compare_btn:
                 session_id = [s[0] for s in previous_sessions if s[1] == selected_session][0]
-                result = load_session_data(session_id)
                 
-                if len(result) == 9:
-                    # New format with additional fields
-                    (data, predictions, _, _, _, _, _, _, _) = result
-                else:
-                    # Old format for backwards compatibility
-                    (data, predictions, _, _, _) = result
+                # Comparison only needs a few prediction columns, so skip the
+                # original data and the model artifacts entirely
+                predictions = load_session_frame(
+                    session_id, 'predictions',
+                    columns=['Department', 'Turnover_Probability', 'Risk_Category']
+                )
                 
                 st.session_state.comparison_session = selected_session
-                st.session_state.comparison_data = (data, predictions)
+                st.session_state.comparison_data = (None, predictions)
                 st.success(t("comparison_ready"))
 
 # Main content
@@ -1161,10 +529,22 @@ with tab1:
     
     if uploaded_file is not None:
         try:
-            if uploaded_file.name.endswith('.csv'):
-                df = pd.read_csv(uploaded_file)
-            else:
-                df = pd.read_excel(uploaded_file)
+            # Required columns are checked on the first chunk, before the whole file is read
+            required_columns = [
+                'Employee_ID', 'Department', 'Performance_Score', 
+                'Monthly_Salary', 'Work_Hours_Per_Week', 'Resigned'
+            ]
+            
+            progress_bar = st.progress(0.0)
+            df = load_data(uploaded_file, required_columns=required_columns,
+                           progress_callback=lambda rows, fraction: progress_bar.progress(
+                               fraction or 0.0, text=f"{rows:,}"))
+            progress_bar.empty()
+            
+            # Compact the frame before it is kept in session state
+            memory_before = frame_memory_mb(df)
+            df = optimize_dtypes(df)
+            memory_after = frame_memory_mb(df)
             
             # Display sample of the data
             st.subheader("معاينة البيانات")
@@ -1176,62 +556,56 @@ with tab1:
             cols[0].metric("عدد السجلات", df.shape[0])
             cols[1].metric("عدد الخصائص", df.shape[1])
             cols[2].metric("الموظفون المستقيلون", df['Resigned'].sum() if 'Resigned' in df.columns else "غير متوفر")
+            cols[3].metric("استخدام الذاكرة", f"{memory_after:.1f} MB",
+                           delta=f"{memory_after - memory_before:.1f} MB", delta_color="inverse",
+                           help=f"قبل التحسين: {memory_before:.1f} MB")
             
-            # Check for required columns
-            required_columns = [
-                'Employee_ID', 'Department', 'Performance_Score', 
-                'Monthly_Salary', 'Work_Hours_Per_Week', 'Resigned'
-            ]
-            
-            missing_columns = [col for col in required_columns if col not in df.columns]
+            # Save the data to session state
+            st.session_state.data = df
+            st.success("تم تحميل بيانات التدريب بنجاح! انتقل إلى تبويب 'تدريب النموذج' للمتابعة.")
             
-            if missing_columns:
-                st.error(f"الأعمدة المطلوبة المفقودة: {', '.join(missing_columns)}")
-            else:
-                # Save the data to session state
-                st.session_state.data = df
-                st.success("تم تحميل بيانات التدريب بنجاح! انتقل إلى تبويب 'تدريب النموذج' للمتابعة.")
-                
-                # Data preprocessing info
-                with st.expander("تفاصيل معالجة البيانات"):
-                    st.write(
-                        """
-                        سيتم معالجة البيانات قبل التدريب بالطرق التالية:
-                        - معالجة القيم المفقودة
-                        - تحويل البيانات النصية إلى شكل رقمي
-                        - تطبيع البيانات الرقمية
-                        - حساب الميزات المشتقة (مثل سنوات العمل في الشركة)
-                        """
-                    )
-                    
-                    # Display data types and missing values
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.write("أنواع البيانات")
-                        # Convert dtypes to strings to avoid Arrow conversion issues
-                        dtypes_df = pd.DataFrame({
-                            "العمود": df.dtypes.index,
-                            "نوع البيانات": df.dtypes.astype(str)
-                        })
-                        st.dataframe(dtypes_df)
-                    
-                    with col2:
-                        st.write("القيم المفقودة")
-                        # Format missing values data to avoid Arrow conversion issues
-                        missing_vals = df.isnull().sum()
-                        missing_data = pd.DataFrame({
-                            "العمود": missing_vals.index,
-                            "القيم المفقودة": missing_vals.values,
-                            "النسبة المئوية": 100 * missing_vals.values / len(df)
-                        })
-                        missing_data["النسبة المئوية"] = missing_data["النسبة المئوية"].round(2)
-                        st.dataframe(missing_data)
-                
-                # Show button to go to training tab
-                if st.button("الانتقال إلى تدريب النموذج", type="primary"):
-                    # Since Streamlit doesn't support direct tab switching, we'll add this note
-                    st.info("يرجى النقر على تبويب 'تدريب النموذج' أعلاه للمتابعة")
+            # Data preprocessing info
+            with st.expander("تفاصيل معالجة البيانات"):
+                st.write(
+                    """
+                    سيتم معالجة البيانات قبل التدريب بالطرق التالية:
+                    - معالجة القيم المفقودة
+                    - تحويل البيانات النصية إلى شكل رقمي
+                    - تطبيع البيانات الرقمية
+                    - حساب الميزات المشتقة (مثل سنوات العمل في الشركة)
+                    """
+                )
+                
+                # Display data types and missing values
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.write("أنواع البيانات")
+                    # Convert dtypes to strings to avoid Arrow conversion issues
+                    dtypes_df = pd.DataFrame({
+                        "العمود": df.dtypes.index,
+                        "نوع البيانات": df.dtypes.astype(str)
+                    })
+                    st.dataframe(dtypes_df)
                 
+                with col2:
+                    st.write("القيم المفقودة")
+                    # Format missing values data to avoid Arrow conversion issues
+                    missing_vals = df.isnull().sum()
+                    missing_data = pd.DataFrame({
+                        "العمود": missing_vals.index,
+                        "القيم المفقودة": missing_vals.values,
+                        "النسبة المئوية": 100 * missing_vals.values / len(df)
+                    })
+                    missing_data["النسبة المئوية"] = missing_data["النسبة المئوية"].round(2)
+                    st.dataframe(missing_data)
+            
+            # Show button to go to training tab
+            if st.button("الانتقال إلى تدريب النموذج", type="primary"):
+                # Since Streamlit doesn't support direct tab switching, we'll add this note
+                st.info("يرجى النقر على تبويب 'تدريب النموذج' أعلاه للمتابعة")
+        
+        except MissingColumnsError as e:
+            st.error(f"الأعمدة المطلوبة المفقودة: {', '.join(e.missing_columns)}")
         except Exception as e:
             st.error(t("error_loading_data") + f": {str(e)}")
 
@@ -1285,10 +659,7 @@ with tab2:
                         model, preprocessor, feature_names, metrics, model_type = load_trained_model(selected_model_id)
                         
                         # Save to session state
-                        st.session_state.model = model
-                        st.session_state.preprocessor = preprocessor
-                        st.session_state.feature_names = feature_names
-                        st.session_state.model_type = model_type
+                        set_session_model(model, preprocessor, feature_names, model_type, selected_model_id)
                         
                         st.success(f"Model '{models_df[models_df['ID']==selected_model_id]['Name'].iloc[0]}' loaded successfully!")
                         
@@ -1312,10 +683,47 @@ with tab2:
             col1, col2 = st.columns(2)
             with col1:
                 test_size = st.slider(t("test_size"), 0.1, 0.5, 0.3, 0.05)
-                model_type = st.selectbox(
-                    t("model_type"),
-                    options=["XGBoost", "Random Forest", "Logistic Regression"]
-                )
+                
+                # Fit every model type concurrently and compare them
+                train_all = st.checkbox("Train all model types and compare", value=False)
+                if train_all:
+                    cpu_count = os.cpu_count() or 1
+                    train_jobs = st.number_input(
+                        "Parallel jobs", min_value=1, max_value=cpu_count,
+                        value=min(len(MODEL_TYPES), cpu_count),
+                        help="Total CPU cores used while training"
+                    )
+                    model_type = "Comparison"
+                else:
+                    model_type = st.selectbox(
+                        t("model_type"),
+                        options=MODEL_TYPES
+                    )
+                
+                # Cross-validated hyperparameter search instead of the fixed defaults
+                tune = False
+                if not train_all:
+                    tune = st.checkbox("Tune hyperparameters (cross-validated search)", value=False)
+                    if tune:
+                        search_method = st.selectbox(
+                            "Search method", options=["random", "halving"],
+                            format_func=lambda x: {"random": "Randomized search", "halving": "Successive halving"}[x]
+                        )
+                        n_candidates = st.number_input("Candidate configurations", min_value=2, max_value=200, value=20)
+                        cv_folds = st.number_input("Cross-validation folds", min_value=2, max_value=10, value=5)
+                        cpu_count = os.cpu_count() or 1
+                        tune_jobs = st.number_input("Parallel jobs", min_value=1, max_value=cpu_count, value=cpu_count,
+                                                    key="tune_jobs")
+                        st.caption(f"The search uses a stratified sample of up to {MAX_TUNING_ROWS:,} rows; "
+                                   f"the best configuration is refitted on all rows.")
+                
+                # XGBoost can split on categories directly instead of one-hot columns
+                native_categorical = False
+                if model_type == "XGBoost":
+                    native_categorical = st.checkbox(
+                        "Native categorical features (skip one-hot encoding)", value=False,
+                        help="Pass Department, Job Title and other categorical columns to XGBoost as categories"
+                    )
                 
                 # Model name for saving
                 model_name = st.text_input("Model Name", value=f"{model_type} - {datetime.now().strftime('%Y-%m-%d')}")
@@ -1339,15 +747,110 @@ with tab2:
             # Train button
             train_btn = st.button(t("train_model"), type="primary")
             
-            if train_btn:
+            if train_btn and train_all:
+                try:
+                    with st.spinner(t("training_model")):
+                        # Preprocess once; all model types share the same one-hot split
+                        X, y, preprocessor, feature_names = cached_preprocess_data(data, target_col, id_col, sparse='auto')
+                        X_train, X_test, y_train, y_test = split_data(X, y, test_size)
+                        
+                        results = train_all_models(X_train, y_train, X_test, y_test, n_jobs=int(train_jobs))
+                        
+                        # Persist all models together
+                        model_ids = [None] * len(results)
+                        if save_model_option:
+                            model_ids = save_trained_models([
+                                {
+                                    'name': model_name,
+                                    'model_type': result['model_type'],
+                                    'model': result['model'],
+                                    'preprocessor': preprocessor,
+                                    'feature_names': feature_names,
+                                    'metrics': result['metrics'],
+                                    'training_data_size': len(data),
+                                    'notes': f"Trained on {len(data)} records. Test size: {test_size}"
+                                }
+                                for result in results
+                            ])
+                        
+                        # Keep the best model (highest AUC) loaded
+                        best = results[0]
+                        set_session_model(best['model'], preprocessor, feature_names, best['model_type'], model_ids[0])
+                        
+                        # Leaderboard
+                        st.subheader("Model Leaderboard")
+                        leaderboard = pd.DataFrame([
+                            {
+                                t("model_type"): result['model_type'],
+                                t("accuracy"): result['metrics']['accuracy'],
+                                t("precision"): result['metrics']['precision'],
+                                t("recall"): result['metrics']['recall'],
+                                t("f1_score"): result['metrics']['f1'],
+                                t("auc"): result['metrics']['auc'],
+                                "Training time (s)": result['train_seconds'],
+                                "ID": model_id
+                            }
+                            for result, model_id in zip(results, model_ids)
+                        ])
+                        if not save_model_option:
+                            leaderboard = leaderboard.drop(columns="ID")
+                        st.dataframe(leaderboard.round(3), use_container_width=True, hide_index=True)
+                        
+                        st.success(t("model_trained_successfully"))
+                        st.info(f"Best model by AUC loaded for predictions: {best['model_type']}")
+                
+                except Exception as e:
+                    st.error(t("error_training_model") + f": {str(e)}")
+            
+            if train_btn and tune:
                 try:
                     with st.spinner(t("training_model")):
-                        # Preprocess data
-                        X, y, preprocessor, feature_names = preprocess_data(data, target_col, id_col)
+                        # Preprocess once; every fold and candidate reuses the matrix
+                        X, y, preprocessor, feature_names = cached_preprocess_data(
+                            data, target_col, id_col, sparse='auto',
+                            encoding='native' if native_categorical else 'onehot'
+                        )
+                        
+                        result = tune_model(X, y, model_type, search=search_method, n_iter=int(n_candidates),
+                                            cv=int(cv_folds), n_jobs=int(tune_jobs))
+                        metrics = result['metrics']
+                        
+                        model_id = None
+                        if save_model_option:
+                            model_id = save_tuned_model(result, model_name, preprocessor, feature_names, len(data))
+                            st.success(f"Model saved with ID: {model_id}")
+                        
+                        set_session_model(result['model'], preprocessor, feature_names, model_type, model_id)
+                        
+                        # Cross-validated metrics of the best configuration
+                        st.subheader(t("model_performance"))
+                        cols = st.columns(5)
+                        for i, key in enumerate(["accuracy", "precision", "recall", "f1", "auc"]):
+                            cols[i].metric(t("f1_score") if key == "f1" else t(key), f"{metrics[key]:.2f}")
+                        st.caption(f"{metrics['cv_folds']}-fold CV on {metrics['tuning_rows']:,} rows, "
+                                   f"AUC {metrics['cv_auc_mean']:.3f} ± {metrics['cv_auc_std']:.3f}, "
+                                   f"{result['tuning_seconds']:.1f}s")
                         
-                        # Save preprocessor and feature names to session state
-                        st.session_state.preprocessor = preprocessor
-                        st.session_state.feature_names = feature_names
+                        st.subheader("Best Hyperparameters")
+                        best_params = dict(result['best_params'])
+                        if 'best_iteration' in metrics:
+                            best_params['n_estimators (early stopping)'] = metrics['best_iteration'] + 1
+                        st.json({key: (value.item() if hasattr(value, 'item') else value)
+                                 for key, value in best_params.items()})
+                        
+                        st.success(t("model_trained_successfully"))
+                
+                except Exception as e:
+                    st.error(t("error_training_model") + f": {str(e)}")
+            
+            if train_btn and not train_all and not tune:
+                try:
+                    with st.spinner(t("training_model")):
+                        # Preprocess data (one-hot columns stay sparse when the matrix is mostly zeros)
+                        X, y, preprocessor, feature_names = cached_preprocess_data(
+                            data, target_col, id_col, sparse='auto',
+                            encoding='native' if native_categorical else 'onehot'
+                        )
                         
                         # Split data
                         X_train, X_test, y_train, y_test = split_data(X, y, test_size)
@@ -1368,9 +871,8 @@ with tab2:
                             "confusion_matrix": conf_matrix.tolist()
                         }
                         
-                        # Save model to session state
-                        st.session_state.model = model
-                        st.session_state.model_type = model_type
+                        # The freshly trained model has no database ID until it is saved
+                        model_id = None
                         
                         # Save trained model to database if option selected
                         if save_model_option:
@@ -1386,6 +888,9 @@ with tab2:
                             )
                             st.success(f"Model saved with ID: {model_id}")
                         
+                        # Save model to session state
+                        set_session_model(model, preprocessor, feature_names, model_type, model_id)
+                        
                         # Display metrics
                         st.subheader(t("model_performance"))
                         
@@ -1452,7 +957,7 @@ with tab3:
         if loaded_model_id is not None and trained_models:
             try:
                 # تحميل معلومات النموذج للحصول على الدقة
-                _, _, _, metrics, _ = load_trained_model(loaded_model_id)
+                metrics = load_model_metrics(loaded_model_id)
                 if metrics and 'accuracy' in metrics:
                     model_accuracy = metrics['accuracy']
             except:
@@ -1495,11 +1000,7 @@ with tab3:
                         model, preprocessor, feature_names, _, model_type = load_trained_model(selected_model_id)
                         
                         # Save to session state
-                        st.session_state.model = model
-                        st.session_state.preprocessor = preprocessor
-                        st.session_state.feature_names = feature_names
-                        st.session_state.model_type = model_type
-                        st.session_state.loaded_model_id = selected_model_id
+                        set_session_model(model, preprocessor, feature_names, model_type, selected_model_id)
                         
                         # Reset predictions to allow new predictions with this model
                         if 'predictions' in st.session_state:
@@ -1527,10 +1028,12 @@ with tab3:
             if prediction_file:
                 try:
                     # Load the data
-                    if prediction_file.name.endswith('.csv'):
-                        prediction_data = pd.read_csv(prediction_file)
-                    else:
-                        prediction_data = pd.read_excel(prediction_file)
+                    progress_bar = st.progress(0.0)
+                    prediction_data = load_data(prediction_file,
+                                                progress_callback=lambda rows, fraction: progress_bar.progress(
+                                                    fraction or 0.0, text=f"{rows:,}"))
+                    progress_bar.empty()
+                    prediction_data = optimize_dtypes(prediction_data)
                     
                     # Update session state with the new prediction data
                     st.session_state.data = prediction_data
@@ -1581,14 +1084,30 @@ with tab3:
                         model_type = getattr(st.session_state, 'model_type', 'Unknown')
                         data = st.session_state.data
                         
-                        # Make predictions
-                        predictions = predict_turnover(data, model, preprocessor, feature_names)
+                        # Reuse probabilities from the last prediction session of exactly this model
+                        previous = None
+                        model_hash = st.session_state.get('loaded_model_hash')
+                        if model_hash is not None:
+                            previous_session_id = get_latest_prediction_session_id(model_hash)
+                            if previous_session_id is not None:
+                                previous = load_session_frame(
+                                    previous_session_id, 'predictions',
+                                    columns=['Employee_ID', 'Row_Hash', 'Turnover_Probability']
+                                )
+                        
+                        # Make predictions, re-scoring only new or changed employees
+                        predictions, rescored = predict_turnover_incremental(
+                            data, model, preprocessor, feature_names, previous=previous
+                        )
                         
                         # Add risk category
-                        predictions['Risk_Category'] = predictions['Turnover_Probability'].apply(assign_risk_category)
+                        predictions['Risk_Category'] = assign_risk_categories(predictions['Turnover_Probability'])
+                        
+                        # Kept for the results view, which is shown after the rerun below
+                        st.session_state.rescored_rows = (rescored, len(predictions)) if previous is not None else None
                         
-                        # Save predictions to session state
-                        st.session_state.predictions = predictions
+                        # Save thin predictions to session state
+                        st.session_state.predictions = thin_predictions(predictions, data)
                         
                         # Display success message
                         st.success("تم إنشاء التنبؤات بنجاح!")
@@ -1600,12 +1119,13 @@ with tab3:
                         # Get updated values from session state to ensure we have the most current data
                         model = st.session_state.model
                         data = st.session_state.data
-                        predictions = st.session_state.predictions
+                        predictions = get_predictions()
                         preprocessor = st.session_state.preprocessor
                         feature_names = st.session_state.feature_names
                         model_type = getattr(st.session_state, 'model_type', 'Unknown')
                         used_model_id = getattr(st.session_state, 'loaded_model_id', None)
-                            
+                        model_hash = st.session_state.get('loaded_model_hash')
+                        
                         try:
                             save_session(
                                 prediction_name,
@@ -1617,7 +1137,8 @@ with tab3:
                                 model_type,
                                 False,  # Not a training session
                                 used_model_id,
-                                f"التنبؤ على {len(data)} سجل باستخدام نموذج {model_type}"
+                                f"التنبؤ على {len(data)} سجل باستخدام نموذج {model_type}",
+                                model_hash
                             )
                             st.success("تم حفظ جلسة التنبؤ بنجاح!")
                         except Exception as e:
@@ -1673,7 +1194,7 @@ with tab3:
         if hasattr(st.session_state, 'loaded_model_id') and st.session_state.loaded_model_id is not None:
             try:
                 # تحميل معلومات النموذج للحصول على الدقة
-                _, _, _, metrics, _ = load_trained_model(st.session_state.loaded_model_id)
+                metrics = load_model_metrics(st.session_state.loaded_model_id)
                 if metrics and 'accuracy' in metrics:
                     model_accuracy = metrics['accuracy']
             except:
@@ -1692,10 +1213,7 @@ with tab3:
         st.write("")
         
     # الحصول على التنبؤات من حالة الجلسة
-    if 'predictions' in st.session_state:
-        predictions = st.session_state.predictions
-    else:
-        predictions = None
+    predictions = get_predictions()
     
     # Check if predictions are available
     if predictions is not None:
@@ -1704,15 +1222,22 @@ with tab3:
         
         cols = st.columns(4)
         total_employees = len(predictions)
-        high_risk = len(predictions[predictions['Risk_Category'] == 'High'])
-        medium_risk = len(predictions[predictions['Risk_Category'] == 'Medium'])
-        low_risk = len(predictions[predictions['Risk_Category'] == 'Low'])
+        counts = risk_counts(predictions)
+        high_risk = counts['High']
+        medium_risk = counts['Medium']
+        low_risk = counts['Low']
         
         cols[0].metric(t("total_employees"), total_employees)
         cols[1].metric(t("high_risk_employees"), high_risk, f"{high_risk/total_employees:.1%}")
         cols[2].metric(t("medium_risk_employees"), medium_risk, f"{medium_risk/total_employees:.1%}")
         cols[3].metric(t("low_risk_employees"), low_risk, f"{low_risk/total_employees:.1%}")
         
+        # Report incremental scoring of the last prediction run
+        if st.session_state.get('rescored_rows'):
+            rescored, scored_total = st.session_state.rescored_rows
+            st.caption(f"تمت إعادة تقييم {rescored:,} من أصل {scored_total:,} موظف؛ "
+                       f"أُعيدت نتائج الباقين من جلسة التنبؤ السابقة لنفس النموذج.")
+        
         # Risk distribution plot
         st.subheader(t("risk_distribution"))
         fig = plot_risk_distribution(predictions, t)
@@ -1748,33 +1273,47 @@ with tab3:
                 0.0, 1.0, 0.0, 0.05
             )
             
-        # Apply filters
-        filtered_predictions = predictions.copy()
-        if dept_filter:
-            filtered_predictions = filtered_predictions[filtered_predictions['Department'].isin(dept_filter)]
-        if risk_filter:
-            filtered_predictions = filtered_predictions[filtered_predictions['Risk_Category'].isin(risk_filter)]
-        if prob_threshold > 0:
-            filtered_predictions = filtered_predictions[filtered_predictions['Turnover_Probability'] >= prob_threshold]
-            
-        # Sort by probability
-        filtered_predictions = filtered_predictions.sort_values('Turnover_Probability', ascending=False)
-            
-        # Display table
-        st.dataframe(
-            filtered_predictions[[
-                'Employee_ID', 'Department', 'Job_Title', 'Turnover_Probability', 
-                'Risk_Category', 'Performance_Score', 'Years_At_Company'
-            ]],
-            use_container_width=True
+        # Pagination controls
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            page_size = st.selectbox("Rows per page", PAGE_SIZES, index=1, key="predictions_page_size")
+        
+        # Filters resolve through indexes cached per predictions and filter combination
+        total_matching = count_matching(predictions, dept_filter, risk_filter, prob_threshold)
+        page_count = max(1, -(-total_matching // page_size))
+        
+        # Start from the first page whenever the filters or the matching rows change
+        table_filters = (tuple(dept_filter), tuple(risk_filter), prob_threshold, page_size, total_matching)
+        if st.session_state.get('predictions_table_filters') != table_filters:
+            st.session_state.predictions_table_filters = table_filters
+            st.session_state.predictions_page = 1
+        
+        with col2:
+            page_number = st.number_input("Page", min_value=1, max_value=page_count, step=1,
+                                          key="predictions_page")
+        
+        # Only the visible page, sorted by probability, is built and sent to the browser
+        page_rows = prediction_page(
+            predictions,
+            page=page_number - 1,
+            page_size=page_size,
+            departments=dept_filter,
+            risk_levels=risk_filter,
+            min_probability=prob_threshold
         )
+        
+        # Display table
+        st.dataframe(page_rows, use_container_width=True)
+        first_row = (page_number - 1) * page_size
+        st.caption(f"Rows {first_row + 1 if total_matching else 0:,}–{first_row + len(page_rows):,} "
+                   f"of {total_matching:,} (page {page_number} of {page_count})")
     else:
         st.info("قم بتحميل بيانات التنبؤ أولاً من خلال زر 'تحميل بيانات للتنبؤ' أعلاه.")
         
     # If we have predictions, show export options and comparison
     if predictions is not None:
         # Define filtered_predictions variable for use in exports
-        filtered_predictions = predictions.copy()
+        filtered_predictions = predictions
         
         # Export options
         col1, col2, col3 = st.columns(3)
@@ -1793,15 +1332,15 @@ with tab3:
             with col2:
                 export_pdf = st.button(t("generate_pdf_report"), key="export_pdf_btn")
                 if export_pdf:
-                    with st.spinner(t("generating_pdf")):
-                        pdf_file = generate_pdf_report(predictions, t)
-                        st.download_button(
-                            label=t("download_pdf"),
-                            data=pdf_file,
-                            file_name=f"turnover_report_{datetime.now().strftime('%Y%m%d')}.pdf",
-                            mime="application/pdf",
-                            key="download_pdf_btn"
-                        )
+                    # Rendered serially on a background thread; later reruns pick the job up from session state
+                    st.session_state['_pdf_job'] = (predictions, start_pdf_report(predictions, t))
+                
+                # Only this fragment reruns on a timer while the report is generated,
+                # so the rest of the page renders immediately
+                pdf_job = st.session_state.get('_pdf_job')
+                polling = pdf_job is not None and pdf_job[0] is predictions and not pdf_job[1].done()
+                st.fragment(show_pdf_report_status, run_every=PDF_POLL_SECONDS if polling else None)(
+                    predictions, polling)
             
             with col3:
                 # Printable web report button
@@ -1829,8 +1368,8 @@ with tab3:
                 comparison_data, comparison_predictions = st.session_state.comparison_data
                 
                 # Calculate metrics for both
-                current_high_risk = len(predictions[predictions['Risk_Category'] == 'High']) / len(predictions)
-                previous_high_risk = len(comparison_predictions[comparison_predictions['Risk_Category'] == 'High']) / len(comparison_predictions)
+                current_high_risk = risk_counts(predictions)['High'] / len(predictions)
+                previous_high_risk = risk_counts(comparison_predictions)['High'] / len(comparison_predictions)
                 
                 cols = st.columns(3)
                 cols[0].metric(
@@ -1851,14 +1390,17 @@ with tab3:
                 st.subheader(t("department_comparison"))
                 
                 # Prepare comparison data
-                dept_current = predictions.groupby('Department')['Turnover_Probability'].mean().reset_index()
-                dept_previous = comparison_predictions.groupby('Department')['Turnover_Probability'].mean().reset_index()
+                dept_current = department_summary(predictions)[['Department', 'avg_probability']]
+                dept_previous = department_summary(comparison_predictions)[['Department', 'avg_probability']]
                 
                 dept_comparison = pd.merge(
                     dept_current, dept_previous,
                     on='Department',
                     suffixes=('_current', '_previous')
-                )
+                ).rename(columns={
+                    'avg_probability_current': 'Turnover_Probability_current',
+                    'avg_probability_previous': 'Turnover_Probability_previous'
+                })
                 
                 dept_comparison['Difference'] = dept_comparison['Turnover_Probability_current'] - dept_comparison['Turnover_Probability_previous']
                 
@@ -1902,7 +1444,8 @@ with tab4:
                 st.info("يرجى النقر على تبويب 'التنبؤات' أعلاه للمتابعة")
     
     elif st.session_state.predictions is not None:
-        predictions = st.session_state.predictions
+        predictions = get_predictions()
+        employee_index, data_rows = get_employee_index()
         
         # Employee selector
         st.subheader(t("select_employee"))
@@ -1911,13 +1454,18 @@ with tab4:
         with col1:
             employee_id = st.selectbox(
                 t("employee_id"),
-                options=sorted(predictions['Employee_ID'].unique()),
+                options=employee_index.employee_ids,
                 index=0
             )
         
-        # Get employee data
-        employee_data = predictions[predictions['Employee_ID'] == employee_id].iloc[0]
-        employee_df = st.session_state.data[st.session_state.data['Employee_ID'] == employee_id]
+        # Get employee data by position instead of filtering every row
+        row = employee_index.row(employee_id)
+        data_row = data_rows[row]
+        employee_data = predictions.iloc[row]
+        employee_df = st.session_state.data.iloc[[data_row]] if data_row >= 0 else predictions.iloc[[row]]
+        
+        # The employee's row of the batch explanations
+        employee_contributions = get_employee_contributions(data_row)
         
         # Display employee information
         st.subheader(t("employee_information"))
@@ -1966,7 +1514,7 @@ with tab4:
                             border-radius: 10px;
                             text-align: center;">
                     <h2>{t("turnover_probability")}</h2>
-                    <h1>{employee_data['Turnover_Probability']:.1%}</h1>
+                    <h1>{employee_index.probability(employee_id):.1%}</h1>
                     <h3>{t("risk_level")}: {t(employee_data['Risk_Category'].lower())}</h3>
                 </div>
                 """,
@@ -1974,27 +1522,23 @@ with tab4:
             )
         
         with col2:
-            # Get SHAP values for this employee
-            if 'model_type' in locals():
-                model_type_value = model_type
+            # Precomputed top contributions render without the model
+            top_contributions = employee_index.top_contributions(employee_id)
+            if top_contributions is not None:
+                fig = plot_contributions(top_contributions, t)
+                st.pyplot(fig)
             else:
-                model_type_value = "XGBoost"  # default
-                
-            fig = plot_shap_values(
-                st.session_state.model, 
-                st.session_state.preprocessor, 
-                employee_df, 
-                st.session_state.feature_names,
-                model_type_value,
-                t
-            )
-            st.pyplot(fig)
+                # Only this fragment polls while the whole workforce is explained
+                explanation_job = get_explanation_job()
+                polling = explanation_job is not None and not explanation_job.done()
+                st.fragment(show_explanation_status,
+                            run_every=EXPLANATION_POLL_SECONDS if polling else None)(polling)
         
         # Recommendations
         st.subheader(t("retention_recommendations"))
         
         # Choose between standard and AI-powered recommendations
-        recommendation_tabs = st.tabs(["Standard Recommendations", "AI-Powered Insights"])
+        recommendation_tabs = st.tabs(["Standard Recommendations", "AI-Powered Insights", "Factor-Based Recommendations"])
         
         with recommendation_tabs[0]:
             # Standard recommendations
@@ -2037,6 +1581,22 @@ with tab4:
             
             st.divider()
         
+        with recommendation_tabs[2]:
+            # Recommendations driven by the factors raising this employee's risk
+            if employee_contributions is not None:
+                generator = RecommendationGenerator(language=st.session_state.language)
+                factor_recommendations = generator.generate_individual_recommendations(
+                    employee_data,
+                    employee_contributions,
+                    list(st.session_state.feature_names),
+                    employee_name=f"Employee {employee_id}"
+                )
+                
+                for i, rec in enumerate(factor_recommendations, 1):
+                    st.markdown(f"**{i}.** {rec}")
+            else:
+                st.info("Feature contributions are not available for the current model and data.")
+        
         # Employee performance metrics
         st.subheader(t("performance_metrics"))
         
@@ -2076,22 +1636,19 @@ with tab5:
                 st.info("يرجى النقر على تبويب 'التنبؤات' أعلاه للمتابعة")
     
     elif st.session_state.predictions is not None:
-        predictions = st.session_state.predictions
+        predictions = get_predictions()
         
         # Department selector
         st.subheader(t("select_department"))
         
         department = st.selectbox(
             t("department"),
-            options=sorted(predictions['Department'].unique()),
+            options=sorted(department_summary(predictions)['Department']),
             index=0
         )
         
-        # Get department data
-        dept_data = predictions[predictions['Department'] == department]
-        
-        # Calculate department metrics
-        dept_metrics = calculate_department_metrics(dept_data)
+        # Department metrics from the cached rollup
+        dept_metrics = department_metrics(predictions, department)
         
         # Display department metrics
         st.subheader(t("department_metrics"))
@@ -2124,8 +1681,7 @@ with tab5:
         st.subheader(t("risk_by_job_title"))
         
         # Group by job title
-        job_risk = dept_data.groupby('Job_Title')['Turnover_Probability'].mean().reset_index()
-        job_risk = job_risk.sort_values('Turnover_Probability', ascending=False)
+        job_risk = job_title_risk(predictions, department)
         
         fig = px.bar(
             job_risk,
@@ -2145,11 +1701,11 @@ with tab5:
         # High risk employees in department
         st.subheader(t("high_risk_employees"))
         
-        high_risk_employees = dept_data[dept_data['Risk_Category'] == 'High'].sort_values('Turnover_Probability', ascending=False)
+        dept_high_risk = high_risk_employees(predictions, department)
         
-        if len(high_risk_employees) > 0:
+        if len(dept_high_risk) > 0:
             st.dataframe(
-                high_risk_employees[[
+                dept_high_risk[[
                     'Employee_ID', 'Job_Title', 'Turnover_Probability', 
                     'Performance_Score', 'Years_At_Company'
                 ]],
@@ -2180,7 +1736,7 @@ with tab5:
             # Check if we have access to Anthropic Claude
             if 'ANTHROPIC_API_KEY' in os.environ or st.session_state.external_model == "Anthropic":
                 with st.spinner("Analyzing department data with AI..."):
-                    insights = analyze_department_trends(dept_data)
+                    insights = analyze_department_trends(department_rows(predictions, department))
                     
                     if insights:
                         # Key insights
@@ -2228,7 +1784,7 @@ with tab6:
     
     elif st.session_state.predictions is not None and st.session_state.data is not None:
         data = st.session_state.data
-        predictions = st.session_state.predictions
+        predictions = get_predictions()
         
         # Visualization selector
         viz_type = st.selectbox(
@@ -2299,6 +1855,7 @@ with tab6:
                 st.subheader("Key Risk Factor Insights")
                 
                 top_features = feature_imp.head(5)
+                profile = risk_profile(predictions)
                 
                 for _, row in top_features.iterrows():
                     feature = row['Feature']
@@ -2306,9 +1863,9 @@ with tab6:
                     
                     with st.expander(f"{feature} (Score: {importance:.3f})"):
                         # Calculate average values for high and low risk groups
-                        if feature in predictions.columns:
-                            high_risk_avg = predictions[predictions['Risk_Category'] == 'High'][feature].mean()
-                            low_risk_avg = predictions[predictions['Risk_Category'] == 'Low'][feature].mean()
+                        if feature in profile.columns:
+                            high_risk_avg = profile.at['High', feature]
+                            low_risk_avg = profile.at['Low', feature]
                             
                             # Display comparison
                             cols = st.columns(2)
@@ -2333,17 +1890,10 @@ with tab6:
         elif viz_type == t("department_comparison_chart"):
             st.subheader(t("department_comparison_chart"))
             
-            # Calculate department-level metrics
-            dept_metrics = []
-            for dept in predictions['Department'].unique():
-                dept_data = predictions[predictions['Department'] == dept]
-                metrics = calculate_department_metrics(dept_data)
-                metrics['Department'] = dept
-                dept_metrics.append(metrics)
-            
-            dept_df = pd.DataFrame(dept_metrics)
+            # Calculate department-level metrics in one pass
+            dept_df = department_summary(predictions)
             
-            # Select metric to compare
+            # Select metric to compare (only those available in the data)
             metric_options = {
                 "avg_probability": t("avg_turnover_probability"),
                 "high_risk_percentage": t("high_risk_percentage"),
@@ -2351,6 +1901,7 @@ with tab6:
                 "avg_salary": t("avg_salary"),
                 "avg_work_hours": t("avg_work_hours")
             }
+            metric_options = {k: v for k, v in metric_options.items() if k in dept_df.columns}
             
             selected_metric = st.selectbox(
                 "Select Metric to Compare",
@@ -2373,8 +1924,9 @@ with tab6:
             # Show detailed table
             st.dataframe(
                 dept_df[[
-                    "Department", "total_employees", "avg_probability", 
-                    "high_risk_percentage", "avg_performance"
+                    col for col in ["Department", "total_employees", "avg_probability", 
+                                    "high_risk_percentage", "avg_performance"]
+                    if col in dept_df.columns
                 ]],
                 use_container_width=True
             )
@@ -2422,30 +1974,44 @@ with tab6:
         elif viz_type == t("employee_clusters"):
             st.subheader(t("employee_clusters"))
             
-            # Use a simplified clustering approach based on key metrics
+            # Cluster on key metrics; assignments are cached per predictions
             if 'Performance_Score' in predictions.columns and 'Turnover_Probability' in predictions.columns:
-                # For demo purposes, create simple clusters
-                predictions_copy = predictions.copy()
+                cluster_method = st.radio(
+                    "Clustering method",
+                    ["Performance/Risk Quadrants", "K-Means"],
+                    horizontal=True,
+                    key="cluster_method"
+                )
                 
-                # Define clusters
-                def assign_cluster(row):
-                    perf = row['Performance_Score']
-                    risk = row['Turnover_Probability']
-                    
-                    if perf >= 4 and risk >= 0.5:
-                        return "High Performers at Risk"
-                    elif perf >= 4 and risk < 0.5:
-                        return "Stable High Performers"
-                    elif perf < 4 and risk >= 0.5:
-                        return "Low Performers at Risk"
-                    else:
-                        return "Stable Low Performers"
+                if cluster_method == "K-Means":
+                    n_clusters = st.slider("Number of clusters", min_value=2, max_value=8, value=4,
+                                           key="n_clusters")
+                    with st.spinner("Clustering employees..."):
+                        cluster_codes, cluster_labels = kmeans_clusters(predictions, n_clusters=n_clusters)
+                    color_map = None
+                else:
+                    cluster_codes, cluster_labels = quadrant_clusters(predictions)
+                    color_map = {
+                        "High Performers at Risk": "#EF553B",
+                        "Stable High Performers": "#636EFA",
+                        "Low Performers at Risk": "#FFA15A",
+                        "Stable Low Performers": "#FECB52"
+                    }
                 
-                predictions_copy['Cluster'] = predictions_copy.apply(assign_cluster, axis=1)
+                # Draw at most MAX_PLOT_POINTS employees; only the sample gets a label column
+                positions = plot_positions(len(predictions))
+                plot_df = predictions.take(positions)[
+                    [col for col in ["Employee_ID", "Performance_Score", "Turnover_Probability",
+                                     "Department", "Job_Title"] if col in predictions.columns]
+                ]
+                plot_df['Cluster'] = pd.Categorical.from_codes(cluster_codes[positions], cluster_labels)
+                
+                if len(positions) < len(predictions):
+                    st.caption(f"Showing a random sample of {len(positions):,} of {len(predictions):,} employees.")
                 
                 # Create visualization
                 fig = px.scatter(
-                    predictions_copy,
+                    plot_df,
                     x="Performance_Score",
                     y="Turnover_Probability",
                     color="Cluster",
@@ -2456,28 +2022,14 @@ with tab6:
                         "Performance_Score": t("performance_score"),
                         "Turnover_Probability": t("turnover_probability")
                     },
-                    color_discrete_map={
-                        "High Performers at Risk": "#EF553B",
-                        "Stable High Performers": "#636EFA",
-                        "Low Performers at Risk": "#FFA15A",
-                        "Stable Low Performers": "#FECB52"
-                    }
+                    color_discrete_map=color_map,
+                    category_orders={"Cluster": list(cluster_labels)}
                 )
                 
                 st.plotly_chart(fig, use_container_width=True)
                 
                 # Display cluster statistics
-                cluster_stats = predictions_copy.groupby('Cluster').agg({
-                    'Employee_ID': 'count',
-                    'Performance_Score': 'mean',
-                    'Turnover_Probability': 'mean',
-                    'Monthly_Salary': 'mean',
-                    'Years_At_Company': 'mean'
-                }).reset_index()
-                
-                cluster_stats.columns = ['Cluster', 'Count', 'Avg Performance', 'Avg Risk', 'Avg Salary', 'Avg Tenure']
-                
-                st.dataframe(cluster_stats, use_container_width=True)
+                st.dataframe(cluster_stats(predictions, cluster_codes, cluster_labels), use_container_width=True)
                 
                 # Recommendations for each cluster
                 st.subheader("Cluster-Specific Recommendations")
@@ -2489,13 +2041,15 @@ with tab6:
                     "Stable Low Performers": "These employees are not performing well but are likely to stay. Consider performance improvement plans, role reassignments, or evaluate whether they are in positions that match their skills."
                 }
                 
-                for cluster, rec in cluster_recs.items():
+                examples = cluster_examples(cluster_codes, len(cluster_labels))
+                for code, cluster in enumerate(cluster_labels):
                     with st.expander(f"Recommendations for {cluster}"):
-                        st.write(rec)
+                        if cluster in cluster_recs:
+                            st.write(cluster_recs[cluster])
                         
                         # Show example employees from this cluster
                         st.write("#### Example Employees")
-                        sample = predictions_copy[predictions_copy['Cluster'] == cluster].head(3)
+                        sample = predictions.take(examples[code])
                         if len(sample) > 0:
                             st.dataframe(
                                 sample[['Employee_ID', 'Department', 'Job_Title', 'Performance_Score', 'Turnover_Probability']],
@@ -2688,10 +2242,7 @@ with tab7:
                     model, preprocessor, feature_names, metrics, model_type = load_trained_model(selected_model_id)
                     
                     # Save to session state
-                    st.session_state.model = model
-                    st.session_state.preprocessor = preprocessor
-                    st.session_state.feature_names = feature_names
-                    st.session_state.model_type = model_type
+                    set_session_model(model, preprocessor, feature_names, model_type, selected_model_id)
                     
                     st.success(f"Model '{models_df[models_df['ID']==selected_model_id]['Name'].iloc[0]}' loaded successfully!")
             
@@ -2716,9 +2267,10 @@ with tab7:
                 )
                 
                 if st.button("Compare Models"):
-                    # Load both models' metrics
-                    _, _, _, metrics1, model_type1 = load_trained_model(selected_model_id)
-                    _, _, _, metrics2, model_type2 = load_trained_model(comparison_model_id)
+                    # Load both models' metrics (no model bytes are read)
+                    compared_metrics = load_model_metrics([selected_model_id, comparison_model_id])
+                    metrics1 = compared_metrics[selected_model_id]
+                    metrics2 = compared_metrics[comparison_model_id]
                     
                     if metrics1 and metrics2:
                         # Create comparison dataframe
@@ -2891,10 +2443,11 @@ with tab8:
     # Create notifications if we have predictions but don't have notifications yet
     if st.session_state.predictions is not None and len(st.session_state.notifications) == 0:
         # Create notifications for high-risk employees
-        high_risk_employees = st.session_state.predictions[st.session_state.predictions['Risk_Category'] == 'High']
+        predictions = get_predictions()
+        top_high_risk = high_risk_employees(predictions).head(5)
         
-        if len(high_risk_employees) > 0:
-            for _, employee in high_risk_employees.head(min(5, len(high_risk_employees))).iterrows():
+        if len(top_high_risk) > 0:
+            for _, employee in top_high_risk.iterrows():
                 notification = {
                     "employee_id": employee['Employee_ID'],
                     "message": f"{t('notification_employee_risk')}: {employee['Turnover_Probability']:.1%}",
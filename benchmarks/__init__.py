@@ -0,0 +1,6 @@
+"""
+Performance benchmarks for the HR Analytics hot paths.
+
+Run a benchmark from the repository root, e.g.:
+    python -m benchmarks.bench_database
+"""
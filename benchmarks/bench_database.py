@@ -0,0 +1,157 @@
+"""
+Concurrent read/write throughput of the database access layer.
+
+Compares the previous connect-per-call access pattern (rollback journal, a
+fresh sqlite3 connection for every query) with the pooled WAL connections
+used by database.py. Each worker thread mixes metadata reads
+(load_sessions / load_trained_models) with small model saves, which is the
+access pattern of several Streamlit users rerunning the app at once.
+
+Usage:
+    python -m benchmarks.bench_database --threads 8 --seconds 5
+"""
+import argparse
+import os
+import pickle
+import sqlite3
+import tempfile
+import threading
+import time
+
+import database
+
+def _legacy_read(path):
+    """Previous pattern: open, query, close."""
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    cursor.execute('SELECT id, name, created_at FROM sessions ORDER BY created_at DESC')
+    cursor.fetchall()
+    cursor.execute('''
+    SELECT id, name, model_type, created_at, training_data_size 
+    FROM trained_models 
+    ORDER BY created_at DESC
+    ''')
+    cursor.fetchall()
+    conn.close()
+
+def _legacy_write(path, name, payload):
+    """Previous pattern: open, insert, commit, close."""
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    cursor.execute('''
+    INSERT INTO trained_models (name, model_type, model, preprocessor, feature_names)
+    VALUES (?, ?, ?, ?, ?)
+    ''', (name, 'XGBoost', payload, payload, payload))
+    conn.commit()
+    conn.close()
+
+def _pooled_read(path):
+    database.load_sessions()
+    database.load_trained_models()
+
+def _pooled_write(path, name, payload):
+    database.save_trained_model(name, 'XGBoost', payload, payload, payload)
+
+def run_workload(read_fn, write_fn, path, threads, seconds, write_ratio):
+    """
+    Run a mixed read/write workload from several threads.
+    
+    Args:
+        read_fn: Callable performing one read operation
+        write_fn: Callable performing one write operation
+        path: Database file path
+        threads: Number of worker threads
+        seconds: Duration of the run
+        write_ratio: Fraction of operations that are writes
+    
+    Returns:
+        Dictionary with reads, writes, errors and ops_per_second
+    """
+    payload = pickle.dumps(list(range(2000)))
+    write_every = max(1, int(round(1 / write_ratio))) if write_ratio > 0 else 0
+    counts = {'reads': 0, 'writes': 0, 'errors': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+    
+    def worker(worker_id):
+        reads = writes = errors = 0
+        i = 0
+        while time.perf_counter() < deadline:
+            i += 1
+            try:
+                if write_every and i % write_every == 0:
+                    write_fn(path, f"bench-{worker_id}-{i}", payload)
+                    writes += 1
+                else:
+                    read_fn(path)
+                    reads += 1
+            except sqlite3.OperationalError:
+                # "database is locked"
+                errors += 1
+        database.close_connection()
+        with lock:
+            counts['reads'] += reads
+            counts['writes'] += writes
+            counts['errors'] += errors
+    
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+    
+    counts['ops_per_second'] = (counts['reads'] + counts['writes']) / elapsed
+    return counts
+
+def benchmark(threads=8, seconds=5.0, write_ratio=0.1):
+    """
+    Benchmark the legacy and pooled access patterns on fresh databases.
+    
+    Args:
+        threads: Number of concurrent worker threads
+        seconds: Duration of each run
+        write_ratio: Fraction of operations that are writes
+    
+    Returns:
+        Dictionary mapping pattern name to its result dictionary
+    """
+    results = {}
+    original_path = database.DB_PATH
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, read_fn, write_fn in [
+            ('connect_per_call', _legacy_read, _legacy_write),
+            ('pooled_wal', _pooled_read, _pooled_write)
+        ]:
+            path = os.path.join(tmp, f"{label}.db")
+            
+            # The legacy run uses the default rollback journal; the pooled run
+            # switches the file to WAL through the connection pragmas
+            database.set_db_path(path)
+            database.create_tables()
+            if label == 'connect_per_call':
+                database.get_connection().execute('PRAGMA journal_mode = DELETE')
+            database.close_connection()
+            
+            results[label] = run_workload(read_fn, write_fn, path, threads, seconds, write_ratio)
+    
+    database.set_db_path(original_path)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--write-ratio', type=float, default=0.1)
+    args = parser.parse_args()
+    
+    results = benchmark(args.threads, args.seconds, args.write_ratio)
+    
+    print(f"{'pattern':<18}{'ops/s':>12}{'reads':>10}{'writes':>10}{'errors':>10}")
+    for label, r in results.items():
+        print(f"{label:<18}{r['ops_per_second']:>12.0f}{r['reads']:>10}{r['writes']:>10}{r['errors']:>10}")
+
+if __name__ == '__main__':
+    main()
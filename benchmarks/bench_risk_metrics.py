@@ -0,0 +1,93 @@
+"""
+Row-wise vs vectorized risk categorization and department metrics.
+
+Times the previous approach used by app.py (Series.apply of
+assign_risk_category, and calculate_department_metrics called once per
+department on a re-filtered frame) against assign_risk_categories and
+calculate_department_metrics_table.
+
+Usage:
+    python -m benchmarks.bench_risk_metrics --rows 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.utils import (assign_risk_category, assign_risk_categories,
+                         calculate_department_metrics, calculate_department_metrics_table)
+
+def make_predictions(rows, departments=12, seed=42):
+    """
+    Build a synthetic predictions frame.
+    
+    Args:
+        rows: Number of employees
+        departments: Number of departments
+        seed: Random seed
+    
+    Returns:
+        DataFrame with Department, Turnover_Probability and Years_At_Company
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Department': rng.choice([f"Dept_{i}" for i in range(departments)], rows),
+        'Turnover_Probability': rng.random(rows),
+        'Years_At_Company': rng.uniform(0, 30, rows).round(1)
+    })
+
+def _time(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def benchmark(rows=1_000_000, departments=12, repeat=3):
+    """
+    Run the benchmark.
+    
+    Args:
+        rows: Number of employees
+        departments: Number of departments
+        repeat: Repetitions per measurement (best time is kept)
+    
+    Returns:
+        Dictionary mapping benchmark name to (before_seconds, after_seconds)
+    """
+    predictions = make_predictions(rows, departments)
+    
+    risk_before = _time(lambda: predictions['Turnover_Probability'].apply(assign_risk_category), repeat)
+    risk_after = _time(lambda: assign_risk_categories(predictions['Turnover_Probability']), repeat)
+    
+    predictions['Risk_Category'] = assign_risk_categories(predictions['Turnover_Probability'])
+    
+    def per_department_loop():
+        return [calculate_department_metrics(predictions[predictions['Department'] == dept])
+                for dept in predictions['Department'].unique()]
+    
+    dept_before = _time(per_department_loop, repeat)
+    dept_after = _time(lambda: calculate_department_metrics_table(predictions), repeat)
+    
+    return {
+        'risk_categorization': (risk_before, risk_after),
+        'department_metrics': (dept_before, dept_after)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--departments', type=int, default=12)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    results = benchmark(args.rows, args.departments, args.repeat)
+    
+    print(f"{'benchmark':<22}{'before (s)':>12}{'after (s)':>12}{'speedup':>10}")
+    for name, (before, after) in results.items():
+        print(f"{name:<22}{before:>12.4f}{after:>12.4f}{before / after:>9.1f}x")
+
+if __name__ == '__main__':
+    main()
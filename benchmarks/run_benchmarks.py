@@ -0,0 +1,266 @@
+"""
+Timing and memory benchmarks for the train/score/report pipeline.
+
+Runs each stage on synthetic HR data (see benchmarks.synthetic) and records
+wall time (best of --repeat runs) and peak Python-level allocation measured
+with tracemalloc in a separate run. Allocations made inside native
+libraries that bypass the Python allocator (e.g. XGBoost's booster) are not
+included in the peak. Results are written as JSON so runs can be compared
+across versions.
+
+Usage:
+    python -m benchmarks.run_benchmarks --rows 50000 --output bench_results.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+import sklearn
+import xgboost
+
+import database
+from data_processing import preprocess_data, split_data
+from model_cache import model_cache
+from models import train_model, predict_turnover
+from preprocess_cache import PreprocessCache, cached_preprocess_data
+from pdf_generator import generate_pdf_report, pdf_cache
+from report_generator import generate_printable_report
+from translations import translations
+from utils.utils import assign_risk_categories
+
+from benchmarks.synthetic import make_hr_data
+
+MODEL_TYPES = ['XGBoost', 'Random Forest', 'Logistic Regression']
+
+def measure(fn, repeat=1, memory=True):
+    """
+    Time a callable and measure its peak allocation.
+    
+    Args:
+        fn: Callable without arguments
+        repeat: Timed runs (the best time is kept)
+        memory: Also run once under tracemalloc
+    
+    Returns:
+        Tuple of (result of the last run, stats dictionary)
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    
+    stats = {'seconds': round(best, 6)}
+    
+    if memory:
+        tracemalloc.start()
+        try:
+            result = fn()
+            stats['peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 2**20, 3)
+        finally:
+            tracemalloc.stop()
+    
+    return result, stats
+
+def matrix_nbytes(X):
+    """
+    Return the memory held by a dense array or a scipy sparse matrix.
+    """
+    if sp.issparse(X):
+        return X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+    return X.nbytes
+
+def _git_revision():
+    """
+    Return the current git commit, or None outside a checkout.
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(rows=20_000, departments=8, job_titles=12, missing_rate=0.02, repeat=1, memory=True,
+        seed=42, progress=print):
+    """
+    Run every pipeline benchmark.
+    
+    Args:
+        rows: Number of synthetic employees
+        departments: Number of departments
+        job_titles: Number of job titles
+        missing_rate: Fraction of missing values per nullable column
+        repeat: Timed runs per stage
+        memory: Measure peak allocation
+        seed: Random seed for the synthetic data
+        progress: Called with each stage name before it runs (or None)
+    
+    Returns:
+        Dictionary with run metadata and per-stage results
+    """
+    results = {}
+    
+    def bench(name, fn):
+        if progress is not None:
+            progress(name)
+        result, results[name] = measure(fn, repeat, memory)
+        return result
+    
+    data = make_hr_data(rows, departments, job_titles, missing_rate, seed=seed)
+    translate = lambda key: translations.get(key, {}).get('en', key)
+    
+    X, y, preprocessor, feature_names = bench(
+        'preprocess_data', lambda: preprocess_data(data, 'Resigned', 'Employee_ID'))
+    X_train, X_test, y_train, y_test = bench('split_data', lambda: split_data(X, y))
+    
+    # Retraining on unchanged data: fingerprint plus an in-memory cache hit
+    warm_cache = PreprocessCache(cache_dir=None)
+    cached_preprocess_data(data, 'Resigned', 'Employee_ID', cache=warm_cache)
+    bench('preprocess_data[cached]',
+          lambda: cached_preprocess_data(data.copy(deep=False), 'Resigned', 'Employee_ID', cache=warm_cache))
+    
+    models = {}
+    for model_type in MODEL_TYPES:
+        models[model_type] = bench(f"train_model[{model_type}]",
+                                   lambda: train_model(X_train, y_train, model_type))
+    
+    # Same pipeline with CSR one-hot output
+    X_sparse, _, sparse_preprocessor, _ = bench(
+        'preprocess_data[sparse]', lambda: preprocess_data(data, 'Resigned', 'Employee_ID', sparse=True))
+    Xs_train, Xs_test, ys_train, ys_test = bench('split_data[sparse]', lambda: split_data(X_sparse, y))
+    for model_type in ['XGBoost', 'Logistic Regression']:
+        sparse_model = bench(f"train_model[{model_type}, sparse]",
+                             lambda: train_model(Xs_train, ys_train, model_type))
+    bench('predict_turnover[Logistic Regression, sparse]',
+          lambda: predict_turnover(data, sparse_model, sparse_preprocessor, feature_names))
+    
+    # XGBoost on category columns instead of one-hot features
+    X_native, _, native_preprocessor, native_features = bench(
+        'preprocess_data[native]', lambda: preprocess_data(data, 'Resigned', 'Employee_ID', encoding='native'))
+    Xn_train, Xn_test, yn_train, yn_test = split_data(X_native, y)
+    native_model = bench('train_model[XGBoost, native]', lambda: train_model(Xn_train, yn_train, 'XGBoost'))
+    bench('predict_turnover[XGBoost, native]',
+          lambda: predict_turnover(data, native_model, native_preprocessor, native_features))
+    
+    results['preprocess_data']['features'] = len(feature_names)
+    results['preprocess_data[native]']['features'] = len(native_features)
+    results['preprocess_data']['matrix_mb'] = round(matrix_nbytes(X) / 2**20, 3)
+    results['preprocess_data[sparse]']['matrix_mb'] = round(matrix_nbytes(X_sparse) / 2**20, 3)
+    
+    scored = {}
+    for model_type, model in models.items():
+        scored[model_type] = bench(f"predict_turnover[{model_type}]",
+                                   lambda: predict_turnover(data, model, preprocessor, feature_names))
+    
+    # Reports use the XGBoost predictions, the app's default model
+    predictions = scored['XGBoost']
+    predictions['Risk_Category'] = assign_risk_categories(predictions['Turnover_Probability'])
+    department = predictions['Department'].iloc[0]
+    employee_id = predictions['Employee_ID'].iloc[0]
+    
+    def pdf_cold():
+        pdf_cache.clear()
+        return generate_pdf_report(predictions, translate)
+    
+    bench('generate_pdf_report[cold]', pdf_cold)
+    bench('generate_pdf_report[cached]', lambda: generate_pdf_report(predictions, translate))
+    bench('generate_printable_report[overall]', lambda: generate_printable_report(predictions))
+    bench('generate_printable_report[department]',
+          lambda: generate_printable_report(predictions, department=department))
+    bench('generate_printable_report[individual]',
+          lambda: generate_printable_report(predictions, is_individual=True, employee_id=employee_id))
+    
+    # Database round trips against a throwaway file
+    previous_db_path = database.DB_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        database.set_db_path(os.path.join(tmp, 'bench.db'))
+        try:
+            database.create_tables()
+            model = models['XGBoost']
+            
+            session_id = bench('save_session', lambda: database.save_session(
+                'benchmark', data, predictions, model, preprocessor, feature_names, 'XGBoost'))
+            bench('load_sessions', database.load_sessions)
+            bench('load_session_data', lambda: database.load_session_data(session_id))
+            bench('load_session_frame[3 columns]', lambda: database.load_session_frame(
+                session_id, 'predictions', columns=['Department', 'Turnover_Probability', 'Risk_Category']))
+            
+            model_id = bench('save_trained_model', lambda: database.save_trained_model(
+                'benchmark', 'XGBoost', model, preprocessor, feature_names, {'accuracy': 0.0}, len(data)))
+            bench('load_trained_models', database.load_trained_models)
+            
+            def load_cold():
+                model_cache.invalidate(model_id)
+                return database.load_trained_model(model_id)
+            
+            bench('load_trained_model[cold]', load_cold)
+            bench('load_trained_model[cached]', lambda: database.load_trained_model(model_id))
+        finally:
+            database.close_connection()
+            database.set_db_path(previous_db_path)
+    
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'git_revision': _git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'versions': {
+                'numpy': np.__version__,
+                'pandas': pd.__version__,
+                'scikit-learn': sklearn.__version__,
+                'xgboost': xgboost.__version__
+            },
+            'params': {
+                'rows': rows,
+                'departments': departments,
+                'job_titles': job_titles,
+                'missing_rate': missing_rate,
+                'repeat': repeat,
+                'seed': seed
+            }
+        },
+        'results': results
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20_000)
+    parser.add_argument('--departments', type=int, default=8)
+    parser.add_argument('--job-titles', type=int, default=12)
+    parser.add_argument('--missing-rate', type=float, default=0.02)
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-memory', action='store_true', help="Skip the tracemalloc runs")
+    parser.add_argument('--output', default='bench_results.json', help="JSON file to write")
+    args = parser.parse_args()
+    
+    report = run(args.rows, args.departments, args.job_titles, args.missing_rate,
+                 args.repeat, not args.no_memory, args.seed,
+                 progress=lambda name: print(f"running {name}...", flush=True))
+    
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    
+    print(f"\n{'stage':<48}{'seconds':>10}{'peak MB':>10}")
+    for name, stats in report['results'].items():
+        peak = stats.get('peak_mb')
+        print(f"{name:<48}{stats['seconds']:>10.3f}{peak if peak is not None else '-':>10}")
+    dense_mb = report['results']['preprocess_data']['matrix_mb']
+    sparse_mb = report['results']['preprocess_data[sparse]']['matrix_mb']
+    print(f"\nfeature matrix: {dense_mb:.1f} MB dense, {sparse_mb:.1f} MB sparse "
+          f"({dense_mb / max(sparse_mb, 1e-9):.1f}x smaller)")
+    print(f"wrote {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Synthetic HR data for benchmarks.
+
+Generates employee frames with the column layout the app expects, with
+configurable size, department and job-title cardinality and missing-value
+rate. Turnover is drawn from a logistic function of a few features, so
+trained models have real signal to learn.
+"""
+import numpy as np
+import pandas as pd
+
+# Feature columns that may receive missing values
+NULLABLE_COLUMNS = [
+    'Age', 'Education_Level', 'Performance_Score', 'Monthly_Salary', 'Work_Hours_Per_Week',
+    'Projects_Handled', 'Overtime_Hours', 'Sick_Days', 'Training_Hours',
+    'Employee_Satisfaction_Score'
+]
+
+def make_hr_data(rows=10_000, departments=8, job_titles=12, missing_rate=0.0,
+                 turnover_rate=0.1, include_hire_date=False, seed=42):
+    """
+    Build a synthetic employee dataset.
+    
+    Args:
+        rows: Number of employees
+        departments: Number of distinct departments
+        job_titles: Number of distinct job titles
+        missing_rate: Fraction of values blanked in each nullable feature column
+        turnover_rate: Approximate fraction of employees who resigned
+        include_hire_date: Provide Hire_Date instead of Years_At_Company, so
+            tenure is derived during preprocessing
+        seed: Random seed
+    
+    Returns:
+        DataFrame with employee data and a Resigned column
+    """
+    rng = np.random.default_rng(seed)
+    
+    years = rng.uniform(0, 30, rows).round(1)
+    performance = rng.integers(1, 6, rows).astype(float)
+    satisfaction = rng.uniform(1, 5, rows).round(2)
+    overtime = rng.integers(0, 30, rows).astype(float)
+    
+    df = pd.DataFrame({
+        'Employee_ID': np.arange(1, rows + 1),
+        'Department': rng.choice([f"Department_{i}" for i in range(departments)], rows),
+        'Gender': rng.choice(['Male', 'Female', 'Other'], rows, p=[0.48, 0.48, 0.04]),
+        'Age': rng.integers(21, 65, rows).astype(float),
+        'Job_Title': rng.choice([f"Job_{i}" for i in range(job_titles)], rows),
+        'Years_At_Company': years,
+        'Education_Level': rng.choice(['High School', 'Bachelor', 'Master', 'PhD'], rows),
+        'Performance_Score': performance,
+        'Monthly_Salary': rng.normal(6000, 1500, rows).round(2),
+        'Work_Hours_Per_Week': rng.integers(30, 61, rows).astype(float),
+        'Projects_Handled': rng.integers(0, 50, rows).astype(float),
+        'Overtime_Hours': overtime,
+        'Sick_Days': rng.integers(0, 15, rows).astype(float),
+        'Training_Hours': rng.integers(0, 100, rows).astype(float),
+        'Employee_Satisfaction_Score': satisfaction
+    })
+    
+    if include_hire_date:
+        hire_dates = pd.Timestamp('2025-01-01') - pd.to_timedelta(years * 365.25, unit='D')
+        df.insert(df.columns.get_loc('Years_At_Company'), 'Hire_Date', hire_dates.strftime('%Y-%m-%d'))
+        df = df.drop(columns='Years_At_Company')
+    
+    # Resignation odds rise with overtime and fall with satisfaction, performance and tenure
+    logit = (0.08 * overtime - 0.9 * satisfaction - 0.3 * performance - 0.05 * years)
+    # Pick the intercept by bisection so the mean probability hits turnover_rate
+    low, high = -50.0, 50.0
+    for _ in range(50):
+        intercept = (low + high) / 2
+        if (1 / (1 + np.exp(-(logit + intercept)))).mean() < turnover_rate:
+            low = intercept
+        else:
+            high = intercept
+    df['Resigned'] = rng.random(rows) < 1 / (1 + np.exp(-(logit + intercept)))
+    
+    if missing_rate > 0:
+        for col in NULLABLE_COLUMNS:
+            df.loc[rng.random(rows) < missing_rate, col] = np.nan
+    
+    return df
@@ -0,0 +1,218 @@
+"""
+Employee segmentation for the Employee Clusters view.
+
+Two methods are available:
+
+- Quadrants: performance and turnover risk split at fixed thresholds,
+  assigned for all rows at once with numpy comparisons.
+- K-means: MiniBatchKMeans on standardized numeric columns, so it scales
+  to millions of employees.
+
+Both return one small integer code per employee together with the cluster
+labels, instead of a string column on a copy of the predictions. Cluster
+assignments are served from the shared aggregate cache, keyed by the
+predictions fingerprint (see aggregates.py), and must be treated as
+read-only; statistics are bincounts over the codes.
+"""
+import numpy as np
+import pandas as pd
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.preprocessing import StandardScaler
+
+from aggregates import aggregate_cache, predictions_fingerprint
+
+# Quadrant thresholds
+PERFORMANCE_THRESHOLD = 4
+RISK_THRESHOLD = 0.5
+
+# Quadrant labels, indexed by code
+QUADRANT_LABELS = [
+    "High Performers at Risk",
+    "Stable High Performers",
+    "Low Performers at Risk",
+    "Stable Low Performers"
+]
+
+# Columns k-means clusters on (all covered by the predictions fingerprint)
+KMEANS_FEATURES = ['Performance_Score', 'Turnover_Probability', 'Monthly_Salary',
+                   'Years_At_Company', 'Work_Hours_Per_Week']
+
+# Columns summarized per cluster, with their display names
+STATS_COLUMNS = [
+    ('Performance_Score', 'Avg Performance'),
+    ('Turnover_Probability', 'Avg Risk'),
+    ('Monthly_Salary', 'Avg Salary'),
+    ('Years_At_Company', 'Avg Tenure')
+]
+
+# Points drawn in the cluster scatter plot; larger frames are sampled
+MAX_PLOT_POINTS = 20_000
+
+def quadrant_codes(performance, risk, performance_threshold=PERFORMANCE_THRESHOLD,
+                   risk_threshold=RISK_THRESHOLD):
+    """
+    Assign every employee to a performance/risk quadrant.
+    
+    Employees missing either value count as Stable Low Performers.
+    
+    Args:
+        performance: Array of performance scores
+        risk: Array of turnover probabilities
+        performance_threshold: Lowest performance score of high performers
+        risk_threshold: Lowest probability counted as at risk
+    
+    Returns:
+        int8 array of codes indexing QUADRANT_LABELS
+    """
+    performance = np.asarray(performance, dtype=np.float64)
+    risk = np.asarray(risk, dtype=np.float64)
+    high_performance = performance >= performance_threshold
+    at_risk = risk >= risk_threshold
+    
+    codes = np.full(len(performance), 3, dtype=np.int8)
+    codes[high_performance & at_risk] = 0
+    codes[high_performance & (risk < risk_threshold)] = 1
+    codes[(performance < performance_threshold) & at_risk] = 2
+    
+    return codes
+
+def quadrant_clusters(predictions, performance_threshold=PERFORMANCE_THRESHOLD,
+                      risk_threshold=RISK_THRESHOLD):
+    """
+    Quadrant cluster of every employee, cached per predictions.
+    
+    Args:
+        predictions: DataFrame with Performance_Score and Turnover_Probability
+        performance_threshold: Lowest performance score of high performers
+        risk_threshold: Lowest probability counted as at risk
+    
+    Returns:
+        Tuple of (int8 codes, list of labels)
+    """
+    key = (predictions_fingerprint(predictions), 'quadrant_clusters', performance_threshold, risk_threshold)
+    
+    return aggregate_cache.get_or_compute(key, lambda: (
+        quadrant_codes(predictions['Performance_Score'].to_numpy(),
+                       predictions['Turnover_Probability'].to_numpy(),
+                       performance_threshold, risk_threshold),
+        QUADRANT_LABELS
+    ))
+
+def _kmeans_matrix(predictions, features):
+    """
+    Standardized float32 matrix of the clustering columns, missing values
+    replaced by the column median.
+    """
+    X = np.column_stack([predictions[col].to_numpy(dtype=np.float32, na_value=np.nan) for col in features])
+    
+    medians = np.nanmedian(X, axis=0)
+    missing = np.isnan(X)
+    if missing.any():
+        X[missing] = np.take(np.nan_to_num(medians), np.nonzero(missing)[1])
+    
+    return StandardScaler(copy=False).fit_transform(X)
+
+def kmeans_clusters(predictions, n_clusters=4, features=None, batch_size=4096, random_state=42):
+    """
+    K-means clusters of employees, cached per predictions and settings.
+    
+    Clusters are numbered by decreasing average turnover probability, so
+    Cluster 1 is the riskiest segment.
+    
+    Args:
+        predictions: DataFrame with predictions
+        n_clusters: Number of clusters
+        features: Columns to cluster on (defaults to the available KMEANS_FEATURES)
+        batch_size: Rows per MiniBatchKMeans step
+        random_state: Seed for initialization and batches
+    
+    Returns:
+        Tuple of (int8 codes, list of labels)
+    """
+    if features is None:
+        features = [col for col in KMEANS_FEATURES if col in predictions.columns]
+    features = tuple(features)
+    
+    def compute():
+        X = _kmeans_matrix(predictions, features)
+        n = min(n_clusters, len(X))
+        model = MiniBatchKMeans(n_clusters=n, batch_size=batch_size, n_init=3, random_state=random_state)
+        codes = model.fit_predict(X)
+        
+        # Renumber by decreasing average risk
+        if 'Turnover_Probability' in predictions.columns:
+            risk = np.nan_to_num(predictions['Turnover_Probability'].to_numpy(dtype=np.float64, na_value=np.nan))
+            mean_risk = np.bincount(codes, weights=risk, minlength=n) / np.maximum(np.bincount(codes, minlength=n), 1)
+            rank = np.empty(n, dtype=np.int8)
+            rank[np.argsort(-mean_risk, kind='stable')] = np.arange(n)
+            codes = rank[codes]
+        
+        return codes.astype(np.int8), [f"Cluster {i + 1}" for i in range(n)]
+    
+    key = (predictions_fingerprint(predictions), 'kmeans_clusters', n_clusters, features, batch_size, random_state)
+    
+    return aggregate_cache.get_or_compute(key, compute)
+
+def cluster_stats(predictions, codes, labels):
+    """
+    Headcount and column averages per cluster.
+    
+    Args:
+        predictions: DataFrame with predictions
+        codes: Cluster code of every employee
+        labels: Cluster labels, indexed by code
+    
+    Returns:
+        DataFrame with Cluster, Count and one average column per
+        STATS_COLUMNS entry present in predictions
+    """
+    n = len(labels)
+    stats = {'Cluster': labels, 'Count': np.bincount(codes, minlength=n)}
+    
+    for column, name in STATS_COLUMNS:
+        if column in predictions.columns:
+            values = predictions[column].to_numpy(dtype=np.float64, na_value=np.nan)
+            present = ~np.isnan(values)
+            totals = np.bincount(codes[present], weights=values[present], minlength=n)
+            counts = np.bincount(codes[present], minlength=n)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                stats[name] = totals / counts
+    
+    return pd.DataFrame(stats)
+
+def cluster_examples(codes, n_clusters, k=3):
+    """
+    Row positions of the first k employees of each cluster.
+    
+    Args:
+        codes: Cluster code of every employee
+        n_clusters: Number of clusters
+        k: Examples per cluster
+    
+    Returns:
+        List of position arrays, indexed by code
+    """
+    # A stable sort groups rows by cluster while keeping their original order
+    order = np.argsort(codes, kind='stable')
+    starts = np.searchsorted(codes[order], np.arange(n_clusters))
+    ends = np.searchsorted(codes[order], np.arange(n_clusters), side='right')
+    
+    return [order[start:min(end, start + k)] for start, end in zip(starts, ends)]
+
+def plot_positions(n_rows, max_points=MAX_PLOT_POINTS, random_state=42):
+    """
+    Row positions to draw in a scatter plot of n_rows employees.
+    
+    Args:
+        n_rows: Number of employees
+        max_points: Maximum number of points drawn
+        random_state: Seed for the sample
+    
+    Returns:
+        Sorted array of positions (all rows when they fit)
+    """
+    if n_rows <= max_points:
+        return np.arange(n_rows)
+    
+    rng = np.random.default_rng(random_state)
+    return np.sort(rng.choice(n_rows, max_points, replace=False))
@@ -5,34 +5,128 @@ from sklearn.compose import ColumnTransformer
 from sklearn.impute import SimpleImputer
 from sklearn.pipeline import Pipeline
 from sklearn.model_selection import train_test_split
-from datetime import datetime
+from sklearn.base import BaseEstimator, TransformerMixin
 import re
+import scipy.sparse as sp
 
-def calculate_years_at_company(hire_date):
+from utils.utils import calculate_years_at_company, compute_years_at_company
+
+# Density below which sparse='auto' keeps the features matrix in CSR format
+# (the ColumnTransformer default)
+SPARSE_THRESHOLD = 0.3
+
+def derived_feature_columns(features, as_of_date=None):
     """
-    Calculate years at company based on hire date.
+    Compute features derived from raw columns that are missing from the data.
+    
+    Currently computes Years_At_Company from Hire_Date when it is missing.
     
     Args:
-        hire_date: Hire date string
+        features: DataFrame with employee data
+        as_of_date: Reference date for tenure (defaults to today)
     
     Returns:
-        Years at company as float
+        Dictionary mapping new column names to arrays aligned with the rows
+    """
+    derived = {}
+    
+    if 'Years_At_Company' not in features.columns and 'Hire_Date' in features.columns:
+        derived['Years_At_Company'] = compute_years_at_company(features['Hire_Date'], as_of_date).to_numpy()
+    
+    return derived
+
+def add_derived_features(features, as_of_date=None):
+    """
+    Add features derived from raw columns, shared by training and scoring.
+    
+    Args:
+        features: DataFrame with employee data
+        as_of_date: Reference date for tenure (defaults to today)
+    
+    Returns:
+        DataFrame with derived features (the input frame if nothing was added)
+    """
+    derived = derived_feature_columns(features, as_of_date)
+    
+    return features.assign(**derived) if derived else features
+
+def is_categorical_column(column):
+    """
+    Check whether a column holds labels rather than numbers.
+    
+    Args:
+        column: Pandas Series
+    
+    Returns:
+        True for object, string, categorical and boolean columns
+    """
+    return (pd.api.types.is_object_dtype(column) or
+            pd.api.types.is_string_dtype(column) or
+            isinstance(column.dtype, pd.CategoricalDtype) or
+            pd.api.types.is_bool_dtype(column))
+
+class CategoricalFrameEncoder(BaseEstimator, TransformerMixin):
     """
-    try:
-        # Convert string to datetime
-        if isinstance(hire_date, str):
-            hire_date = pd.to_datetime(hire_date)
+    Prepare a DataFrame for XGBoost's native categorical support.
+    
+    Categorical columns are converted to pandas category dtype with the
+    categories seen during fit (unseen values become missing) and numerical
+    columns to float32. Nothing is one-hot expanded, imputed or scaled;
+    XGBoost splits on categories directly and routes missing values itself.
+    
+    Args:
+        numerical_columns: Columns passed through as numbers
+        categorical_columns: Columns passed through as categories
+    """
+    
+    def __init__(self, numerical_columns=None, categorical_columns=None):
+        self.numerical_columns = numerical_columns
+        self.categorical_columns = categorical_columns
+    
+    @staticmethod
+    def _labels(column):
+        # XGBoost needs string or integer categories, so low-cardinality
+        # numeric columns are labelled through float64 (3 and 3.0 agree)
+        values = column
+        if pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column):
+            values = column.astype('float64')
         
-        # Calculate years at company
-        today = datetime.now()
-        years = (today - hire_date).days / 365.25
+        return values.astype(str).where(column.notna())
+    
+    def fit(self, X, y=None):
+        self.categories_ = {
+            col: pd.Categorical(self._labels(X[col]).dropna()).categories
+            for col in (self.categorical_columns or [])
+        }
+        self.feature_names_ = list(self.numerical_columns or []) + list(self.categorical_columns or [])
+        return self
+    
+    def transform(self, X):
+        columns = {col: X[col].to_numpy(dtype=np.float32, na_value=np.nan) for col in (self.numerical_columns or [])}
+        for col, categories in self.categories_.items():
+            columns[col] = pd.Categorical(self._labels(X[col]), categories=categories)
         
-        return round(years, 1)
-    except:
-        # Return NaN if calculation fails
-        return np.nan
+        return pd.DataFrame(columns, index=X.index)[self.feature_names_]
+    
+    def get_feature_names_out(self, input_features=None):
+        return np.asarray(self.feature_names_, dtype=object)
+
+def has_categorical_columns(X):
+    """
+    Check whether a features matrix comes from the native categorical pipeline.
+    
+    Args:
+        X: Features matrix (array, sparse matrix or DataFrame)
+    
+    Returns:
+        True if X is a DataFrame with category columns
+    """
+    return isinstance(X, pd.DataFrame) and any(
+        isinstance(dtype, pd.CategoricalDtype) for dtype in X.dtypes
+    )
 
-def preprocess_data(df, target_column, id_column):
+def preprocess_data(df, target_column, id_column, as_of_date=None, sparse=False,
+                    sparse_threshold=SPARSE_THRESHOLD, encoding='onehot'):
     """
     Preprocess the input data for machine learning model.
     
@@ -40,6 +134,14 @@ def preprocess_data(df, target_column, id_column):
         df: Pandas DataFrame with the input data
         target_column: Name of the target column
         id_column: Name of the ID column
+        as_of_date: Reference date for derived tenure (defaults to today)
+        sparse: Output format of the features matrix: False for a dense
+            array, True for a CSR matrix, or 'auto' for CSR only when the
+            fraction of non-zero values is below sparse_threshold
+        sparse_threshold: Density below which 'auto' produces a CSR matrix
+        encoding: 'onehot' to impute, scale and one-hot encode, or 'native'
+            to return a DataFrame with category columns for XGBoost's
+            native categorical support (sparse is ignored)
     
     Returns:
         X: Features matrix
@@ -47,6 +149,11 @@ def preprocess_data(df, target_column, id_column):
         preprocessor: Fitted preprocessor object
         feature_names: List of feature names after preprocessing
     """
+    if sparse not in (False, True, 'auto'):
+        raise ValueError(f"Unsupported sparse mode: {sparse}")
+    if encoding not in ('onehot', 'native'):
+        raise ValueError(f"Unsupported encoding: {encoding}")
+    
     # Make a copy to avoid modifying the original data
     data = df.copy()
     
@@ -57,24 +164,28 @@ def preprocess_data(df, target_column, id_column):
     features = data.drop([target_column, id_column], axis=1)
     
     # Calculate years at company if not present and hire date is available
-    if 'Years_At_Company' not in features.columns and 'Hire_Date' in features.columns:
-        features['Years_At_Company'] = features['Hire_Date'].apply(
-            lambda x: calculate_years_at_company(x)
-        )
+    features = add_derived_features(features, as_of_date)
     
     # Identify column types
     categorical_cols = [col for col in features.columns if 
-                        features[col].dtype == 'object' or
+                        is_categorical_column(features[col]) or
                         features[col].nunique() < 10]
     
     numerical_cols = [col for col in features.columns if 
-                     features[col].dtype in ['int64', 'float64'] and 
+                     pd.api.types.is_numeric_dtype(features[col]) and 
                      col not in categorical_cols]
     
+    # Native categorical path: one feature per column, no expansion
+    if encoding == 'native':
+        preprocessor = CategoricalFrameEncoder(numerical_cols, categorical_cols).fit(features)
+        X = preprocessor.transform(features)
+        
+        return X, y, preprocessor, preprocessor.feature_names_
+    
     # Define preprocessing for categorical and numerical features
     categorical_transformer = Pipeline([
         ('imputer', SimpleImputer(strategy='most_frequent')),
-        ('onehot', OneHotEncoder(handle_unknown='ignore', sparse_output=False))
+        ('onehot', OneHotEncoder(handle_unknown='ignore', sparse_output=bool(sparse)))
     ])
     
     numerical_transformer = Pipeline([
@@ -88,12 +199,17 @@ def preprocess_data(df, target_column, id_column):
             ('num', numerical_transformer, numerical_cols),
             ('cat', categorical_transformer, categorical_cols)
         ],
-        remainder='drop'
+        remainder='drop',
+        sparse_threshold=sparse_threshold if sparse == 'auto' else 1.0
     )
     
     # Fit and transform the data
     X = preprocessor.fit_transform(features)
     
+    # A matrix with no sparse blocks (e.g. no categorical columns) is stacked densely
+    if sparse is True and not sp.issparse(X):
+        X = sp.csr_matrix(X)
+    
     # Get feature names
     onehot_cols = []
     if categorical_cols:
@@ -1,54 +1,303 @@
 import sqlite3
 import pandas as pd
 import pickle
-import io
+import json
+import hashlib
 import os
+import threading
+from contextlib import contextmanager
+
+from model_cache import model_cache
+
+# Database file location; override with the HR_ANALYTICS_DB environment variable
+DB_PATH = os.environ.get('HR_ANALYTICS_DB', 'hr_analytics.db')
+
+# Seconds a connection waits on a locked database before raising
+BUSY_TIMEOUT = 30
+
+# Pragmas applied to every pooled connection. WAL lets readers proceed while a
+# writer is active, and NORMAL synchronous is safe under WAL.
+CONNECTION_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'temp_store': 'MEMORY',
+    'cache_size': -64000,
+    'mmap_size': 268435456
+}
+
+_local = threading.local()
+
+def set_db_path(path):
+    """
+    Point the access layer at a different database file.
+    
+    Args:
+        path: Path to the SQLite database file
+    """
+    global DB_PATH
+    close_connection()
+    DB_PATH = path
+
+def get_connection():
+    """
+    Get the pooled connection for the current thread, opening it if needed.
+    
+    Each thread keeps a single long-lived connection so that repeated calls
+    on a Streamlit rerun do not pay the cost of opening the file again.
+    
+    Returns:
+        sqlite3.Connection
+    """
+    conn = getattr(_local, 'conn', None)
+    if conn is not None and _local.path == DB_PATH:
+        return conn
+    
+    close_connection()
+    
+    # Autocommit mode: reads never hold an implicit transaction open, and
+    # writes are grouped explicitly with transaction()
+    conn = sqlite3.connect(DB_PATH, timeout=BUSY_TIMEOUT, isolation_level=None)
+    for pragma, value in CONNECTION_PRAGMAS.items():
+        conn.execute(f'PRAGMA {pragma} = {value}')
+    
+    _local.conn = conn
+    _local.path = DB_PATH
+    
+    return conn
+
+def close_connection():
+    """
+    Close the current thread's pooled connection, if any.
+    """
+    conn = getattr(_local, 'conn', None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+
+@contextmanager
+def transaction():
+    """
+    Run a block of statements as one write transaction.
+    
+    The transaction is started with BEGIN IMMEDIATE so that concurrent writers
+    queue on the busy timeout instead of failing part-way through with
+    "database is locked". Commits on success and rolls back on error.
+    
+    Yields:
+        sqlite3.Cursor
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute('BEGIN IMMEDIATE')
+    try:
+        yield cursor
+    except BaseException:
+        conn.rollback()
+        raise
+    else:
+        conn.commit()
+    finally:
+        cursor.close()
 
 def create_tables():
     """
     Create database tables if they don't exist.
     """
-    conn = sqlite3.connect('hr_analytics.db')
-    cursor = conn.cursor()
+    with transaction() as cursor:
+        # Create sessions table
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            data BLOB,
+            predictions BLOB,
+            model BLOB,
+            preprocessor BLOB,
+            feature_names BLOB,
+            model_type TEXT,
+            is_training_session BOOLEAN DEFAULT 1,
+            used_model_id INTEGER,
+            model_hash TEXT,
+            notes TEXT
+        )
+        ''')
+    
+        # Create pretrained models table
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS trained_models (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            model_type TEXT NOT NULL,
+            model BLOB,
+            preprocessor BLOB,
+            feature_names BLOB,
+            metrics BLOB,
+            metrics_json TEXT,
+            content_hash TEXT,
+            training_data_size INTEGER,
+            notes TEXT
+        )
+        ''')
+    
+        # Create columnar session store: one row per DataFrame column so that
+        # individual columns can be loaded without unpickling the whole frame
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS session_columns (
+            session_id INTEGER NOT NULL,
+            frame TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            column_name TEXT NOT NULL,
+            payload BLOB,
+            PRIMARY KEY (session_id, frame, position)
+        )
+        ''')
+    
+        # Create session artifacts table (model, preprocessor, feature names)
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS session_artifacts (
+            session_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            payload BLOB,
+            PRIMARY KEY (session_id, name)
+        )
+        ''')
+        
+        # Create model artifacts table so that model listings never read model bytes
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS model_artifacts (
+            model_id INTEGER PRIMARY KEY,
+            model BLOB,
+            preprocessor BLOB,
+            feature_names BLOB
+        )
+        ''')
+        
+        # Metrics are stored as JSON text so they can be read (and queried
+        # with json_extract) without unpickling anything
+        _ensure_column(cursor, 'trained_models', 'metrics_json', 'TEXT')
+        
+        # Hash of the serialized artifacts, used as part of the model cache key
+        _ensure_column(cursor, 'trained_models', 'content_hash', 'TEXT')
+        
+        # Content hash of the trained model a prediction session was scored with
+        _ensure_column(cursor, 'sessions', 'model_hash', 'TEXT')
+        
+        # Indexes for listing, lookup by name and latest-model-by-type queries
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_sessions_created_at ON sessions (created_at)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_sessions_name ON sessions (name)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_sessions_model_hash ON sessions (model_hash)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_trained_models_created_at ON trained_models (created_at)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_trained_models_name ON trained_models (name)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_trained_models_type_created ON trained_models (model_type, created_at)')
+    
+    # Move sessions and models saved in the old whole-object format
+    migrate_legacy_sessions()
+    migrate_legacy_models()
+
+def _ensure_column(cursor, table, column, declaration):
+    """
+    Add a column to an existing table if it is missing.
     
-    # Create sessions table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS sessions (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        data BLOB,
-        predictions BLOB,
-        model BLOB,
-        preprocessor BLOB,
-        feature_names BLOB,
-        model_type TEXT,
-        is_training_session BOOLEAN DEFAULT 1,
-        used_model_id INTEGER,
-        notes TEXT
+    Args:
+        cursor: Open database cursor
+        table: Table name
+        column: Column name
+        declaration: Column type declaration
+    """
+    cursor.execute(f'PRAGMA table_info({table})')
+    if column not in [row[1] for row in cursor.fetchall()]:
+        cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {declaration}')
+
+def _write_session_frame(cursor, session_id, frame_name, frame):
+    """
+    Write a DataFrame to the columnar session store, one row per column.
+    
+    Args:
+        cursor: Open database cursor
+        session_id: Session ID
+        frame_name: Name of the frame ('data' or 'predictions')
+        frame: DataFrame to store (None stores nothing)
+    """
+    cursor.execute('DELETE FROM session_columns WHERE session_id = ? AND frame = ?', (session_id, frame_name))
+    
+    if frame is None:
+        return
+    
+    rows = (
+        (session_id, frame_name, position, str(column),
+         pickle.dumps(frame.iloc[:, position], protocol=pickle.HIGHEST_PROTOCOL))
+        for position, column in enumerate(frame.columns)
     )
-    ''')
+    cursor.executemany('''
+    INSERT INTO session_columns (session_id, frame, position, column_name, payload)
+    VALUES (?, ?, ?, ?, ?)
+    ''', rows)
+
+def _write_session_artifacts(cursor, session_id, artifacts):
+    """
+    Write session artifacts (model, preprocessor, feature names).
+    
+    Args:
+        cursor: Open database cursor
+        session_id: Session ID
+        artifacts: Dictionary mapping artifact name to object (None values are skipped)
+    """
+    cursor.execute('DELETE FROM session_artifacts WHERE session_id = ?', (session_id,))
+    
+    cursor.executemany('''
+    INSERT INTO session_artifacts (session_id, name, payload) VALUES (?, ?, ?)
+    ''', [(session_id, name, pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+          for name, obj in artifacts.items() if obj is not None])
+
+def migrate_legacy_sessions():
+    """
+    Move sessions stored as whole-object pickle BLOBs into the columnar store.
+    
+    Sessions are migrated one at a time so that only a single session is held
+    in memory. The legacy BLOB columns are cleared afterwards; run VACUUM
+    manually to reclaim the freed space in hr_analytics.db.
+    
+    Returns:
+        Number of migrated sessions
+    """
+    cursor = get_connection().cursor()
     
-    # Create pretrained models table
     cursor.execute('''
-    CREATE TABLE IF NOT EXISTS trained_models (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        model_type TEXT NOT NULL,
-        model BLOB,
-        preprocessor BLOB,
-        feature_names BLOB,
-        metrics BLOB,
-        training_data_size INTEGER,
-        notes TEXT
-    )
+    SELECT id FROM sessions
+    WHERE data IS NOT NULL OR predictions IS NOT NULL OR model IS NOT NULL
+       OR preprocessor IS NOT NULL OR feature_names IS NOT NULL
     ''')
-    
-    conn.commit()
-    conn.close()
+    legacy_ids = [row[0] for row in cursor.fetchall()]
+    
+    for session_id in legacy_ids:
+        # One transaction per session keeps memory and lock time bounded
+        with transaction() as cursor:
+            cursor.execute('''
+            SELECT data, predictions, model, preprocessor, feature_names
+            FROM sessions WHERE id = ?
+            ''', (session_id,))
+            result = cursor.fetchone()
+            objects = [pickle.loads(blob) if blob is not None else None for blob in result]
+            
+            _write_session_frame(cursor, session_id, 'data', objects[0])
+            _write_session_frame(cursor, session_id, 'predictions', objects[1])
+            _write_session_artifacts(cursor, session_id, {
+                'model': objects[2],
+                'preprocessor': objects[3],
+                'feature_names': objects[4]
+            })
+            
+            cursor.execute('''
+            UPDATE sessions
+            SET data = NULL, predictions = NULL, model = NULL, preprocessor = NULL, feature_names = NULL
+            WHERE id = ?
+            ''', (session_id,))
+    
+    return len(legacy_ids)
 
-def save_session(name, data, predictions, model, preprocessor, feature_names, model_type=None, is_training_session=True, used_model_id=None, notes=None):
+def save_session(name, data, predictions, model, preprocessor, feature_names, model_type=None, is_training_session=True, used_model_id=None, notes=None, model_hash=None):
     """
     Save a session to the database.
     
@@ -63,42 +312,46 @@ def save_session(name, data, predictions, model, preprocessor, feature_names, mo
         is_training_session: Whether this session included model training
         used_model_id: ID of pretrained model used for prediction (if not training)
         notes: Additional notes about the session
-    """
-    conn = sqlite3.connect('hr_analytics.db')
-    cursor = conn.cursor()
-    
-    # Serialize the data
-    data_bytes = pickle.dumps(data)
-    predictions_bytes = pickle.dumps(predictions)
-    model_bytes = pickle.dumps(model) if model is not None else None
-    preprocessor_bytes = pickle.dumps(preprocessor) if preprocessor is not None else None
-    feature_names_bytes = pickle.dumps(feature_names) if feature_names is not None else None
-    
-    # Check if session with the same name exists
-    cursor.execute('SELECT id FROM sessions WHERE name = ?', (name,))
-    existing = cursor.fetchone()
-    
-    if existing:
-        # Update existing session
-        cursor.execute('''
-        UPDATE sessions 
-        SET data = ?, predictions = ?, model = ?, preprocessor = ?, feature_names = ?, 
-            model_type = ?, is_training_session = ?, used_model_id = ?, notes = ?,
-            created_at = CURRENT_TIMESTAMP
-        WHERE id = ?
-        ''', (data_bytes, predictions_bytes, model_bytes, preprocessor_bytes, feature_names_bytes, 
-              model_type, is_training_session, used_model_id, notes, existing[0]))
-    else:
-        # Insert new session
-        cursor.execute('''
-        INSERT INTO sessions (name, data, predictions, model, preprocessor, feature_names, 
-                            model_type, is_training_session, used_model_id, notes)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (name, data_bytes, predictions_bytes, model_bytes, preprocessor_bytes, feature_names_bytes,
-              model_type, is_training_session, used_model_id, notes))
+        model_hash: Content hash of the trained model used for prediction
+            (see get_trained_model_hash); stored predictions are only reused
+            for a model with the same hash
     
-    conn.commit()
-    conn.close()
+    Returns:
+        ID of the saved session
+    """
+    with transaction() as cursor:
+        # Check if session with the same name exists
+        cursor.execute('SELECT id FROM sessions WHERE name = ?', (name,))
+        existing = cursor.fetchone()
+    
+        if existing:
+            # Update existing session metadata
+            cursor.execute('''
+            UPDATE sessions 
+            SET data = NULL, predictions = NULL, model = NULL, preprocessor = NULL, feature_names = NULL, 
+                model_type = ?, is_training_session = ?, used_model_id = ?, model_hash = ?, notes = ?,
+                created_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+            ''', (model_type, is_training_session, used_model_id, model_hash, notes, existing[0]))
+            session_id = existing[0]
+        else:
+            # Insert new session metadata
+            cursor.execute('''
+            INSERT INTO sessions (name, model_type, is_training_session, used_model_id, model_hash, notes)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ''', (name, model_type, is_training_session, used_model_id, model_hash, notes))
+            session_id = cursor.lastrowid
+    
+        # Store frames column by column and artifacts separately
+        _write_session_frame(cursor, session_id, 'data', data)
+        _write_session_frame(cursor, session_id, 'predictions', predictions)
+        _write_session_artifacts(cursor, session_id, {
+            'model': model,
+            'preprocessor': preprocessor,
+            'feature_names': feature_names
+        })
+    
+    return session_id
 
 def load_sessions():
     """
@@ -107,16 +360,90 @@ def load_sessions():
     Returns:
         List of tuples (id, name, created_at)
     """
-    conn = sqlite3.connect('hr_analytics.db')
-    cursor = conn.cursor()
+    cursor = get_connection().cursor()
     
-    cursor.execute('SELECT id, name, created_at FROM sessions ORDER BY created_at DESC')
+    cursor.execute('SELECT id, name, created_at FROM sessions ORDER BY created_at DESC, id DESC')
     sessions = cursor.fetchall()
     
-    conn.close()
-    
     return sessions
 
+def load_session_columns(session_id, frame='predictions'):
+    """
+    List the columns stored for a session frame without loading any data.
+    
+    Args:
+        session_id: Session ID
+        frame: Name of the frame ('data' or 'predictions')
+    
+    Returns:
+        List of column names in their original order
+    """
+    cursor = get_connection().cursor()
+    
+    cursor.execute('''
+    SELECT column_name FROM session_columns
+    WHERE session_id = ? AND frame = ?
+    ORDER BY position
+    ''', (session_id, frame))
+    columns = [row[0] for row in cursor.fetchall()]
+    
+    return columns
+
+def load_session_frame(session_id, frame='predictions', columns=None):
+    """
+    Load a session frame, optionally restricted to a subset of columns.
+    
+    Only the requested columns are read and unpickled.
+    
+    Args:
+        session_id: Session ID
+        frame: Name of the frame ('data' or 'predictions')
+        columns: List of column names to load (None loads all columns)
+    
+    Returns:
+        DataFrame, or None if the session has no stored frame
+    """
+    cursor = get_connection().cursor()
+    
+    if columns is None:
+        cursor.execute('''
+        SELECT payload FROM session_columns
+        WHERE session_id = ? AND frame = ?
+        ORDER BY position
+        ''', (session_id, frame))
+    else:
+        names = [str(column) for column in columns]
+        placeholders = ', '.join('?' * len(names))
+        cursor.execute(f'''
+        SELECT payload FROM session_columns
+        WHERE session_id = ? AND frame = ? AND column_name IN ({placeholders})
+        ORDER BY position
+        ''', (session_id, frame, *names))
+    payloads = [row[0] for row in cursor.fetchall()]
+    
+    if not payloads:
+        return None
+    
+    return pd.concat([pickle.loads(payload) for payload in payloads], axis=1)
+
+def load_session_artifact(session_id, name):
+    """
+    Load a single session artifact.
+    
+    Args:
+        session_id: Session ID
+        name: Artifact name ('model', 'preprocessor' or 'feature_names')
+    
+    Returns:
+        The stored object, or None if it was not saved
+    """
+    cursor = get_connection().cursor()
+    
+    cursor.execute('SELECT payload FROM session_artifacts WHERE session_id = ? AND name = ?', (session_id, name))
+    result = cursor.fetchone()
+    
+    return pickle.loads(result[0]) if result is not None else None
+
 def load_session_data(session_id):
     """
     Load data for a specific session.
@@ -127,28 +454,21 @@ def load_session_data(session_id):
     Returns:
         Tuple of (data, predictions, model, preprocessor, feature_names, model_type, is_training_session, used_model_id, notes)
     """
-    conn = sqlite3.connect('hr_analytics.db')
-    cursor = conn.cursor()
+    cursor = get_connection().cursor()
     
     cursor.execute('''
-    SELECT data, predictions, model, preprocessor, feature_names, 
-           model_type, is_training_session, used_model_id, notes 
+    SELECT model_type, is_training_session, used_model_id, notes 
     FROM sessions WHERE id = ?
     ''', (session_id,))
     result = cursor.fetchone()
     
-    conn.close()
-    
     if result:
-        data = pickle.loads(result[0]) if result[0] is not None else None
-        predictions = pickle.loads(result[1]) if result[1] is not None else None
-        model = pickle.loads(result[2]) if result[2] is not None else None
-        preprocessor = pickle.loads(result[3]) if result[3] is not None else None
-        feature_names = pickle.loads(result[4]) if result[4] is not None else None
-        model_type = result[5]
-        is_training_session = result[6]
-        used_model_id = result[7]
-        notes = result[8]
+        data = load_session_frame(session_id, 'data')
+        predictions = load_session_frame(session_id, 'predictions')
+        model = load_session_artifact(session_id, 'model')
+        preprocessor = load_session_artifact(session_id, 'preprocessor')
+        feature_names = load_session_artifact(session_id, 'feature_names')
+        model_type, is_training_session, used_model_id, notes = result
         
         return data, predictions, model, preprocessor, feature_names, model_type, is_training_session, used_model_id, notes
     
@@ -161,39 +481,114 @@ def delete_session(session_id):
     Args:
         session_id: Session ID
     """
-    conn = sqlite3.connect('hr_analytics.db')
-    cursor = conn.cursor()
+    with transaction() as cursor:
+        cursor.execute('DELETE FROM session_columns WHERE session_id = ?', (session_id,))
+        cursor.execute('DELETE FROM session_artifacts WHERE session_id = ?', (session_id,))
+        cursor.execute('DELETE FROM sessions WHERE id = ?', (session_id,))
+
+def _to_json_value(value):
+    """
+    Convert numpy scalars and arrays to plain Python objects for JSON.
+    """
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _content_hash(*blobs):
+    """
+    Hash serialized model artifacts (None entries are skipped).
+    """
+    digest = hashlib.sha256()
+    for blob in blobs:
+        if blob is not None:
+            digest.update(blob)
+    return digest.hexdigest()
+
+def _dump_metrics(metrics):
+    """
+    Serialize a metrics dictionary to JSON text (None stays None).
+    """
+    return json.dumps(metrics, default=_to_json_value) if metrics is not None else None
+
+def migrate_legacy_models():
+    """
+    Move model BLOBs out of trained_models and convert pickled metrics to JSON.
+    
+    Models are migrated one at a time. Like migrate_legacy_sessions, the old
+    BLOB columns are cleared but the file is not vacuumed.
     
-    cursor.execute('DELETE FROM sessions WHERE id = ?', (session_id,))
+    Returns:
+        Number of migrated models
+    """
+    cursor = get_connection().cursor()
+    
+    cursor.execute('''
+    SELECT id FROM trained_models
+    WHERE model IS NOT NULL OR preprocessor IS NOT NULL
+       OR feature_names IS NOT NULL OR metrics IS NOT NULL
+    ''')
+    legacy_ids = [row[0] for row in cursor.fetchall()]
+    
+    for model_id in legacy_ids:
+        with transaction() as cursor:
+            cursor.execute('''
+            SELECT model, preprocessor, feature_names, metrics
+            FROM trained_models WHERE id = ?
+            ''', (model_id,))
+            model_bytes, preprocessor_bytes, feature_names_bytes, metrics_bytes = cursor.fetchone()
+            
+            # Artifacts are copied as-is, only the metrics need unpickling
+            if model_bytes is not None:
+                cursor.execute('''
+                INSERT OR REPLACE INTO model_artifacts (model_id, model, preprocessor, feature_names)
+                VALUES (?, ?, ?, ?)
+                ''', (model_id, model_bytes, preprocessor_bytes, feature_names_bytes))
+            
+            metrics = pickle.loads(metrics_bytes) if metrics_bytes is not None else None
+            
+            cursor.execute('''
+            UPDATE trained_models
+            SET model = NULL, preprocessor = NULL, feature_names = NULL, metrics = NULL,
+                metrics_json = COALESCE(metrics_json, ?),
+                content_hash = ?
+            WHERE id = ?
+            ''', (_dump_metrics(metrics),
+                  _content_hash(model_bytes, preprocessor_bytes, feature_names_bytes),
+                  model_id))
+    
+    # Models migrated before content hashes existed
+    cursor = get_connection().cursor()
+    cursor.execute('''
+    SELECT m.id, a.model, a.preprocessor, a.feature_names
+    FROM trained_models m JOIN model_artifacts a ON a.model_id = m.id
+    WHERE m.content_hash IS NULL
+    ''')
+    for model_id, *blobs in cursor.fetchall():
+        with transaction() as update_cursor:
+            update_cursor.execute('UPDATE trained_models SET content_hash = ? WHERE id = ?',
+                                  (_content_hash(*blobs), model_id))
     
-    conn.commit()
-    conn.close()
+    return len(legacy_ids)
 
-def save_trained_model(name, model_type, model, preprocessor, feature_names, metrics=None, training_data_size=None, notes=None):
+def _write_trained_model(cursor, name, model_type, model, preprocessor, feature_names, metrics=None, training_data_size=None, notes=None):
     """
-    Save a trained model to the database.
+    Insert or update a trained model inside an open transaction.
     
     Args:
-        name: Model name
-        model_type: Type of model (XGBoost, RandomForest, etc.)
-        model: Trained model object
-        preprocessor: Fitted preprocessor
-        feature_names: List of feature names
-        metrics: Dictionary with evaluation metrics
-        training_data_size: Size of the training dataset
-        notes: Additional notes about the model
+        cursor: Open database cursor
+        (remaining arguments as for save_trained_model)
     
     Returns:
         ID of the saved model
     """
-    conn = sqlite3.connect('hr_analytics.db')
-    cursor = conn.cursor()
-    
     # Serialize the data
     model_bytes = pickle.dumps(model)
     preprocessor_bytes = pickle.dumps(preprocessor)
     feature_names_bytes = pickle.dumps(feature_names)
-    metrics_bytes = pickle.dumps(metrics) if metrics is not None else None
+    metrics_json = _dump_metrics(metrics)
+    content_hash = _content_hash(model_bytes, preprocessor_bytes, feature_names_bytes)
     
     # Check if model with the same name and type exists
     cursor.execute('SELECT id FROM trained_models WHERE name = ? AND model_type = ?', (name, model_type))
@@ -203,28 +598,74 @@ def save_trained_model(name, model_type, model, preprocessor, feature_names, met
         # Update existing model
         cursor.execute('''
         UPDATE trained_models 
-        SET model = ?, preprocessor = ?, feature_names = ?, 
-            metrics = ?, training_data_size = ?, notes = ?,
+        SET metrics_json = ?, content_hash = ?, training_data_size = ?, notes = ?,
             created_at = CURRENT_TIMESTAMP
         WHERE id = ?
-        ''', (model_bytes, preprocessor_bytes, feature_names_bytes, 
-              metrics_bytes, training_data_size, notes, existing[0]))
+        ''', (metrics_json, content_hash, training_data_size, notes, existing[0]))
         model_id = existing[0]
     else:
         # Insert new model
         cursor.execute('''
-        INSERT INTO trained_models (name, model_type, model, preprocessor, feature_names, 
-                                 metrics, training_data_size, notes)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (name, model_type, model_bytes, preprocessor_bytes, feature_names_bytes,
-              metrics_bytes, training_data_size, notes))
+        INSERT INTO trained_models (name, model_type, metrics_json, content_hash, training_data_size, notes)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ''', (name, model_type, metrics_json, content_hash, training_data_size, notes))
         model_id = cursor.lastrowid
     
-    conn.commit()
-    conn.close()
+    # Model bytes live in their own table so listings never read them
+    cursor.execute('''
+    INSERT OR REPLACE INTO model_artifacts (model_id, model, preprocessor, feature_names)
+    VALUES (?, ?, ?, ?)
+    ''', (model_id, model_bytes, preprocessor_bytes, feature_names_bytes))
+    
+    return model_id
+
+def save_trained_model(name, model_type, model, preprocessor, feature_names, metrics=None, training_data_size=None, notes=None):
+    """
+    Save a trained model to the database.
+    
+    Args:
+        name: Model name
+        model_type: Type of model (XGBoost, RandomForest, etc.)
+        model: Trained model object
+        preprocessor: Fitted preprocessor
+        feature_names: List of feature names
+        metrics: Dictionary with evaluation metrics
+        training_data_size: Size of the training dataset
+        notes: Additional notes about the model
+    
+    Returns:
+        ID of the saved model
+    """
+    with transaction() as cursor:
+        model_id = _write_trained_model(cursor, name, model_type, model, preprocessor, feature_names,
+                                        metrics, training_data_size, notes)
+    
+    model_cache.invalidate(model_id)
     
     return model_id
 
+def save_trained_models(models):
+    """
+    Save several trained models in a single transaction.
+    
+    Either every model is saved or, on error, none is.
+    
+    Args:
+        models: List of dictionaries with the keyword arguments of
+            save_trained_model (name, model_type, model, preprocessor,
+            feature_names and optionally metrics, training_data_size, notes)
+    
+    Returns:
+        List of saved model IDs, in the order given
+    """
+    with transaction() as cursor:
+        model_ids = [_write_trained_model(cursor, **entry) for entry in models]
+    
+    for model_id in model_ids:
+        model_cache.invalidate(model_id)
+    
+    return model_ids
+
 def load_trained_models():
     """
     Load all trained model names and details.
@@ -232,51 +673,93 @@ def load_trained_models():
     Returns:
         List of tuples (id, name, model_type, created_at, training_data_size)
     """
-    conn = sqlite3.connect('hr_analytics.db')
-    cursor = conn.cursor()
+    cursor = get_connection().cursor()
     
     cursor.execute('''
     SELECT id, name, model_type, created_at, training_data_size 
     FROM trained_models 
-    ORDER BY created_at DESC
+    ORDER BY created_at DESC, id DESC
     ''')
     models = cursor.fetchall()
     
-    conn.close()
-    
     return models
 
+def load_model_metrics(model_ids):
+    """
+    Load evaluation metrics for one or more models without reading model bytes.
+    
+    Args:
+        model_ids: A model ID or a list of model IDs
+    
+    Returns:
+        Metrics dictionary (or None) for a single ID, otherwise a dictionary
+        mapping each model ID to its metrics dictionary (or None)
+    """
+    single = not isinstance(model_ids, (list, tuple, set))
+    ids = [model_ids] if single else list(model_ids)
+    
+    cursor = get_connection().cursor()
+    
+    placeholders = ', '.join('?' * len(ids))
+    cursor.execute(f'''
+    SELECT id, metrics_json FROM trained_models WHERE id IN ({placeholders})
+    ''', ids)
+    metrics = {row[0]: json.loads(row[1]) if row[1] is not None else None
+               for row in cursor.fetchall()}
+    
+    if single:
+        return metrics.get(ids[0])
+    return {model_id: metrics.get(model_id) for model_id in ids}
+
 def load_trained_model(model_id):
     """
     Load a trained model from the database.
     
+    Unpickled models are kept in the process-wide model cache, so repeated
+    loads of an unchanged model only read its metadata row.
+    
     Args:
         model_id: Model ID
     
     Returns:
         Tuple of (model, preprocessor, feature_names, metrics, model_type)
     """
-    conn = sqlite3.connect('hr_analytics.db')
-    cursor = conn.cursor()
+    cursor = get_connection().cursor()
     
     cursor.execute('''
-    SELECT model, preprocessor, feature_names, metrics, model_type
+    SELECT metrics_json, model_type, content_hash
     FROM trained_models WHERE id = ?
     ''', (model_id,))
     result = cursor.fetchone()
     
-    conn.close()
+    if not result:
+        return None, None, None, None, None
     
-    if result:
-        model = pickle.loads(result[0])
-        preprocessor = pickle.loads(result[1])
-        feature_names = pickle.loads(result[2])
-        metrics = pickle.loads(result[3]) if result[3] is not None else None
-        model_type = result[4]
-        
+    metrics = json.loads(result[0]) if result[0] is not None else None
+    model_type, content_hash = result[1], result[2]
+    
+    cached = model_cache.get(model_id, content_hash)
+    if cached is not None:
+        model, preprocessor, feature_names = cached
         return model, preprocessor, feature_names, metrics, model_type
     
-    return None, None, None, None, None
+    cursor.execute('''
+    SELECT model, preprocessor, feature_names
+    FROM model_artifacts WHERE model_id = ?
+    ''', (model_id,))
+    blobs = cursor.fetchone()
+    
+    if not blobs:
+        return None, None, None, None, None
+    
+    model = pickle.loads(blobs[0])
+    preprocessor = pickle.loads(blobs[1])
+    feature_names = pickle.loads(blobs[2])
+    
+    model_cache.put(model_id, content_hash, (model, preprocessor, feature_names),
+                    sum(len(blob) for blob in blobs if blob is not None))
+    
+    return model, preprocessor, feature_names, metrics, model_type
 
 def delete_trained_model(model_id):
     """
@@ -285,42 +768,105 @@ def delete_trained_model(model_id):
     Args:
         model_id: Model ID
     """
-    conn = sqlite3.connect('hr_analytics.db')
-    cursor = conn.cursor()
-    
-    cursor.execute('DELETE FROM trained_models WHERE id = ?', (model_id,))
+    with transaction() as cursor:
+        cursor.execute('DELETE FROM model_artifacts WHERE model_id = ?', (model_id,))
+        cursor.execute('DELETE FROM trained_models WHERE id = ?', (model_id,))
     
-    conn.commit()
-    conn.close()
+    model_cache.invalidate(model_id)
 
-def get_latest_model_by_type(model_type):
+def get_latest_model_id_by_type(model_type):
     """
-    Get the latest trained model by type.
+    Get the ID of the latest trained model of a given type.
+    
+    Uses the (model_type, created_at) index and never reads model bytes.
     
     Args:
         model_type: Type of model (XGBoost, RandomForest, etc.)
     
     Returns:
-        Tuple of (model_id, model, preprocessor, feature_names)
+        Model ID, or None if no model of this type exists
     """
-    conn = sqlite3.connect('hr_analytics.db')
-    cursor = conn.cursor()
+    cursor = get_connection().cursor()
     
     cursor.execute('''
-    SELECT id, model, preprocessor, feature_names
-    FROM trained_models 
+    SELECT id FROM trained_models 
     WHERE model_type = ? 
-    ORDER BY created_at DESC LIMIT 1
+    ORDER BY created_at DESC, id DESC LIMIT 1
     ''', (model_type,))
     result = cursor.fetchone()
     
-    conn.close()
+    return result[0] if result else None
+
+def get_trained_model_hash(model_id):
+    """
+    Get the content hash of a trained model's stored artifacts.
+    
+    The hash changes whenever the model is overwritten in place (saved
+    again under the same name and type), while its ID stays the same.
     
-    if result:
-        model_id = result[0]
-        model = pickle.loads(result[1])
-        preprocessor = pickle.loads(result[2])
-        feature_names = pickle.loads(result[3])
+    Args:
+        model_id: Model ID
+    
+    Returns:
+        Hex digest, or None if the model does not exist
+    """
+    cursor = get_connection().cursor()
+    
+    cursor.execute('SELECT content_hash FROM trained_models WHERE id = ?', (model_id,))
+    result = cursor.fetchone()
+    
+    return result[0] if result else None
+
+def get_latest_prediction_session_id(model_hash, column='Row_Hash'):
+    """
+    Get the ID of the latest prediction session scored with a given model.
+    
+    Sessions are matched on the content hash of the model rather than its
+    ID, so predictions of a model that has since been retrained in place
+    are never reused. Only sessions whose stored predictions include the
+    given column are considered, so sessions saved before row hashes were
+    recorded are skipped.
+    
+    Args:
+        model_hash: Content hash of the trained model used for scoring
+        column: Column the stored predictions must contain
+    
+    Returns:
+        Session ID, or None if no matching session exists (always None
+        when model_hash is None)
+    """
+    if model_hash is None:
+        return None
+    
+    cursor = get_connection().cursor()
+    
+    cursor.execute('''
+    SELECT s.id FROM sessions s
+    WHERE s.model_hash = ? AND s.is_training_session = 0
+      AND EXISTS (
+        SELECT 1 FROM session_columns c
+        WHERE c.session_id = s.id AND c.frame = 'predictions' AND c.column_name = ?
+      )
+    ORDER BY s.created_at DESC, s.id DESC LIMIT 1
+    ''', (model_hash, column))
+    result = cursor.fetchone()
+    
+    return result[0] if result else None
+
+def get_latest_model_by_type(model_type):
+    """
+    Get the latest trained model by type.
+    
+    Args:
+        model_type: Type of model (XGBoost, RandomForest, etc.)
+    
+    Returns:
+        Tuple of (model_id, model, preprocessor, feature_names)
+    """
+    model_id = get_latest_model_id_by_type(model_type)
+    
+    if model_id is not None:
+        model, preprocessor, feature_names, _, _ = load_trained_model(model_id)
         
         return model_id, model, preprocessor, feature_names
     
@@ -0,0 +1,436 @@
+"""
+Per-employee feature attributions (SHAP values) for the supported models.
+
+- XGBoost: the booster's native TreeSHAP (pred_contribs), in log-odds.
+- Random Forest: path-dependent TreeSHAP computed with numpy for all rows
+  at once, in probability of leaving.
+- Logistic Regression: exact linear contributions coef * (x - mean), with
+  the mean of the training features stored on the model, in log-odds.
+
+For every row the contributions plus the expected value add up to the
+model's output in those units.
+"""
+import weakref
+from math import factorial
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+import xgboost as xgb
+
+# Rows explained per batch; bounds the temporary arrays
+EXPLANATION_BATCH_SIZE = 10_000
+
+# Upper bound on elements of the per-batch TreeSHAP work arrays
+TREE_SHAP_BUDGET = 4_000_000
+
+# Leaves with at most this many path features get a lookup table of their
+# contributions for every combination of satisfied conditions
+TABLE_MAX_DEPTH = 8
+
+def contribution_units(model):
+    """
+    Units of the contributions returned for a model.
+    
+    Args:
+        model: Trained model
+    
+    Returns:
+        'probability' for Random Forest, 'log-odds' otherwise
+    """
+    return 'probability' if hasattr(model, 'estimators_') else 'log-odds'
+
+def _xgboost_contributions(model, X, batch_size):
+    """
+    Contributions from XGBoost's built-in TreeSHAP.
+    """
+    booster = model.get_booster()
+    
+    # Early-stopped models predict with their best iteration only
+    best_iteration = getattr(model, 'best_iteration', None)
+    iteration_range = (0, best_iteration + 1) if best_iteration is not None else (0, 0)
+    
+    enable_categorical = isinstance(X, pd.DataFrame) and any(
+        isinstance(dtype, pd.CategoricalDtype) for dtype in X.dtypes)
+    
+    values = np.empty((X.shape[0], X.shape[1]), dtype=np.float32)
+    expected_value = 0.0
+    for start in range(0, X.shape[0], batch_size):
+        batch = X.iloc[start:start + batch_size] if isinstance(X, pd.DataFrame) else X[start:start + batch_size]
+        matrix = xgb.DMatrix(batch, missing=model.missing, enable_categorical=enable_categorical)
+        contributions = booster.predict(matrix, pred_contribs=True, iteration_range=iteration_range)
+        values[start:start + len(contributions)] = contributions[:, :-1]
+        expected_value = float(contributions[0, -1])
+    
+    return values, expected_value
+
+def store_feature_means(model, X):
+    """
+    Keep the mean of the training features on a fitted linear model.
+    
+    The linear contributions are measured against these means, so an
+    employee's attributions do not depend on who else is explained with them.
+    
+    Args:
+        model: Fitted model (only linear models are changed)
+        X: Features the model was fitted on
+    
+    Returns:
+        The model
+    """
+    if hasattr(model, 'coef_'):
+        model.feature_means_ = np.asarray(X.mean(axis=0), dtype=np.float64).ravel()
+    
+    return model
+
+def _linear_contributions(model, X, background, batch_size):
+    """
+    Exact contributions of a linear model relative to the background mean.
+    """
+    coef = model.coef_[0]
+    
+    if background is None:
+        background = getattr(model, 'feature_means_', None)
+    if background is None:
+        raise ValueError("The model has no training feature means to explain against; retrain it")
+    background = np.asarray(background, dtype=np.float64)
+    
+    values = np.empty(X.shape, dtype=np.float32)
+    for start in range(0, X.shape[0], batch_size):
+        batch = X[start:start + batch_size]
+        batch = batch.toarray() if sp.issparse(batch) else np.asarray(batch, dtype=np.float64)
+        values[start:start + len(batch)] = (batch - background) * coef
+    
+    expected_value = float(model.intercept_[0] + coef @ background)
+    
+    return values, expected_value
+
+# Leaf tables memoized per forest object: id -> (weak reference, tables)
+_forest_tables = {}
+
+def _forest_leaf_tables(model):
+    """
+    Describe every leaf of a forest by the conditions on its path.
+    
+    Conditions on the same feature are merged into one interval, so each
+    leaf has d unique path features with bounds (lo, hi], the fraction of
+    training cover z that follows the path through them, and the leaf's
+    probability of leaving (already divided by the number of trees).
+    
+    Short paths also get a table (leaves, 2**d, d) of contributions for
+    every pattern of satisfied conditions, so explaining a row only needs a
+    lookup.
+    
+    Returns:
+        Tuple of (dictionary mapping d to (features, lo, hi, z, value, table)
+        arrays, with table None for long paths, and the expected value)
+    """
+    key = id(model)
+    entry = _forest_tables.get(key)
+    if entry is not None and entry[0]() is model:
+        return entry[1]
+    
+    n_trees = len(model.estimators_)
+    positive = list(model.classes_).index(1)
+    leaves = {}
+    expected_value = 0.0
+    
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        cover = tree.weighted_n_node_samples
+        probability = tree.value[:, 0, positive] / tree.value[:, 0, :].sum(axis=1)
+        expected_value += probability[0] / n_trees
+        
+        stack = [(0, {})]
+        while stack:
+            node, conditions = stack.pop()
+            left, right = tree.children_left[node], tree.children_right[node]
+            
+            if left == -1:
+                if conditions:
+                    leaves.setdefault(len(conditions), []).append((conditions, probability[node] / n_trees))
+                continue
+            
+            # Rows go left when x <= threshold
+            feature, threshold = tree.feature[node], tree.threshold[node]
+            for child, goes_left in ((left, True), (right, False)):
+                lo, hi, z = conditions.get(feature, (-np.inf, np.inf, 1.0))
+                if goes_left:
+                    hi = min(hi, threshold)
+                else:
+                    lo = max(lo, threshold)
+                child_conditions = dict(conditions)
+                child_conditions[feature] = (lo, hi, z * cover[child] / cover[node])
+                stack.append((child, child_conditions))
+    
+    tables = {}
+    for depth, group in leaves.items():
+        features = np.array([list(conditions) for conditions, _ in group], dtype=np.intp)
+        bounds = np.array([list(conditions.values()) for conditions, _ in group], dtype=np.float64)
+        values = np.array([value for _, value in group], dtype=np.float64)
+        z = bounds[:, :, 2]
+        
+        table = None
+        if depth <= TABLE_MAX_DEPTH:
+            patterns = ((np.arange(2 ** depth)[:, None] >> np.arange(depth)) & 1).astype(np.float64)
+            table = np.empty((len(group), 2 ** depth, depth), dtype=np.float32)
+            chunk = max(1, TREE_SHAP_BUDGET // (2 ** depth * (depth + 1)))
+            for start in range(0, len(group), chunk):
+                leaf_slice = slice(start, start + chunk)
+                o = np.broadcast_to(patterns[:, None, :], (len(patterns), len(z[leaf_slice]), depth))
+                table[leaf_slice] = _shapley_contributions(o, z[leaf_slice], values[leaf_slice]).transpose(1, 0, 2)
+        
+        tables[depth] = (features, bounds[:, :, 0], bounds[:, :, 1], z, values, table)
+    
+    result = (tables, float(expected_value))
+    _forest_tables[key] = (weakref.ref(model, lambda _, key=key: _forest_tables.pop(key, None)), result)
+    
+    return result
+
+def _shapley_contributions(o, z, values):
+    """
+    Path-dependent TreeSHAP contributions of leaves sharing a path length d.
+    
+    For a leaf with path features P, the expected output given the known
+    features S is value * prod(o_k for k in S) * prod(z_k for k not in S),
+    where o_k says whether the row satisfies the path's conditions on k.
+    The Shapley weights are summed through the polynomial
+    prod_k (z_k + o_k t), with feature j's factor divided back out.
+    
+    Args:
+        o: Array (rows, leaves, d) of satisfied conditions (0 or 1)
+        z: Array (leaves, d) of cover fractions
+        values: Array (leaves,) of leaf values
+    
+    Returns:
+        Array (rows, leaves, d) of contributions to each leaf's path features
+    """
+    d = z.shape[1]
+    weights = np.array([factorial(m) * factorial(d - 1 - m) / factorial(d) for m in range(d)])
+    
+    # Coefficients of prod_k (z_k + o_k t), shape (rows, leaves, d + 1)
+    coefficients = np.zeros(o.shape[:2] + (d + 1,))
+    coefficients[:, :, 0] = 1.0
+    for k in range(d):
+        shifted = coefficients[:, :, :-1] * o[:, :, k, None]
+        coefficients *= z[None, :, k, None]
+        coefficients[:, :, 1:] += shifted
+    
+    # Feature j not satisfied (o_j = 0): dividing out z_j leaves the same sum for every j
+    unsatisfied = -(coefficients[:, :, :d] @ weights)
+    
+    # Feature j satisfied (o_j = 1): synthetic division by (t + z_j)
+    quotient = np.repeat(coefficients[:, :, d, None], d, axis=2)
+    satisfied = weights[d - 1] * quotient
+    for m in range(d - 1, 0, -1):
+        quotient = coefficients[:, :, m, None] - z[None] * quotient
+        satisfied += weights[m - 1] * quotient
+    satisfied *= (1.0 - z)[None]
+    
+    return np.where(o == 1.0, satisfied, unsatisfied[:, :, None]) * values[None, :, None]
+
+def _forest_contributions(model, X, batch_size):
+    """
+    Path-dependent TreeSHAP contributions of a random forest.
+    """
+    tables, expected_value = _forest_leaf_tables(model)
+    n_features = X.shape[1]
+    
+    values = np.zeros((X.shape[0], n_features), dtype=np.float32)
+    for start in range(0, X.shape[0], batch_size):
+        batch = X[start:start + batch_size]
+        # Trees compare float32 feature values against their thresholds, as in predict
+        batch = batch.toarray() if sp.issparse(batch) else np.asarray(batch)
+        batch = batch.astype(np.float32)
+        batch_values = np.zeros((len(batch), n_features))
+        
+        for depth, (features, lo, hi, z, leaf_values, table) in tables.items():
+            # Process leaves in chunks that keep the work arrays within budget
+            chunk = max(1, TREE_SHAP_BUDGET // (len(batch) * (depth + 1)))
+            for leaf_start in range(0, len(features), chunk):
+                leaf_slice = slice(leaf_start, leaf_start + chunk)
+                x = batch[:, features[leaf_slice]]
+                satisfied = (x > lo[leaf_slice]) & (x <= hi[leaf_slice])
+                
+                if table is not None:
+                    # Look up the contributions for each row's pattern of satisfied conditions
+                    pattern = satisfied @ (1 << np.arange(depth))
+                    leaves = np.arange(leaf_start, leaf_start + satisfied.shape[1])
+                    contributions = table[leaves[None, :], pattern]
+                else:
+                    contributions = _shapley_contributions(satisfied.astype(np.float64), z[leaf_slice],
+                                                           leaf_values[leaf_slice])
+                
+                # Scatter the (leaf, position) contributions onto their features
+                columns = features[leaf_slice].ravel()
+                scatter = sp.csr_matrix((np.ones(len(columns)), (np.arange(len(columns)), columns)),
+                                        shape=(len(columns), n_features))
+                batch_values += np.asarray(contributions.reshape(len(batch), -1) @ scatter)
+        
+        values[start:start + len(batch)] = batch_values
+    
+    return values, expected_value
+
+def feature_contributions(model, X, background=None, batch_size=EXPLANATION_BATCH_SIZE):
+    """
+    Compute per-row feature contributions to a model's prediction.
+    
+    Args:
+        model: Trained XGBoost, Random Forest or Logistic Regression model
+        X: Preprocessed features (array, CSR matrix, or category DataFrame for
+            native-categorical XGBoost)
+        background: Feature means the linear contributions are measured
+            against (defaults to the training means kept by
+            store_feature_means; ignored for tree models)
+        batch_size: Rows explained per batch
+    
+    Returns:
+        Tuple of (float32 array of shape (rows, features), expected value);
+        see contribution_units for the units
+    """
+    if isinstance(model, xgb.XGBModel):
+        return _xgboost_contributions(model, X, batch_size)
+    if hasattr(model, 'estimators_') and hasattr(model.estimators_[0], 'tree_'):
+        return _forest_contributions(model, X, batch_size)
+    if hasattr(model, 'coef_'):
+        return _linear_contributions(model, X, background, batch_size)
+    
+    raise ValueError(f"Unsupported model for explanations: {type(model).__name__}")
+
+def top_contributions(values, feature_names, k=10):
+    """
+    The k largest contributions (by magnitude) of one row.
+    
+    Args:
+        values: Contributions of one row
+        feature_names: Feature names, aligned with values
+        k: Number of contributions to keep
+    
+    Returns:
+        DataFrame with Feature and Contribution, largest magnitude first
+    """
+    values = np.asarray(values)
+    k = min(k, len(values))
+    top = np.argpartition(-np.abs(values), k - 1)[:k]
+    top = top[np.argsort(-np.abs(values[top]), kind='stable')]
+    
+    return pd.DataFrame({'Feature': np.asarray(feature_names)[top], 'Contribution': values[top]})
+
+def top_contribution_arrays(values, k=10):
+    """
+    Indices and values of every row's k largest contributions (by magnitude).
+    
+    Args:
+        values: Array (rows, features) of contributions
+        k: Number of contributions kept per row
+    
+    Returns:
+        Tuple of (int32 feature indices, float32 values), both (rows, k) and
+        ordered by decreasing magnitude within each row
+    """
+    values = np.asarray(values)
+    k = min(k, values.shape[1])
+    magnitude = np.abs(values)
+    
+    top = np.argpartition(-magnitude, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(magnitude, top, axis=1), axis=1, kind='stable')
+    top = np.take_along_axis(top, order, axis=1)
+    
+    return top.astype(np.int32), np.take_along_axis(values, top, axis=1).astype(np.float32)
+
+class ExplanationIndex:
+    """
+    Per-employee lookup of predictions and their largest contributions.
+    
+    Built once per set of predictions, so looking up an employee is a hash
+    lookup and reading a few array entries, without the model.
+    """
+    
+    def __init__(self, employee_ids, probabilities, values, feature_names, k=10):
+        """
+        Initialize the index
+        
+        Args:
+            employee_ids: Employee IDs, one per row
+            probabilities: Turnover probabilities aligned with employee_ids
+            values: Contributions (rows, features) aligned with employee_ids
+                (None indexes the probabilities only)
+            feature_names: Feature names, aligned with the columns of values
+            k: Number of contributions kept per employee
+        """
+        employee_ids = np.asarray(employee_ids)
+        
+        # Sorted unique IDs and the row of each ID's first occurrence
+        self.employee_ids, first_rows = np.unique(employee_ids, return_index=True)
+        self._lookup = pd.Index(self.employee_ids)
+        self.rows = first_rows.astype(np.intp)
+        
+        self.probabilities = np.asarray(probabilities, dtype=np.float32)[self.rows]
+        self.feature_names = np.asarray(feature_names)
+        self.top_features = self.top_values = None
+        if values is not None:
+            self.top_features, self.top_values = top_contribution_arrays(np.asarray(values)[self.rows], k)
+    
+    def __len__(self):
+        return len(self.employee_ids)
+    
+    def position(self, employee_id):
+        """
+        Position of an employee in the index.
+        
+        Args:
+            employee_id: Employee ID
+        
+        Returns:
+            Position, or None for an unknown ID
+        """
+        try:
+            return self._lookup.get_loc(employee_id)
+        except KeyError:
+            return None
+    
+    def row(self, employee_id):
+        """
+        Row of an employee in the frames the index was built from.
+        
+        Args:
+            employee_id: Employee ID
+        
+        Returns:
+            Row position, or None for an unknown ID
+        """
+        position = self.position(employee_id)
+        
+        return None if position is None else int(self.rows[position])
+    
+    def probability(self, employee_id):
+        """
+        Turnover probability of an employee.
+        
+        Args:
+            employee_id: Employee ID
+        
+        Returns:
+            Probability, or None for an unknown ID
+        """
+        position = self.position(employee_id)
+        
+        return None if position is None else float(self.probabilities[position])
+    
+    def top_contributions(self, employee_id):
+        """
+        The largest contributions to an employee's prediction.
+        
+        Args:
+            employee_id: Employee ID
+        
+        Returns:
+            DataFrame with Feature and Contribution, largest magnitude first
+            (None for an unknown ID or an index without contributions)
+        """
+        position = self.position(employee_id)
+        if position is None or self.top_values is None:
+            return None
+        
+        return pd.DataFrame({'Feature': self.feature_names[self.top_features[position]],
+                             'Contribution': self.top_values[position]})
@@ -0,0 +1,123 @@
+"""
+Process-wide cache of unpickled trained models.
+
+Streamlit reruns the whole script for every interaction and every browser
+session, so loading the same model from SQLite and unpickling it again is
+wasted work. The cache is shared by all sessions of the server process and
+keyed by model id plus the content hash stored alongside the model, so an
+updated model with the same id is never served stale.
+
+Cached objects are shared between sessions and must be treated as read-only.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+# Limits, overridable through the environment
+MAX_ENTRIES = int(os.environ.get('HR_MODEL_CACHE_ENTRIES', 8))
+MAX_BYTES = int(os.environ.get('HR_MODEL_CACHE_MB', 512)) * 1024 * 1024
+
+class ModelCache:
+    """
+    Thread-safe LRU cache bounded by entry count and total serialized size.
+    """
+    
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        """
+        Initialize the cache
+        
+        Args:
+            max_entries (int): Maximum number of cached models
+            max_bytes (int): Maximum total serialized size of cached models
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, model_id, content_hash):
+        """
+        Look up a cached model.
+        
+        Args:
+            model_id: Model ID
+            content_hash: Content hash stored with the model
+        
+        Returns:
+            Cached value, or None on a miss
+        """
+        key = (model_id, content_hash)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def put(self, model_id, content_hash, value, size):
+        """
+        Add a model to the cache, evicting least recently used entries.
+        
+        Args:
+            model_id: Model ID
+            content_hash: Content hash stored with the model
+            value: Object to cache
+            size: Serialized size in bytes, used for the size bound
+        """
+        if size > self.max_bytes:
+            return
+        
+        key = (model_id, content_hash)
+        with self._lock:
+            # Drop any other version of the same model
+            self._discard(model_id)
+            
+            self._entries[key] = (value, size)
+            self._total_bytes += size
+            
+            while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+    
+    def invalidate(self, model_id=None):
+        """
+        Remove a model from the cache, or clear the cache entirely.
+        
+        Args:
+            model_id: Model ID to remove (None clears everything)
+        """
+        with self._lock:
+            if model_id is None:
+                self._entries.clear()
+                self._total_bytes = 0
+            else:
+                self._discard(model_id)
+    
+    def _discard(self, model_id):
+        for key in [key for key in self._entries if key[0] == model_id]:
+            _, size = self._entries.pop(key)
+            self._total_bytes -= size
+    
+    def stats(self):
+        """
+        Get cache statistics.
+        
+        Returns:
+            dict: entries, bytes, hits and misses
+        """
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+# Shared instance used by database.load_trained_model
+model_cache = ModelCache()
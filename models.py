@@ -1,3 +1,5 @@
+import os
+import time
 import numpy as np
 import pandas as pd
 import xgboost as xgb
@@ -6,54 +8,108 @@ from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import (accuracy_score, precision_score, recall_score, 
                              f1_score, roc_auc_score, confusion_matrix)
 from sklearn.pipeline import Pipeline
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
 
-def train_model(X_train, y_train, model_type="XGBoost"):
+from data_processing import derived_feature_columns, has_categorical_columns
+from explanations import feature_contributions, store_feature_means, EXPLANATION_BATCH_SIZE
+from utils.data_processor import append_columns
+
+# Rows scored per batch; bounds the size of the transformed matrix in memory
+SCORING_BATCH_SIZE = 50_000
+
+# Datasets explained at the same time by start_explaining_turnover,
+# overridable through the environment
+EXPLANATION_THREADS = int(os.environ.get('HR_EXPLANATION_THREADS', 1))
+
+# Shared by all sessions of the server process
+_explanation_executor = ThreadPoolExecutor(max_workers=EXPLANATION_THREADS)
+
+# Model types supported by train_model
+MODEL_TYPES = ["XGBoost", "Random Forest", "Logistic Regression"]
+
+# Default hyperparameters per model type
+MODEL_PARAMS = {
+    "XGBoost": {
+        'objective': 'binary:logistic',
+        'n_estimators': 100,
+        'max_depth': 5,
+        'learning_rate': 0.1,
+        'subsample': 0.8,
+        'colsample_bytree': 0.8,
+        'random_state': 42,
+        'use_label_encoder': False,
+        'eval_metric': 'logloss',
+        'tree_method': 'hist'
+    },
+    "Random Forest": {
+        'n_estimators': 100,
+        'max_depth': 5,
+        'min_samples_split': 10,
+        'min_samples_leaf': 4,
+        'random_state': 42
+    },
+    "Logistic Regression": {
+        'C': 1.0,
+        'penalty': 'l2',
+        'solver': 'liblinear',
+        'random_state': 42,
+        'max_iter': 1000
+    }
+}
+
+def build_model(model_type="XGBoost", native_categorical=False, n_jobs=None, **params):
+    """
+    Create an unfitted model with the default hyperparameters.
+    
+    Args:
+        model_type: Type of model to create
+        native_categorical: Let XGBoost split on category columns
+        n_jobs: Threads used by XGBoost and Random Forest (None keeps the
+            library default; Logistic Regression is single-threaded)
+        **params: Hyperparameters overriding the defaults in MODEL_PARAMS
+    
+    Returns:
+        Unfitted model
+    """
+    if model_type not in MODEL_PARAMS:
+        raise ValueError(f"Unsupported model type: {model_type}")
+    
+    params = {**MODEL_PARAMS[model_type], **params}
+    
+    if model_type == "XGBoost":
+        return xgb.XGBClassifier(enable_categorical=native_categorical, n_jobs=n_jobs, **params)
+    elif model_type == "Random Forest":
+        return RandomForestClassifier(n_jobs=n_jobs, **params)
+    else:
+        return LogisticRegression(**params)
+
+def train_model(X_train, y_train, model_type="XGBoost", n_jobs=None):
     """
     Train a machine learning model for turnover prediction.
     
     Args:
-        X_train: Training features
+        X_train: Training features (dense array, CSR matrix, or for XGBoost
+            a DataFrame with category columns)
         y_train: Training target
         model_type: Type of model to train
+        n_jobs: Threads used by XGBoost and Random Forest (None keeps the
+            library default; Logistic Regression is single-threaded)
     
     Returns:
         Trained model
     """
-    if model_type == "XGBoost":
-        model = xgb.XGBClassifier(
-            objective='binary:logistic',
-            n_estimators=100,
-            max_depth=5,
-            learning_rate=0.1,
-            subsample=0.8,
-            colsample_bytree=0.8,
-            random_state=42,
-            use_label_encoder=False,
-            eval_metric='logloss'
-        )
-    elif model_type == "Random Forest":
-        model = RandomForestClassifier(
-            n_estimators=100,
-            max_depth=5,
-            min_samples_split=10,
-            min_samples_leaf=4,
-            random_state=42
-        )
-    elif model_type == "Logistic Regression":
-        model = LogisticRegression(
-            C=1.0,
-            penalty='l2',
-            solver='liblinear',
-            random_state=42,
-            max_iter=1000
-        )
-    else:
-        raise ValueError(f"Unsupported model type: {model_type}")
+    # Frames from the native categorical pipeline keep category columns
+    native_categorical = has_categorical_columns(X_train)
+    if native_categorical and model_type != "XGBoost":
+        raise ValueError(f"{model_type} requires one-hot encoded features")
+    
+    model = build_model(model_type, native_categorical=native_categorical, n_jobs=n_jobs)
     
     # Train the model
     model.fit(X_train, y_train)
     
-    return model
+    # Linear models are explained against their training feature means
+    return store_feature_means(model, X_train)
 
 def evaluate_model(model, X_test, y_test):
     """
@@ -81,7 +137,194 @@ def evaluate_model(model, X_test, y_test):
     
     return accuracy, precision, recall, f1, auc, conf_matrix
 
-def predict_turnover(data, model, preprocessor, feature_names):
+def evaluation_metrics(model, X_test, y_test):
+    """
+    Evaluate a trained model and collect the metrics stored with it.
+    
+    Args:
+        model: Trained model
+        X_test: Test features
+        y_test: Test targets
+    
+    Returns:
+        Dictionary with accuracy, precision, recall, f1, auc and confusion_matrix
+    """
+    accuracy, precision, recall, f1, auc, conf_matrix = evaluate_model(model, X_test, y_test)
+    
+    return {
+        "accuracy": accuracy,
+        "precision": precision,
+        "recall": recall,
+        "f1": f1,
+        "auc": auc,
+        "confusion_matrix": conf_matrix.tolist()
+    }
+
+def _train_and_evaluate(X_train, y_train, X_test, y_test, model_type, n_jobs):
+    """
+    Train and evaluate one model type.
+    
+    Returns:
+        Dictionary with model_type, model, metrics and train_seconds
+    """
+    start = time.perf_counter()
+    model = train_model(X_train, y_train, model_type, n_jobs=n_jobs)
+    train_seconds = time.perf_counter() - start
+    
+    return {
+        'model_type': model_type,
+        'model': model,
+        'metrics': evaluation_metrics(model, X_test, y_test),
+        'train_seconds': train_seconds
+    }
+
+# Train/test split held by each training worker, so it is pickled once
+# per worker rather than once per model
+_worker_split = None
+
+def _init_training_worker(X_train, y_train, X_test, y_test):
+    """
+    Initialize a process-pool worker with the shared train/test split.
+    """
+    global _worker_split
+    _worker_split = (X_train, y_train, X_test, y_test)
+
+def _train_in_worker(model_type, n_jobs):
+    """
+    Train and evaluate one model type inside a process-pool worker.
+    """
+    return _train_and_evaluate(*_worker_split, model_type, n_jobs)
+
+def train_all_models(X_train, y_train, X_test, y_test, model_types=None, n_jobs=1):
+    """
+    Train and evaluate several model types on the same preprocessed split.
+    
+    Models are fitted concurrently in a process pool. At most n_jobs cores
+    are used in total: one worker per model type (up to n_jobs), with the
+    remaining cores split between the multi-threaded models.
+    
+    Args:
+        X_train: Training features shared by all models
+        y_train: Training target
+        X_test: Test features
+        y_test: Test targets
+        model_types: Model types to train (defaults to MODEL_TYPES)
+        n_jobs: Total number of cores to use (1 trains serially in this process)
+    
+    Returns:
+        List of dictionaries with model_type, model, metrics and
+        train_seconds, best AUC first
+    """
+    model_types = list(model_types or MODEL_TYPES)
+    workers = max(1, min(n_jobs, len(model_types)))
+    threads_per_model = max(1, n_jobs // workers)
+    
+    if workers == 1:
+        results = [_train_and_evaluate(X_train, y_train, X_test, y_test, model_type, threads_per_model)
+                   for model_type in model_types]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_training_worker,
+                                 initargs=(X_train, y_train, X_test, y_test)) as pool:
+            futures = [pool.submit(_train_in_worker, model_type, threads_per_model)
+                       for model_type in model_types]
+            results = [future.result() for future in futures]
+    
+    return sorted(results, key=lambda result: result['metrics']['auc'], reverse=True)
+
+def _score_batch(features, model, preprocessor):
+    """
+    Score one batch of rows.
+    
+    Args:
+        features: DataFrame slice with employee data
+        model: Trained prediction model
+        preprocessor: Fitted data preprocessor
+    
+    Returns:
+        Array of turnover probabilities
+    """
+    X = preprocessor.transform(features.drop(columns='Resigned', errors='ignore'))
+    
+    return model.predict_proba(X)[:, 1]
+
+# Model and preprocessor held by each process-pool worker, so they are
+# pickled once per worker rather than once per batch
+_worker_model = None
+_worker_preprocessor = None
+
+def _init_scoring_worker(model, preprocessor):
+    """
+    Initialize a process-pool worker with the model and preprocessor.
+    """
+    global _worker_model, _worker_preprocessor
+    _worker_model = model
+    _worker_preprocessor = preprocessor
+
+def _score_batch_in_worker(features):
+    """
+    Score one batch of rows inside a process-pool worker.
+    """
+    return _score_batch(features, _worker_model, _worker_preprocessor)
+
+def score_in_batches(features, model, preprocessor, batch_size=SCORING_BATCH_SIZE, n_jobs=1, executor='thread'):
+    """
+    Score a frame in fixed-size batches.
+    
+    Only one transformed batch per worker is alive at a time, so memory
+    stays bounded however many rows are scored.
+    
+    Args:
+        features: DataFrame with employee data
+        model: Trained prediction model
+        preprocessor: Fitted data preprocessor
+        batch_size: Rows per batch
+        n_jobs: Number of parallel workers (1 scores in the calling thread)
+        executor: 'thread' or 'process' pool when n_jobs > 1
+    
+    Returns:
+        float32 array of turnover probabilities, one per row
+    """
+    if executor not in ('thread', 'process'):
+        raise ValueError(f"Unsupported executor: {executor}")
+    
+    n_rows = len(features)
+    probabilities = np.empty(n_rows, dtype=np.float32)
+    starts = list(range(0, n_rows, batch_size))
+    
+    if n_jobs == 1 or len(starts) <= 1:
+        for start in starts:
+            batch = features.iloc[start:start + batch_size]
+            probabilities[start:start + len(batch)] = _score_batch(batch, model, preprocessor)
+        return probabilities
+    
+    if executor == 'process':
+        pool = ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_scoring_worker,
+                                   initargs=(model, preprocessor))
+        submit = lambda batch: pool.submit(_score_batch_in_worker, batch)
+    else:
+        pool = ThreadPoolExecutor(max_workers=n_jobs)
+        submit = lambda batch: pool.submit(_score_batch, batch, model, preprocessor)
+    
+    # Keep at most two batches per worker in flight
+    with pool:
+        pending = {}
+        for start in starts:
+            pending[submit(features.iloc[start:start + batch_size])] = start
+            if len(pending) >= 2 * n_jobs:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch_start = pending.pop(future)
+                    result = future.result()
+                    probabilities[batch_start:batch_start + len(result)] = result
+        
+        for future, batch_start in pending.items():
+            result = future.result()
+            probabilities[batch_start:batch_start + len(result)] = result
+    
+    return probabilities
+
+def predict_turnover(data, model, preprocessor, feature_names, as_of_date=None,
+                     batch_size=SCORING_BATCH_SIZE, n_jobs=1, executor='thread'):
     """
     Generate turnover predictions for the given data.
     
@@ -90,24 +333,151 @@ def predict_turnover(data, model, preprocessor, feature_names):
         model: Trained prediction model
         preprocessor: Fitted data preprocessor
         feature_names: Feature names used during training
+        as_of_date: Reference date for derived tenure; pin it for
+            reproducible scoring (defaults to today)
+        batch_size: Rows scored per batch
+        n_jobs: Number of parallel scoring workers
+        executor: 'thread' or 'process' pool when n_jobs > 1
     
     Returns:
         DataFrame with original data and predictions
     """
-    # Create a copy of the data
-    df = data.copy()
+    # Derive the same features as training, computed once for all batches
+    derived = derived_feature_columns(data, as_of_date)
+    features = append_columns(data, derived) if derived else data
     
-    # Get employee IDs
-    employee_ids = df['Employee_ID']
+    # Make predictions
+    turnover_proba = score_in_batches(features, model, preprocessor, batch_size=batch_size,
+                                      n_jobs=n_jobs, executor=executor)
     
-    # Prepare data for prediction
-    X = preprocessor.transform(df.drop('Resigned', axis=1))
+    # Create output DataFrame by appending only the new columns
+    derived['Turnover_Probability'] = turnover_proba
     
-    # Make predictions
-    turnover_proba = model.predict_proba(X)[:, 1]
+    return append_columns(data, derived)
+
+def _scoring_columns(features, preprocessor):
+    """
+    Columns of a feature frame that the preprocessor reads.
+    """
+    columns = getattr(preprocessor, 'feature_names_in_', None)
+    if columns is None and hasattr(preprocessor, 'numerical_columns'):
+        columns = list(preprocessor.numerical_columns) + list(preprocessor.categorical_columns)
+    if columns is None:
+        columns = [col for col in features.columns if col != 'Resigned']
+    
+    return [col for col in columns if col in features.columns]
+
+def row_hashes(features, preprocessor):
+    """
+    Hash each row of the columns the preprocessor reads.
     
-    # Create output DataFrame
-    predictions = df.copy()
-    predictions['Turnover_Probability'] = turnover_proba
+    Hashes depend on values and dtypes, so they are comparable between
+    frames loaded and derived the same way.
     
-    return predictions
+    Args:
+        features: DataFrame with employee data and derived features
+        preprocessor: Fitted data preprocessor
+    
+    Returns:
+        Array of uint64 row hashes
+    """
+    columns = _scoring_columns(features, preprocessor)
+    
+    return pd.util.hash_pandas_object(features[columns], index=False).to_numpy()
+
+def predict_turnover_incremental(data, model, preprocessor, feature_names, previous=None,
+                                 as_of_date=None, key_column='Employee_ID',
+                                 batch_size=SCORING_BATCH_SIZE, n_jobs=1, executor='thread'):
+    """
+    Generate turnover predictions, re-scoring only new or changed employees.
+    
+    Each row's scoring columns (including derived tenure) are hashed and
+    compared with the hash stored for the same employee in a previous
+    prediction run of the same model. Unchanged rows keep their previous
+    probability; the rest go through the preprocessor and model.
+    
+    Args:
+        data: DataFrame with employee data
+        model: Trained prediction model
+        preprocessor: Fitted data preprocessor
+        feature_names: Feature names used during training
+        previous: DataFrame with key_column, Row_Hash and Turnover_Probability
+            from an earlier run of the same model, i.e. the same stored
+            artifacts (see database.get_trained_model_hash), not merely the
+            same model ID (None scores every row)
+        as_of_date: Reference date for derived tenure (defaults to today)
+        key_column: Column identifying each employee
+        batch_size: Rows scored per batch
+        n_jobs: Number of parallel scoring workers
+        executor: 'thread' or 'process' pool when n_jobs > 1
+    
+    Returns:
+        Tuple of (DataFrame with original data, predictions and Row_Hash,
+        number of rows re-scored)
+    """
+    derived = derived_feature_columns(data, as_of_date)
+    features = append_columns(data, derived) if derived else data
+    hashes = row_hashes(features, preprocessor)
+    
+    probabilities = np.empty(len(features), dtype=np.float32)
+    reuse = np.zeros(len(features), dtype=bool)
+    
+    if previous is not None and len(previous) and key_column in data.columns:
+        # Latest entry per employee, looked up by key
+        previous = previous.drop_duplicates(key_column, keep='last')
+        positions = pd.Index(previous[key_column]).get_indexer(data[key_column])
+        found = positions >= 0
+        
+        previous_hashes = previous['Row_Hash'].to_numpy()
+        reuse[found] = previous_hashes[positions[found]] == hashes[found]
+        probabilities[reuse] = previous['Turnover_Probability'].to_numpy()[positions[reuse]]
+    
+    # Score only new or changed rows
+    changed = np.flatnonzero(~reuse)
+    if len(changed):
+        to_score = features if len(changed) == len(features) else features.take(changed)
+        probabilities[changed] = score_in_batches(to_score, model, preprocessor,
+                                                  batch_size=batch_size, n_jobs=n_jobs, executor=executor)
+    
+    derived['Turnover_Probability'] = probabilities
+    derived['Row_Hash'] = hashes
+    
+    return append_columns(data, derived), len(changed)
+
+def explain_turnover(data, model, preprocessor, as_of_date=None, batch_size=EXPLANATION_BATCH_SIZE):
+    """
+    Compute every employee's feature contributions to their turnover prediction.
+    
+    Args:
+        data: DataFrame with employee data
+        model: Trained prediction model
+        preprocessor: Fitted data preprocessor
+        as_of_date: Reference date for derived tenure (defaults to today)
+        batch_size: Rows explained per batch
+    
+    Returns:
+        Tuple of (float32 array of contributions, rows aligned with data and
+        columns with the training feature names, expected value)
+    """
+    derived = derived_feature_columns(data, as_of_date)
+    features = append_columns(data, derived) if derived else data
+    
+    X = preprocessor.transform(features.drop(columns='Resigned', errors='ignore'))
+    
+    return feature_contributions(model, X, batch_size=batch_size)
+
+def start_explaining_turnover(data, model, preprocessor, as_of_date=None):
+    """
+    Start explaining every employee on a background thread.
+    
+    Args:
+        data: DataFrame with employee data (must not be modified while the
+            job runs)
+        model: Trained prediction model
+        preprocessor: Fitted data preprocessor
+        as_of_date: Reference date for derived tenure (defaults to today)
+    
+    Returns:
+        Future with the result of explain_turnover
+    """
+    return _explanation_executor.submit(explain_turnover, data, model, preprocessor, as_of_date)
@@ -1,295 +1,457 @@
+"""
+PDF report of turnover predictions.
+
+Pages are built with matplotlib's object-oriented Figure API instead of
+pyplot's global figure state, so each page is an independent function of
+plain data:
+
+- The report text is resolved to a dictionary once, in the calling thread,
+  and every page is described by a picklable (builder, arguments) pair
+  computed from the cached rollups in aggregates.py.
+- Drawing the pages is the expensive part. With n_jobs > 1 the pages are
+  rendered in batches across a pool of at most MAX_RENDER_PROCESSES
+  spawned processes, each batch to its own PDF, and the parts are merged
+  with pypdf (4.3 or later, an optional dependency). Without it the pages
+  are rendered serially into one document.
+- Finished documents are cached per predictions fingerprint, report text
+  and day, so regenerating an unchanged report is free.
+- start_pdf_report runs generation on a background thread and exposes its
+  progress, so the Streamlit script does not block on the build.
+"""
 import io
-import base64
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from matplotlib.backends.backend_pdf import PdfPages
+import multiprocessing
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from datetime import datetime
 
-def generate_pdf_report(predictions, translation_func):
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+
+from aggregates import (AggregateCache, risk_counts, department_summary, job_title_summary,
+                        high_risk_employees, predictions_fingerprint)
+
+try:
+    from pypdf import PdfWriter
+except ImportError:
+    PdfWriter = None
+
+# Translation keys used by the report
+REPORT_TEXT_KEYS = [
+    'hr_analytics_report', 'turnover_prediction_analysis', 'executive_summary',
+    'total_employees_analyzed', 'employee_risk_breakdown', 'high_risk', 'medium_risk', 'low_risk',
+    'avg_turnover_probability', 'departments_highest_risk', 'risk_distribution', 'report_generated_on',
+    'department_analysis', 'avg_turnover_risk_by_department', 'avg_risk', 'department', 'employees',
+    'high_risk_count', 'high_risk_percentage', 'high_risk_employees', 'high_risk_explanation',
+    'employee_id', 'job_title', 'risk_probability', 'years_at_company', 'job_title_analysis',
+    'avg_turnover_risk_by_job_title', 'recommendations', 'focus_high_risk', 'high_risk_recommendation',
+    'address_department_issues', 'department_recommendation', 'improve_satisfaction',
+    'satisfaction_recommendation', 'develop_talent', 'talent_recommendation', 'monitor_changes',
+    'monitoring_recommendation'
+]
+
+# Page size in inches (US letter)
+PAGE_SIZE = (8.5, 11)
+
+# High-risk employees listed per page
+EMPLOYEES_PER_PAGE = 20
+
+# Pages rendered per process-pool task
+PAGES_PER_TASK = 8
+
+# Upper bound on rendering processes per report, overridable through the environment
+MAX_RENDER_PROCESSES = int(os.environ.get('HR_PDF_RENDER_PROCESSES', 4))
+
+# Finished documents kept, overridable through the environment
+PDF_CACHE_ENTRIES = int(os.environ.get('HR_PDF_CACHE_ENTRIES', 8))
+
+# Reports generated at the same time by start_pdf_report
+REPORT_THREADS = int(os.environ.get('HR_PDF_REPORT_THREADS', 2))
+
+# Shared by all sessions of the server process
+pdf_cache = AggregateCache(max_entries=PDF_CACHE_ENTRIES)
+_report_executor = ThreadPoolExecutor(max_workers=REPORT_THREADS)
+
+def report_text(translation_func):
     """
-    Generate a PDF report of turnover predictions.
+    Resolve the report text for the current language.
     
     Args:
-        predictions: DataFrame with predictions
         translation_func: Function for text translation
     
     Returns:
-        PDF file as bytes
+        Dictionary mapping every REPORT_TEXT_KEYS entry to its text
     """
-    # Create an in-memory bytes buffer
-    buffer = io.BytesIO()
+    return {key: translation_func(key) for key in REPORT_TEXT_KEYS}
+
+def _new_page(text, heading, footer):
+    """
+    Create a page with a heading and a footer, positioned in page coordinates.
+    """
+    fig = Figure(figsize=PAGE_SIZE)
+    fig.text(0.5, 0.94, heading, fontsize=18, ha='center')
+    fig.text(0.5, 0.03, text['report_generated_on'] + f" {footer}", fontsize=8, ha='center')
     
-    # Create a PDF document
-    with PdfPages(buffer) as pdf:
-        # Title page
-        plt.figure(figsize=(8.5, 11))
-        plt.text(0.5, 0.9, translation_func('hr_analytics_report'), fontsize=24, ha='center')
-        plt.text(0.5, 0.85, translation_func('turnover_prediction_analysis'), fontsize=18, ha='center')
-        plt.text(0.5, 0.8, datetime.now().strftime('%Y-%m-%d'), fontsize=14, ha='center')
-        plt.axis('off')
-        pdf.savefig()
-        plt.close()
-        
-        # Executive summary
-        plt.figure(figsize=(8.5, 11))
-        plt.text(0.5, 0.95, translation_func('executive_summary'), fontsize=18, ha='center')
-        
-        # Calculate summary statistics
-        total_employees = len(predictions)
-        high_risk = len(predictions[predictions['Risk_Category'] == 'High'])
-        medium_risk = len(predictions[predictions['Risk_Category'] == 'Medium'])
-        low_risk = len(predictions[predictions['Risk_Category'] == 'Low'])
-        
-        high_risk_pct = high_risk / total_employees * 100
-        medium_risk_pct = medium_risk / total_employees * 100
-        low_risk_pct = low_risk / total_employees * 100
-        
-        # Add summary text
-        summary_text = f"""
-        {translation_func('total_employees_analyzed')}: {total_employees}
+    return fig
 
-        {translation_func('employee_risk_breakdown')}:
-        - {translation_func('high_risk')}: {high_risk} ({high_risk_pct:.1f}%)
-        - {translation_func('medium_risk')}: {medium_risk} ({medium_risk_pct:.1f}%)
-        - {translation_func('low_risk')}: {low_risk} ({low_risk_pct:.1f}%)
+def _add_table(fig, rect, rows, fontsize):
+    """
+    Draw a table of text rows (the first row holds the headings).
+    """
+    ax = fig.add_axes(rect)
+    ax.axis('off')
+    
+    table = ax.table(cellText=rows, loc='center', cellLoc='center', edges='horizontal')
+    table.auto_set_font_size(False)
+    table.set_fontsize(fontsize)
+    table.scale(1, 1.5)
 
-        {translation_func('avg_turnover_probability')}: {predictions['Turnover_Probability'].mean():.2f}
-        
-        {translation_func('departments_highest_risk')}:
-        """
-        
-        # Add top 3 departments by risk
-        dept_risk = predictions.groupby('Department')['Turnover_Probability'].mean().sort_values(ascending=False)
-        for i, (dept, risk) in enumerate(dept_risk.head(3).items()):
-            summary_text += f"  {i+1}. {dept}: {risk:.2f}\n"
-        
-        plt.text(0.1, 0.85, summary_text, fontsize=12, va='top')
-        
-        # Add a pie chart of risk categories
-        plt.axes([0.2, 0.35, 0.6, 0.3])
-        risk_counts = [high_risk, medium_risk, low_risk]
-        risk_labels = [
-            f"{translation_func('high_risk')} ({high_risk_pct:.1f}%)",
-            f"{translation_func('medium_risk')} ({medium_risk_pct:.1f}%)",
-            f"{translation_func('low_risk')} ({low_risk_pct:.1f}%)"
-        ]
-        plt.pie(risk_counts, labels=risk_labels, colors=['#ff6666', '#ffcc66', '#66cc66'], autopct='%1.1f%%')
-        plt.title(translation_func('risk_distribution'))
-        
-        # Footer
-        plt.text(0.5, 0.02, translation_func('report_generated_on') + f" {datetime.now().strftime('%Y-%m-%d %H:%M')}", 
-                 fontsize=8, ha='center')
-        
-        plt.axis('off')
-        pdf.savefig()
-        plt.close()
-        
-        # Department analysis
-        plt.figure(figsize=(8.5, 11))
-        plt.text(0.5, 0.95, translation_func('department_analysis'), fontsize=18, ha='center')
-        
-        # Calculate department statistics
-        dept_stats = predictions.groupby('Department').agg({
-            'Turnover_Probability': ['mean', 'count'],
-            'Employee_ID': 'count'
-        }).reset_index()
-        
-        dept_stats.columns = ['Department', 'Avg_Risk', 'Risk_Count', 'Employee_Count']
-        dept_stats['High_Risk_Count'] = predictions[predictions['Risk_Category'] == 'High'].groupby('Department').size().reindex(dept_stats['Department']).fillna(0).astype(int)
-        dept_stats['High_Risk_Pct'] = dept_stats['High_Risk_Count'] / dept_stats['Employee_Count'] * 100
-        dept_stats = dept_stats.sort_values('Avg_Risk', ascending=False)
-        
-        # Plot department risk
-        plt.axes([0.1, 0.6, 0.8, 0.25])
-        bars = plt.barh(dept_stats['Department'], dept_stats['Avg_Risk'], color='#3B6EA5')
-        
-        # Add value labels to bars
-        for i, bar in enumerate(bars):
-            plt.text(bar.get_width() + 0.01, bar.get_y() + bar.get_height()/2, 
-                     f"{dept_stats['Avg_Risk'].iloc[i]:.2f}", 
-                     va='center')
-        
-        plt.xlim(0, max(dept_stats['Avg_Risk']) * 1.2)
-        plt.title(translation_func('avg_turnover_risk_by_department'))
-        plt.xlabel(translation_func('avg_risk'))
-        
-        # Create a table with department statistics
-        plt.axes([0.1, 0.1, 0.8, 0.4])
-        plt.axis('off')
-        
-        table_data = []
-        table_data.append([translation_func('department'), 
-                          translation_func('employees'), 
-                          translation_func('avg_risk'), 
-                          translation_func('high_risk_count'),
-                          translation_func('high_risk_percentage')])
-        
-        for _, row in dept_stats.iterrows():
-            table_data.append([
-                row['Department'],
-                f"{row['Employee_Count']}",
-                f"{row['Avg_Risk']:.2f}",
-                f"{row['High_Risk_Count']}",
-                f"{row['High_Risk_Pct']:.1f}%"
-            ])
-        
-        table = plt.table(cellText=table_data, loc='center', cellLoc='center', edges='horizontal')
-        table.auto_set_font_size(False)
-        table.set_fontsize(10)
-        table.scale(1, 1.5)
-        
-        # Footer
-        plt.text(0.5, -0.1, translation_func('report_generated_on') + f" {datetime.now().strftime('%Y-%m-%d %H:%M')}", 
-                 fontsize=8, ha='center')
-        
-        pdf.savefig()
-        plt.close()
-        
-        # High risk employees list
-        high_risk_employees = predictions[predictions['Risk_Category'] == 'High'].sort_values('Turnover_Probability', ascending=False)
-        
-        if len(high_risk_employees) > 0:
-            plt.figure(figsize=(8.5, 11))
-            plt.text(0.5, 0.95, translation_func('high_risk_employees'), fontsize=18, ha='center')
-            
-            # Add explanation
-            plt.text(0.1, 0.9, translation_func('high_risk_explanation'), fontsize=10)
-            
-            # Split high risk employees into chunks of 20 for readability
-            max_per_page = 20
-            for i in range(0, len(high_risk_employees), max_per_page):
-                if i > 0:
-                    # Create a new page for each chunk after the first
-                    plt.figure(figsize=(8.5, 11))
-                    plt.text(0.5, 0.95, translation_func('high_risk_employees') + f" ({i+1}-{min(i+max_per_page, len(high_risk_employees))})", 
-                             fontsize=18, ha='center')
-                
-                chunk = high_risk_employees.iloc[i:i+max_per_page]
-                
-                # Create a table of high risk employees
-                plt.axes([0.05, 0.1, 0.9, 0.75])
-                plt.axis('off')
-                
-                table_data = []
-                table_data.append([
-                    translation_func('employee_id'),
-                    translation_func('department'),
-                    translation_func('job_title'),
-                    translation_func('risk_probability'),
-                    translation_func('years_at_company')
-                ])
-                
-                for _, row in chunk.iterrows():
-                    table_data.append([
-                        str(row['Employee_ID']),
-                        row['Department'],
-                        row['Job_Title'],
-                        f"{row['Turnover_Probability']:.2f}",
-                        f"{row['Years_At_Company']:.1f}"
-                    ])
-                
-                table = plt.table(cellText=table_data, loc='center', cellLoc='center', edges='horizontal')
-                table.auto_set_font_size(False)
-                table.set_fontsize(9)
-                table.scale(1, 1.5)
-                
-                # Footer
-                plt.text(0.5, 0.02, translation_func('report_generated_on') + f" {datetime.now().strftime('%Y-%m-%d %H:%M')}", 
-                         fontsize=8, ha='center')
-                
-                pdf.savefig()
-                plt.close()
-            
-        # Job title analysis
-        plt.figure(figsize=(8.5, 11))
-        plt.text(0.5, 0.95, translation_func('job_title_analysis'), fontsize=18, ha='center')
-        
-        # Calculate job title statistics (top 10 by count)
-        job_stats = predictions.groupby('Job_Title').agg({
-            'Turnover_Probability': 'mean',
-            'Employee_ID': 'count'
-        }).reset_index()
-        
-        job_stats.columns = ['Job_Title', 'Avg_Risk', 'Employee_Count']
-        job_stats = job_stats.sort_values('Employee_Count', ascending=False).head(10)
-        
-        # Plot job title risk
-        plt.axes([0.1, 0.6, 0.8, 0.25])
-        bars = plt.barh(job_stats['Job_Title'], job_stats['Avg_Risk'], color='#5A8F29')
-        
-        # Add value labels to bars
-        for i, bar in enumerate(bars):
-            plt.text(bar.get_width() + 0.01, bar.get_y() + bar.get_height()/2, 
-                     f"{job_stats['Avg_Risk'].iloc[i]:.2f}", 
-                     va='center')
-        
-        plt.xlim(0, max(job_stats['Avg_Risk']) * 1.2)
-        plt.title(translation_func('avg_turnover_risk_by_job_title'))
-        plt.xlabel(translation_func('avg_risk'))
-        
-        # Create a table with job title statistics
-        plt.axes([0.1, 0.1, 0.8, 0.4])
-        plt.axis('off')
-        
-        table_data = []
-        table_data.append([translation_func('job_title'), 
-                          translation_func('employees'), 
-                          translation_func('avg_risk')])
-        
-        for _, row in job_stats.iterrows():
-            table_data.append([
-                row['Job_Title'],
-                f"{row['Employee_Count']}",
-                f"{row['Avg_Risk']:.2f}"
-            ])
-        
-        table = plt.table(cellText=table_data, loc='center', cellLoc='center', edges='horizontal')
-        table.auto_set_font_size(False)
-        table.set_fontsize(10)
-        table.scale(1, 1.5)
-        
-        # Footer
-        plt.text(0.5, -0.1, translation_func('report_generated_on') + f" {datetime.now().strftime('%Y-%m-%d %H:%M')}", 
-                 fontsize=8, ha='center')
-        
-        pdf.savefig()
-        plt.close()
-        
-        # Recommendations page
-        plt.figure(figsize=(8.5, 11))
-        plt.text(0.5, 0.95, translation_func('recommendations'), fontsize=18, ha='center')
-        
-        recommendations_text = f"""
-        1. {translation_func('focus_high_risk')}:
-           {translation_func('high_risk_recommendation')}
+def _add_bar_chart(fig, labels, values, color, title, xlabel):
+    """
+    Draw a horizontal bar chart with value labels.
+    """
+    ax = fig.add_axes([0.25, 0.58, 0.65, 0.28])
+    bars = ax.barh(labels, values, color=color)
+    ax.bar_label(bars, fmt='{:.2f}', padding=3)
+    
+    # Empty summaries (e.g. of filtered predictions) keep a fixed scale
+    largest = max(values, default=0.0)
+    ax.set_xlim(0, largest * 1.2 if largest > 0 else 1.0)
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
 
-        2. {translation_func('address_department_issues')}:
-           {translation_func('department_recommendation')}
+def _title_page(text, date):
+    """
+    Build the title page.
+    """
+    fig = Figure(figsize=PAGE_SIZE)
+    fig.text(0.5, 0.8, text['hr_analytics_report'], fontsize=24, ha='center')
+    fig.text(0.5, 0.76, text['turnover_prediction_analysis'], fontsize=18, ha='center')
+    fig.text(0.5, 0.72, date, fontsize=14, ha='center')
+    
+    return fig
 
-        3. {translation_func('improve_satisfaction')}:
-           {translation_func('satisfaction_recommendation')}
+def _summary_page(text, footer, summary_text, risk_shares):
+    """
+    Build the executive summary page with the risk distribution pie chart.
+    """
+    fig = _new_page(text, text['executive_summary'], footer)
+    fig.text(0.1, 0.88, summary_text, fontsize=12, va='top')
+    
+    # No pie without employees (matplotlib rejects all-zero wedges)
+    if sum(count for count, _ in risk_shares) > 0:
+        pie_ax = fig.add_axes([0.2, 0.08, 0.6, 0.35])
+        labels = [f"{text[level]} ({share:.1f}%)" for level, (_, share) in zip(
+            ['high_risk', 'medium_risk', 'low_risk'], risk_shares)]
+        pie_ax.pie([count for count, _ in risk_shares], labels=labels,
+                   colors=['#ff6666', '#ffcc66', '#66cc66'], autopct='%1.1f%%')
+        pie_ax.set_title(text['risk_distribution'])
+    
+    return fig
 
-        4. {translation_func('develop_talent')}:
-           {translation_func('talent_recommendation')}
+def _department_page(text, footer, departments, avg_risk, table_rows):
+    """
+    Build the department analysis page.
+    """
+    fig = _new_page(text, text['department_analysis'], footer)
+    _add_bar_chart(fig, departments, avg_risk, '#3B6EA5',
+                   text['avg_turnover_risk_by_department'], text['avg_risk'])
+    _add_table(fig, [0.1, 0.1, 0.8, 0.4], table_rows, 10)
+    
+    return fig
 
-        5. {translation_func('monitor_changes')}:
-           {translation_func('monitoring_recommendation')}
+def _high_risk_page(text, footer, heading, explanation, table_rows):
+    """
+    Build one page of the high-risk employee list.
+    """
+    fig = _new_page(text, heading, footer)
+    if explanation:
+        fig.text(0.1, 0.89, text['high_risk_explanation'], fontsize=10, wrap=True)
+    _add_table(fig, [0.05, 0.1, 0.9, 0.75], table_rows, 9)
+    
+    return fig
+
+def _job_title_page(text, footer, job_titles, avg_risk, table_rows):
+    """
+    Build the job title analysis page.
+    """
+    fig = _new_page(text, text['job_title_analysis'], footer)
+    _add_bar_chart(fig, job_titles, avg_risk, '#5A8F29',
+                   text['avg_turnover_risk_by_job_title'], text['avg_risk'])
+    _add_table(fig, [0.1, 0.1, 0.8, 0.4], table_rows, 10)
+    
+    return fig
+
+def _recommendations_page(text, footer):
+    """
+    Build the recommendations page.
+    """
+    fig = _new_page(text, text['recommendations'], footer)
+    
+    recommendations = [('focus_high_risk', 'high_risk_recommendation'),
+                       ('address_department_issues', 'department_recommendation'),
+                       ('improve_satisfaction', 'satisfaction_recommendation'),
+                       ('develop_talent', 'talent_recommendation'),
+                       ('monitor_changes', 'monitoring_recommendation')]
+    recommendations_text = '\n\n'.join(f"{i+1}. {text[topic]}:\n    {text[advice]}"
+                                        for i, (topic, advice) in enumerate(recommendations))
+    fig.text(0.1, 0.88, recommendations_text, fontsize=12, va='top', wrap=True)
+    
+    return fig
+
+def _formatted(values, template):
+    """
+    Format a column of values with a str.format template, as a list of strings.
+    """
+    return list(map(template.format, values.tolist()))
+
+def report_pages(predictions, text, generated=None):
+    """
+    Describe every page of the report.
+    
+    Args:
+        predictions: DataFrame with predictions
+        text: Report text from report_text
+        generated: Generation time shown on the pages (defaults to now)
+    
+    Returns:
+        List of (page builder, arguments) pairs, in page order
+    """
+    generated = generated or datetime.now()
+    footer = generated.strftime('%Y-%m-%d %H:%M')
+    pages = [(_title_page, (text, generated.strftime('%Y-%m-%d')))]
+    
+    # Executive summary
+    total_employees = len(predictions)
+    counts = risk_counts(predictions)
+    risk_shares = [(int(counts[level]), counts[level] / max(total_employees, 1) * 100)
+                   for level in ['High', 'Medium', 'Low']]
+    (high_risk, high_risk_pct), (medium_risk, medium_risk_pct), (low_risk, low_risk_pct) = risk_shares
+    
+    summary_lines = [
+        f"{text['total_employees_analyzed']}: {total_employees}",
+        "",
+        f"{text['employee_risk_breakdown']}:",
+        f"- {text['high_risk']}: {high_risk} ({high_risk_pct:.1f}%)",
+        f"- {text['medium_risk']}: {medium_risk} ({medium_risk_pct:.1f}%)",
+        f"- {text['low_risk']}: {low_risk} ({low_risk_pct:.1f}%)",
+        "",
+        f"{text['avg_turnover_probability']}: {predictions['Turnover_Probability'].mean():.2f}",
+        "",
+        f"{text['departments_highest_risk']}:"
+    ]
+    
+    # Departments by decreasing average risk
+    dept_stats = department_summary(predictions).sort_values('avg_probability', ascending=False)
+    for i, (dept, risk) in enumerate(zip(dept_stats['Department'].head(3), dept_stats['avg_probability'].head(3))):
+        summary_lines.append(f"  {i+1}. {dept}: {risk:.2f}")
+    summary_text = '\n'.join(summary_lines)
+    
+    pages.append((_summary_page, (text, footer, summary_text, risk_shares)))
+    
+    # Department analysis
+    dept_rows = [[text['department'], text['employees'], text['avg_risk'],
+                  text['high_risk_count'], text['high_risk_percentage']]]
+    dept_rows += [list(row) for row in zip(
+        dept_stats['Department'].astype(str).tolist(),
+        _formatted(dept_stats['total_employees'], '{}'),
+        _formatted(dept_stats['avg_probability'], '{:.2f}'),
+        _formatted(dept_stats['high_risk_count'], '{}'),
+        _formatted(dept_stats['high_risk_percentage'] * 100, '{:.1f}%'))]
+    
+    pages.append((_department_page, (text, footer, dept_stats['Department'].astype(str).tolist(),
+                                     dept_stats['avg_probability'].tolist(), dept_rows)))
+    
+    # High-risk employee list, formatted once and split into pages
+    high_risk_rows = high_risk_employees(predictions)
+    n_high_risk = len(high_risk_rows)
+    if n_high_risk > 0:
+        headings = [text['employee_id'], text['department'], text['job_title'],
+                    text['risk_probability'], text['years_at_company']]
+        rows = [list(row) for row in zip(
+            high_risk_rows['Employee_ID'].astype(str).tolist(),
+            high_risk_rows['Department'].astype(str).tolist(),
+            high_risk_rows['Job_Title'].astype(str).tolist(),
+            _formatted(high_risk_rows['Turnover_Probability'], '{:.2f}'),
+            _formatted(high_risk_rows['Years_At_Company'], '{:.1f}'))]
+        
+        for start in range(0, n_high_risk, EMPLOYEES_PER_PAGE):
+            end = min(start + EMPLOYEES_PER_PAGE, n_high_risk)
+            heading = text['high_risk_employees'] + (f" ({start+1}-{end})" if start > 0 else '')
+            pages.append((_high_risk_page, (text, footer, heading, start == 0, [headings] + rows[start:end])))
+    
+    # Job title analysis (top 10 by count)
+    job_stats = job_title_summary(predictions).sort_values('Employee_Count', ascending=False).head(10)
+    job_rows = [[text['job_title'], text['employees'], text['avg_risk']]]
+    job_rows += [list(row) for row in zip(
+        job_stats['Job_Title'].astype(str).tolist(),
+        _formatted(job_stats['Employee_Count'], '{}'),
+        _formatted(job_stats['Turnover_Probability'], '{:.2f}'))]
+    
+    pages.append((_job_title_page, (text, footer, job_stats['Job_Title'].astype(str).tolist(),
+                                    job_stats['Turnover_Probability'].tolist(), job_rows)))
+    
+    pages.append((_recommendations_page, (text, footer)))
+    
+    return pages
+
+def render_pages(pages, progress_callback=None):
+    """
+    Render pages into one PDF document.
+    
+    Args:
+        pages: List of (page builder, arguments) pairs
+        progress_callback: Called as progress_callback(pages_rendered) after each page
+    
+    Returns:
+        PDF file as bytes
+    """
+    buffer = io.BytesIO()
+    
+    with PdfPages(buffer) as pdf:
+        for i, (builder, args) in enumerate(pages):
+            pdf.savefig(builder(*args))
+            if progress_callback is not None:
+                progress_callback(i + 1)
+    
+    return buffer.getvalue()
+
+def _render_in_parallel(pages, n_jobs, progress_callback=None):
+    """
+    Render batches of pages in a process pool and merge the parts with pypdf.
+    
+    The workers are spawned rather than forked: the caller may be a
+    multithreaded server, and a forked child could inherit locks held by
+    its other threads.
+    """
+    batches = [pages[start:start + PAGES_PER_TASK] for start in range(0, len(pages), PAGES_PER_TASK)]
+    parts = [None] * len(batches)
+    rendered = 0
+    
+    workers = min(n_jobs, MAX_RENDER_PROCESSES, len(batches))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        futures = {pool.submit(render_pages, batch): i for i, batch in enumerate(batches)}
+        for future in as_completed(futures):
+            i = futures[future]
+            parts[i] = future.result()
+            rendered += len(batches[i])
+            if progress_callback is not None:
+                progress_callback(rendered)
+    
+    writer = PdfWriter()
+    for part in parts:
+        writer.append(io.BytesIO(part))
+    # Each part embeds its own copy of the fonts and other shared resources
+    writer.compress_identical_objects()
+    
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    
+    return buffer.getvalue()
+
+def generate_pdf_report(predictions, translation_func, n_jobs=1, progress_callback=None, text=None):
+    """
+    Generate a PDF report of turnover predictions.
+    
+    Args:
+        predictions: DataFrame with predictions
+        translation_func: Function for text translation
+        n_jobs: Number of rendering processes, capped at MAX_RENDER_PROCESSES
+            (1, or pypdf not installed, renders serially in this process)
+        progress_callback: Called as progress_callback(pages_rendered, total_pages)
+        text: Report text already resolved with report_text (translation_func
+            is not called when given)
+    
+    Returns:
+        PDF file as bytes
+    """
+    if text is None:
+        text = report_text(translation_func)
+    
+    def compute():
+        pages = report_pages(predictions, text)
+        report_progress = None
+        if progress_callback is not None:
+            report_progress = lambda rendered: progress_callback(rendered, len(pages))
+        
+        if n_jobs > 1 and PdfWriter is not None and len(pages) > PAGES_PER_TASK:
+            return _render_in_parallel(pages, n_jobs, report_progress)
+        return render_pages(pages, report_progress)
+    
+    # Pages show the generation date, so a report is reused for one day at most
+    key = (predictions_fingerprint(predictions), tuple(sorted(text.items())), datetime.now().strftime('%Y-%m-%d'))
+    
+    return pdf_cache.get_or_compute(key, compute)
+
+class PdfReportJob:
+    """
+    PDF report generated on a background thread.
+    """
+    
+    def __init__(self, predictions, translation_func, n_jobs=1):
         """
+        Start generating the report
+        
+        Args:
+            predictions: DataFrame with predictions (must not be modified
+                while the job runs)
+            translation_func: Function for text translation, called only
+                in the starting thread
+            n_jobs (int): Number of rendering processes
+        """
+        self.pages_rendered = 0
+        self.total_pages = None
         
-        plt.text(0.1, 0.85, recommendations_text, fontsize=12, va='top')
+        # Resolved here: translation_func may depend on the caller's session state
+        text = report_text(translation_func)
+        self._future = _report_executor.submit(generate_pdf_report, predictions, None, n_jobs,
+                                               self._update_progress, text)
+    
+    def _update_progress(self, pages_rendered, total_pages):
+        """
+        Record the number of rendered pages.
+        """
+        self.pages_rendered = pages_rendered
+        self.total_pages = total_pages
+    
+    @property
+    def progress(self):
+        """
+        Fraction of the report rendered so far (1.0 once finished).
+        """
+        if self._future.done():
+            return 1.0
+        if not self.total_pages:
+            return 0.0
+        return self.pages_rendered / self.total_pages
+    
+    def done(self):
+        """
+        Whether generation has finished (successfully or not).
+        """
+        return self._future.done()
+    
+    def result(self, timeout=None):
+        """
+        Wait for the report.
         
-        # Footer
-        plt.text(0.5, 0.02, translation_func('report_generated_on') + f" {datetime.now().strftime('%Y-%m-%d %H:%M')}", 
-                 fontsize=8, ha='center')
+        Args:
+            timeout: Seconds to wait (None waits until finished)
         
-        plt.axis('off')
-        pdf.savefig()
-        plt.close()
+        Returns:
+            PDF file as bytes (re-raises any generation error)
+        """
+        return self._future.result(timeout)
+
+def start_pdf_report(predictions, translation_func, n_jobs=1):
+    """
+    Start generating a PDF report in the background.
     
-    # Reset buffer position to the beginning
-    buffer.seek(0)
+    Args:
+        predictions: DataFrame with predictions
+        translation_func: Function for text translation
+        n_jobs: Number of rendering processes
     
-    # Return the PDF file
-    return buffer.getvalue()
+    Returns:
+        PdfReportJob
+    """
+    return PdfReportJob(predictions, translation_func, n_jobs)
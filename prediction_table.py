@@ -0,0 +1,183 @@
+"""
+Paginated queries over a predictions frame for the employee predictions table.
+
+The table lists employees by decreasing turnover probability. Instead of
+filtering a copy of the predictions and sorting all of it on every rerun,
+queries work on row positions:
+
+- The descending probability order and the Department and Risk_Category
+  codes are computed once per predictions frame and kept in the shared
+  aggregate cache.
+- Each department/risk filter combination resolves to its rows in that
+  order, kept in a small LRU cache so reruns with the same filters reuse
+  it. Rows above a probability threshold form a prefix, found with
+  searchsorted.
+- Only the rows and columns of the requested page are materialized, so
+  only the visible window is serialized to the browser.
+
+Ties are broken by row position, so every page agrees with the full sort.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from aggregates import AggregateCache, aggregate_cache, predictions_fingerprint
+
+# Columns shown in the predictions table
+TABLE_COLUMNS = ['Employee_ID', 'Department', 'Job_Title', 'Turnover_Probability',
+                 'Risk_Category', 'Performance_Score', 'Years_At_Company']
+
+# Page sizes offered by the table
+PAGE_SIZES = [50, 100, 250, 500]
+
+# Columns with a filter index
+FILTER_COLUMNS = ['Department', 'Risk_Category']
+
+# Resolved filter combinations kept, overridable through the environment
+FILTER_CACHE_ENTRIES = int(os.environ.get('HR_FILTER_CACHE_ENTRIES', 64))
+
+# Shared by all sessions of the server process
+filter_cache = AggregateCache(max_entries=FILTER_CACHE_ENTRIES)
+
+def _sort_keys(predictions):
+    """
+    Ascending sort keys for decreasing probability, with missing values last.
+    """
+    probabilities = predictions['Turnover_Probability'].to_numpy(dtype=np.float64, na_value=np.nan)
+    
+    return np.where(np.isnan(probabilities), np.inf, -probabilities)
+
+def _threshold(predictions, min_probability):
+    """
+    Probability threshold rounded like a comparison on the column's own dtype.
+    """
+    dtype = predictions['Turnover_Probability'].dtype
+    if isinstance(dtype, np.dtype) and dtype.kind == 'f':
+        return float(dtype.type(min_probability))
+    
+    return float(min_probability)
+
+def probability_order(predictions):
+    """
+    Row positions ordered by decreasing turnover probability, cached per predictions.
+    
+    Args:
+        predictions: DataFrame with predictions
+    
+    Returns:
+        Tuple of (positions, their ascending sort keys: the negated
+        probabilities, with +inf for missing values)
+    """
+    def compute():
+        keys = _sort_keys(predictions)
+        order = np.argsort(keys, kind='stable')
+        return order, keys[order]
+    
+    return aggregate_cache.get_or_compute((predictions_fingerprint(predictions), 'probability_order'), compute)
+
+def filter_index(predictions):
+    """
+    Integer codes of the filterable columns, cached per predictions.
+    
+    Args:
+        predictions: DataFrame with predictions
+    
+    Returns:
+        Dictionary mapping column name to (codes, values), where codes index
+        values and -1 marks a missing value
+    """
+    def compute():
+        index = {}
+        for column in FILTER_COLUMNS:
+            if column in predictions.columns:
+                codes, values = pd.factorize(predictions[column])
+                index[column] = (codes, values)
+        return index
+    
+    return aggregate_cache.get_or_compute((predictions_fingerprint(predictions), 'filter_index'), compute)
+
+def filtered_order(predictions, departments=None, risk_levels=None):
+    """
+    Rows matching the department and risk filters, highest probability first.
+    
+    Args:
+        predictions: DataFrame with predictions
+        departments: Departments to keep (all if empty or None)
+        risk_levels: Risk categories to keep (all if empty or None)
+    
+    Returns:
+        Tuple of (positions, their sort keys as in probability_order)
+    """
+    filters = {column: frozenset(selected) for column, selected in
+               (('Department', departments), ('Risk_Category', risk_levels)) if selected}
+    if not filters:
+        return probability_order(predictions)
+    
+    def compute():
+        order, keys = probability_order(predictions)
+        index = filter_index(predictions)
+        
+        keep = np.ones(len(order), dtype=bool)
+        for column, selected in filters.items():
+            codes, values = index[column]
+            # One lookup per distinct value; the extra last entry rejects missing values (-1)
+            selected_codes = np.append(np.asarray(values.isin(list(selected)), dtype=bool), False)
+            keep &= selected_codes[codes[order]]
+        
+        return order[keep], keys[keep]
+    
+    key = (predictions_fingerprint(predictions), tuple(sorted(filters.items())))
+    
+    return filter_cache.get_or_compute(key, compute)
+
+def _threshold_cut(keys, predictions, min_probability):
+    """
+    Number of leading rows of an ordered key array at or above the probability threshold.
+    """
+    if min_probability <= 0:
+        return len(keys)
+    
+    return int(np.searchsorted(keys, -_threshold(predictions, min_probability), side='right'))
+
+def count_matching(predictions, departments=None, risk_levels=None, min_probability=0.0):
+    """
+    Number of rows matching the filters.
+    
+    Args:
+        predictions: DataFrame with predictions
+        departments: Departments to keep (all if empty or None)
+        risk_levels: Risk categories to keep (all if empty or None)
+        min_probability: Lowest probability to include
+    
+    Returns:
+        Row count
+    """
+    _, keys = filtered_order(predictions, departments, risk_levels)
+    
+    return _threshold_cut(keys, predictions, min_probability)
+
+def prediction_page(predictions, page=0, page_size=100, departments=None, risk_levels=None,
+                    min_probability=0.0, columns=None):
+    """
+    One page of the predictions table, highest probability first.
+    
+    Args:
+        predictions: DataFrame with predictions
+        page: Zero-based page number
+        page_size: Rows per page
+        departments: Departments to keep (all if empty or None)
+        risk_levels: Risk categories to keep (all if empty or None)
+        min_probability: Lowest probability to include
+        columns: Columns to return (defaults to the available TABLE_COLUMNS)
+    
+    Returns:
+        DataFrame with the page's rows
+    """
+    if columns is None:
+        columns = [col for col in TABLE_COLUMNS if col in predictions.columns]
+    
+    positions, keys = filtered_order(predictions, departments, risk_levels)
+    positions = positions[:_threshold_cut(keys, predictions, min_probability)]
+    
+    return predictions[columns].take(positions[page * page_size:(page + 1) * page_size])
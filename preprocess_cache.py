@@ -0,0 +1,263 @@
+"""
+Content-addressed cache of preprocess_data results.
+
+Retraining on the same upload (with another model type, test size or
+tuning setting) reuses the fitted preprocessor and transformed matrix
+instead of re-running preprocess_data. Entries are keyed by a hash of the
+input frame together with the preprocessing options, kept in memory for
+the server process and persisted to disk so they survive restarts. Both
+tiers evict least recently used entries once their size limit is reached.
+
+Cached matrices and preprocessors are shared between callers and must be
+treated as read-only.
+"""
+import hashlib
+import os
+import pickle
+import threading
+import weakref
+from collections import OrderedDict
+from datetime import datetime
+
+import pandas as pd
+import scipy.sparse as sp
+
+from data_processing import preprocess_data, SPARSE_THRESHOLD
+
+# Location and size limits, overridable through the environment
+CACHE_DIR = os.environ.get('HR_PREPROCESS_CACHE_DIR', '.preprocess_cache')
+MAX_MEMORY_BYTES = int(os.environ.get('HR_PREPROCESS_CACHE_MEMORY_MB', 512)) * 1024 ** 2
+MAX_DISK_BYTES = int(os.environ.get('HR_PREPROCESS_CACHE_DISK_MB', 2048)) * 1024 ** 2
+
+# Bumped whenever preprocess_data changes its output, so stale entries are not reused
+CACHE_VERSION = 1
+
+def _result_nbytes(result):
+    """
+    Approximate memory held by a preprocess_data result.
+    """
+    X, y = result[0], result[1]
+    if sp.issparse(X):
+        size = X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+    elif isinstance(X, pd.DataFrame):
+        size = int(X.memory_usage(deep=True).sum())
+    else:
+        size = X.nbytes
+    
+    return size + int(y.memory_usage(deep=True))
+
+class PreprocessCache:
+    """
+    Two-tier (memory and disk) LRU cache of preprocessing results.
+    """
+    
+    def __init__(self, cache_dir=CACHE_DIR, max_memory_bytes=MAX_MEMORY_BYTES, max_disk_bytes=MAX_DISK_BYTES):
+        """
+        Initialize the cache
+        
+        Args:
+            cache_dir (str): Directory for persisted entries (None keeps the cache in memory only)
+            max_memory_bytes (int): Size limit of the in-memory tier
+            max_disk_bytes (int): Size limit of the on-disk tier
+        """
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+    
+    def _path(self, key):
+        """
+        File holding a persisted entry.
+        """
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+    
+    def get(self, key):
+        """
+        Look up a cached result, promoting disk entries to memory.
+        
+        Args:
+            key (str): Cache key
+        
+        Returns:
+            The cached result, or None on a miss
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+        
+        if self.cache_dir is not None:
+            path = self._path(key)
+            try:
+                with open(path, 'rb') as f:
+                    result = pickle.load(f)
+                # Touch the file so disk eviction sees it as recently used
+                os.utime(path)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                result = None
+            
+            if result is not None:
+                self._remember(key, result)
+                with self._lock:
+                    self.disk_hits += 1
+                return result
+        
+        with self._lock:
+            self.misses += 1
+        return None
+    
+    def put(self, key, result):
+        """
+        Store a result in memory and on disk.
+        
+        Args:
+            key (str): Cache key
+            result: preprocess_data result tuple
+        """
+        self._remember(key, result)
+        
+        if self.cache_dir is not None:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                # Write to a temporary name first so readers never see a partial file
+                temp_path = self._path(key) + f".{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(temp_path, 'wb') as f:
+                    pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temp_path, self._path(key))
+                self._evict_disk()
+            except OSError:
+                # A read-only or full disk only costs the persistent tier
+                pass
+    
+    def _remember(self, key, result):
+        """
+        Add a result to the memory tier, evicting the oldest entries over the limit.
+        """
+        size = _result_nbytes(result)
+        if size > self.max_memory_bytes:
+            return
+        
+        with self._lock:
+            if key in self._entries:
+                self._memory_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (result, size)
+            self._memory_bytes += size
+            
+            while self._memory_bytes > self.max_memory_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._memory_bytes -= evicted_size
+    
+    def _evict_disk(self):
+        """
+        Delete the least recently used files until the directory fits the limit.
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.pkl'):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+            total -= size
+    
+    def clear(self):
+        """
+        Remove every cached result from memory and disk.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._memory_bytes = 0
+        
+        if self.cache_dir is not None and os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if name.endswith('.pkl'):
+                    os.remove(os.path.join(self.cache_dir, name))
+    
+    def stats(self):
+        """
+        Report cache usage.
+        
+        Returns:
+            Dictionary with entry count, memory size, hits, disk hits and misses
+        """
+        with self._lock:
+            return {'entries': len(self._entries), 'memory_mb': self._memory_bytes / 1024 ** 2,
+                    'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses}
+
+# Shared by all sessions of the server process
+preprocess_cache = PreprocessCache()
+
+# Fingerprints memoized per frame object: id -> (weak reference, fingerprint)
+_fingerprints = {}
+
+def frame_fingerprint(df):
+    """
+    Compute a content fingerprint of a DataFrame.
+    
+    The fingerprint is memoized per frame object, so a frame must not be
+    modified in place after it has been fingerprinted.
+    
+    Args:
+        df: Pandas DataFrame
+    
+    Returns:
+        Hex digest identifying the frame's contents
+    """
+    key = id(df)
+    entry = _fingerprints.get(key)
+    if entry is not None and entry[0]() is df:
+        return entry[1]
+    
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((df.shape, [str(col) for col in df.columns],
+                        [str(dtype) for dtype in df.dtypes])).encode())
+    if len(df):
+        digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    
+    fingerprint = digest.hexdigest()
+    _fingerprints[key] = (weakref.ref(df, lambda _, key=key: _fingerprints.pop(key, None)), fingerprint)
+    
+    return fingerprint
+
+def cached_preprocess_data(df, target_column, id_column, as_of_date=None, sparse=False,
+                           sparse_threshold=SPARSE_THRESHOLD, encoding='onehot', cache=None):
+    """
+    preprocess_data with results reused for identical inputs and options.
+    
+    Args:
+        df, target_column, id_column, as_of_date, sparse, sparse_threshold,
+        encoding: As for preprocess_data
+        cache: PreprocessCache to use (defaults to the shared preprocess_cache)
+    
+    Returns:
+        Same tuple as preprocess_data: X, y, preprocessor, feature_names
+    """
+    cache = cache if cache is not None else preprocess_cache
+    
+    # Derived tenure depends on the reference date, so "today" is part of the key
+    reference_day = pd.Timestamp(as_of_date if as_of_date is not None else datetime.now()).normalize()
+    
+    options = (CACHE_VERSION, target_column, id_column, reference_day.isoformat(), sparse,
+               sparse_threshold, encoding)
+    key = hashlib.blake2b(f"{frame_fingerprint(df)}{options!r}".encode(), digest_size=16).hexdigest()
+    
+    result = cache.get(key)
+    if result is None:
+        result = preprocess_data(df, target_column, id_column, as_of_date=as_of_date, sparse=sparse,
+                                 sparse_threshold=sparse_threshold, encoding=encoding)
+        cache.put(key, result)
+    
+    return result
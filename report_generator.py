@@ -0,0 +1,728 @@
+from datetime import datetime
+
+import numpy as np
+
+from utils.utils import assign_risk_categories
+from aggregates import risk_counts, department_summary, department_metrics, job_title_risk, high_risk_employees
+from prediction_table import prediction_page
+from report_tables import render_table, threshold_classes, category_classes
+
+def generate_printable_report(predictions, is_individual=False, employee_id=None, department=None, lang='ar'):
+    """
+    Generate a printable HTML report of turnover predictions.
+    
+    Args:
+        predictions: DataFrame with predictions
+        is_individual: Whether to report on a single employee
+        employee_id: Employee ID for individual reports
+        department: Department for department reports
+        lang: Language code (kept for callers; the report is rendered in Arabic)
+    
+    Returns:
+        HTML document as a string
+    """
+    # Enhanced CSS for better printing experience
+    css = """
+    <style>
+        body {
+            font-family: 'Arial', 'Helvetica', sans-serif;
+            line-height: 1.6;
+            margin: 20px;
+            direction: rtl;
+            background-color: #ffffff;
+            color: #333333;
+        }
+        .header {
+            text-align: center;
+            margin-bottom: 30px;
+            border-bottom: 2px solid #333;
+            padding-bottom: 10px;
+            position: relative;
+        }
+        .header::before {
+            content: "";
+            position: absolute;
+            bottom: -2px;
+            right: 0;
+            left: 0;
+            height: 2px;
+            background: linear-gradient(to left, #3498db, #2ecc71);
+        }
+        h1 {
+            color: #2c3e50;
+            margin-bottom: 10px;
+        }
+        h2 {
+            color: #3498db;
+            border-bottom: 1px solid #eee;
+            padding-bottom: 5px;
+            margin-top: 30px;
+            page-break-after: avoid;
+        }
+        h3 {
+            color: #34495e;
+            margin-top: 20px;
+            page-break-after: avoid;
+        }
+        h4 {
+            color: #2980b9;
+            margin-top: 15px;
+            page-break-after: avoid;
+        }
+        p {
+            margin-bottom: 15px;
+        }
+        table {
+            width: 100%;
+            border-collapse: collapse;
+            margin: 20px 0;
+            page-break-inside: avoid;
+        }
+        th, td {
+            padding: 10px;
+            border: 1px solid #ddd;
+            text-align: right;
+        }
+        th {
+            background-color: #f2f2f2;
+            font-weight: bold;
+        }
+        tr {
+            page-break-inside: avoid;
+        }
+        .risk-high {
+            background-color: #ffcccc;
+            color: #cc0000;
+            font-weight: bold;
+        }
+        .risk-medium {
+            background-color: #fff4cc;
+            color: #cc7a00;
+        }
+        .risk-low {
+            background-color: #ccffcc;
+            color: #006600;
+        }
+        .metrics {
+            display: flex;
+            justify-content: space-between;
+            flex-wrap: wrap;
+            margin-bottom: 20px;
+            page-break-inside: avoid;
+        }
+        .metric-box {
+            width: 22%;
+            padding: 15px;
+            background-color: #f8f9fa;
+            border-radius: 5px;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+            margin-bottom: 15px;
+            text-align: center;
+        }
+        .metric-value {
+            font-size: 24px;
+            font-weight: bold;
+            margin: 10px 0;
+            color: #2980b9;
+        }
+        .reason {
+            background-color: #f9f9f9;
+            border-right: 4px solid #e74c3c;
+            padding: 10px 15px;
+            margin-bottom: 15px;
+            border-radius: 5px;
+            page-break-inside: avoid;
+        }
+        ul, ol {
+            padding-right: 20px;
+            margin-bottom: 20px;
+        }
+        li {
+            margin-bottom: 8px;
+        }
+        .print-button {
+            background-color: #3498db;
+            color: white;
+            border: none;
+            padding: 10px 20px;
+            border-radius: 5px;
+            cursor: pointer;
+            font-size: 16px;
+            margin-bottom: 20px;
+        }
+        .print-button:hover {
+            background-color: #2980b9;
+        }
+        .print-only {
+            display: none;
+        }
+        
+        /* Page break controls */
+        .page-break {
+            page-break-after: always;
+            height: 0;
+            margin: 0;
+            padding: 0;
+        }
+        
+        /* Print-specific styles */
+        @media print {
+            @page {
+                size: A4;
+                margin: 1.5cm;
+            }
+            html, body {
+                width: 210mm;
+                height: 297mm;
+            }
+            .no-print {
+                display: none !important;
+            }
+            .print-only {
+                display: block;
+            }
+            body {
+                margin: 0;
+                padding: 15px;
+                font-size: 12pt;
+            }
+            .header {
+                position: running(header);
+            }
+            .metric-box {
+                box-shadow: none;
+                border: 1px solid #ddd;
+                break-inside: avoid;
+            }
+            h1 { font-size: 22pt; }
+            h2 { font-size: 18pt; }
+            h3 { font-size: 15pt; }
+            h4 { font-size: 13pt; }
+            
+            /* Guarantee that certain elements stay together */
+            h1, h2, h3, h4, h5, h6 {
+                page-break-after: avoid;
+            }
+            h1 + *, h2 + *, h3 + * {
+                page-break-before: avoid;
+            }
+            table, figure, .metrics, .reason {
+                page-break-inside: avoid;
+            }
+            
+            /* Display URLs after links in printed version */
+            a::after {
+                content: " (" attr(href) ")";
+                font-size: 90%;
+                color: #333;
+            }
+        }
+    </style>
+    """
+    
+    # Improved print button with better styling and multiple browser support
+    print_button = """
+    <button class="print-button no-print" 
+            style="background: #4CAF50; 
+                   color: white; 
+                   font-size: 18px; 
+                   padding: 10px 20px; 
+                   cursor: pointer; 
+                   border: none; 
+                   border-radius: 4px; 
+                   margin: 20px 0; 
+                   display: block;">طباعة التقرير</button>
+    <script>
+        // Function to handle print button click with better cross-browser support
+        function printReport() {
+            // For most modern browsers
+            if (window.print) {
+                // Give the browser a moment to render everything properly
+                setTimeout(function() {
+                    window.print();
+                }, 300);
+            } else {
+                // Fallback message for very old browsers
+                alert("عفواً، متصفحك لا يدعم وظيفة الطباعة. يرجى تحديث المتصفح أو استخدام متصفح آخر.");
+            }
+        }
+        
+        // Immediately attach event handlers when script loads
+        (function() {
+            // Multiple approaches to ensure button works
+            var printButton = document.querySelector('.print-button');
+            if (printButton) {
+                // Modern event listener
+                printButton.addEventListener('click', printReport);
+                // Also set the onclick property for older browsers
+                printButton.onclick = printReport;
+            }
+            
+            // Add keyboard shortcut (Ctrl+P) in case button fails
+            document.addEventListener('keydown', function(e) {
+                if ((e.ctrlKey || e.metaKey) && e.key === 'p') {
+                    // Let browser handle the print dialog
+                    console.log('Print shortcut detected');
+                }
+            });
+            
+            // Auto-trigger print dialog after 2 seconds for convenience
+            setTimeout(function() {
+                var printButton = document.querySelector('.print-button');
+                if (printButton) {
+                    // Make button pulse to attract attention
+                    printButton.style.animation = 'pulse 1.5s infinite';
+                    printButton.style.webkitAnimation = 'pulse 1.5s infinite';
+                }
+            }, 1000);
+        })();
+    </script>
+    <style>
+        @keyframes pulse {
+            0% { transform: scale(1); }
+            50% { transform: scale(1.05); }
+            100% { transform: scale(1); }
+        }
+        @-webkit-keyframes pulse {
+            0% { -webkit-transform: scale(1); }
+            50% { -webkit-transform: scale(1.05); }
+            100% { -webkit-transform: scale(1); }
+        }
+    </style>
+    """
+    
+    # Generate report content based on type
+    if is_individual and employee_id is not None:
+        # Individual employee report
+        employee = predictions[predictions['Employee_ID'] == employee_id].iloc[0]
+        
+        # Header
+        header = f"""
+        <div class="header">
+            <h1>تقرير مخاطر ترك العمل للموظف</h1>
+            <p><strong>تاريخ التقرير:</strong> {datetime.now().strftime('%Y-%m-%d')}</p>
+        </div>
+        """
+        
+        # Employee details
+        employee_details = f"""
+        <h2>معلومات الموظف</h2>
+        <div class="metrics">
+            <div class="metric-box">
+                <p>رقم الموظف</p>
+                <div class="metric-value">{employee['Employee_ID']}</div>
+            </div>
+            <div class="metric-box">
+                <p>المسمى الوظيفي</p>
+                <div class="metric-value">{employee['Job_Title']}</div>
+            </div>
+            <div class="metric-box">
+                <p>القسم</p>
+                <div class="metric-value">{employee['Department']}</div>
+            </div>
+            <div class="metric-box">
+                <p>سنوات الخدمة</p>
+                <div class="metric-value">{employee['Years_At_Company']:.1f}</div>
+            </div>
+        </div>
+        """
+        
+        # Risk assessment
+        risk_color = {
+            'High': '#cc0000',
+            'Medium': '#cc7a00',
+            'Low': '#006600'
+        }
+        
+        risk_assessment = f"""
+        <h2>تقييم مخاطر ترك العمل</h2>
+        <div style="text-align: center; padding: 20px; background-color: #f9f9f9; border-radius: 10px; margin-bottom: 30px;">
+            <h3>احتمالية ترك العمل</h3>
+            <div style="font-size: 36px; font-weight: bold; margin: 20px 0; color: {risk_color[employee['Risk_Category']]};">
+                {employee['Turnover_Probability']:.1%}
+            </div>
+            <h3>مستوى المخاطرة</h3>
+            <div style="font-size: 24px; font-weight: bold; color: {risk_color[employee['Risk_Category']]};">
+                {employee['Risk_Category']}
+            </div>
+        </div>
+        """
+        
+        # Potential resignation reasons based on employee data
+        reasons_section = """
+        <h2>الأسباب المحتملة للاستقالة</h2>
+        <div style="padding: 15px; background-color: #f5f5f5; border-radius: 5px; margin-bottom: 20px;">
+        """
+        
+        # Analyze employee data to determine potential reasons
+        reasons = []
+        
+        # Salary-related reasons
+        if 'Monthly_Salary' in employee and employee['Performance_Score'] > 3 and employee['Monthly_Salary'] < 10000:
+            reasons.append("""
+            <div class="reason">
+                <h4>العوامل المالية والمرتبات</h4>
+                <p>راتب الموظف أقل من المستوى المتوقع مقارنة بأدائه العالي، مما قد يؤدي إلى شعوره بعدم التقدير المالي لمساهماته.</p>
+            </div>
+            """)
+            
+        # Work hours related reasons
+        if 'Work_Hours_Per_Week' in employee and employee['Work_Hours_Per_Week'] > 45:
+            reasons.append("""
+            <div class="reason">
+                <h4>عبء العمل وساعات العمل</h4>
+                <p>يعمل الموظف ساعات إضافية بشكل منتظم، مما قد يؤثر على توازن حياته المهنية والشخصية ويزيد من مستوى الإجهاد.</p>
+            </div>
+            """)
+            
+        # Career growth concerns
+        if 'Years_At_Company' in employee and employee['Years_At_Company'] > 3 and employee['Performance_Score'] > 3:
+            reasons.append("""
+            <div class="reason">
+                <h4>فرص التطور المهني</h4>
+                <p>الموظف لديه أداء مرتفع وخدمة طويلة في الشركة ولكن قد يشعر بتوقف مساره الوظيفي أو محدودية فرص الترقية.</p>
+            </div>
+            """)
+            
+        # Department specific concerns
+        if 'Department' in employee:
+            if employee['Department'] == 'Sales':
+                reasons.append("""
+                <div class="reason">
+                    <h4>ضغوط العمل في قسم المبيعات</h4>
+                    <p>الموظفون في قسم المبيعات يعانون من ضغوط مستمرة لتحقيق الأهداف، مما قد يؤدي إلى الإرهاق وانخفاض الرضا الوظيفي.</p>
+                </div>
+                """)
+            elif employee['Department'] == 'IT' or employee['Department'] == 'Technology':
+                reasons.append("""
+                <div class="reason">
+                    <h4>تنافسية سوق العمل التقني</h4>
+                    <p>خبراء التكنولوجيا مطلوبون بشدة في سوق العمل، مما يعرضهم لفرص خارجية أفضل من حيث الراتب والمزايا.</p>
+                </div>
+                """)
+            elif employee['Department'] == 'HR' or employee['Department'] == 'Human Resources':
+                reasons.append("""
+                <div class="reason">
+                    <h4>التحديات المتعلقة بإدارة الموارد البشرية</h4>
+                    <p>قد يواجه موظفو الموارد البشرية تحديات في التعامل مع ضغوط ومتطلبات مختلف الإدارات، مما يزيد العبء عليهم.</p>
+                </div>
+                """)
+        
+        # Add more generic reasons if we haven't found specific ones
+        if len(reasons) < 2:
+            if employee['Risk_Category'] == 'High':
+                reasons.append("""
+                <div class="reason">
+                    <h4>عدم الرضا الوظيفي</h4>
+                    <p>قد يعاني الموظف من عدم الرضا عن بيئة العمل أو ثقافة الشركة أو أسلوب الإدارة.</p>
+                </div>
+                """)
+                reasons.append("""
+                <div class="reason">
+                    <h4>فرص سوق العمل</h4>
+                    <p>توفر فرص مهنية أفضل في سوق العمل من حيث التعويضات أو المسار المهني أو بيئة العمل.</p>
+                </div>
+                """)
+        
+        # Complete reasons section
+        for reason in reasons:
+            reasons_section += reason
+            
+        reasons_section += "</div>"
+        
+        # Personalized recommendations
+        recommendations = """
+        <h2>التوصيات المخصصة للاحتفاظ بالموظف</h2>
+        """
+        
+        # Add personalized recommendations section
+        if employee['Risk_Category'] == 'High':
+            recommendations += """
+            <div style="padding: 15px; background-color: #ffeeee; border-radius: 5px; margin-bottom: 15px;">
+                <h3>خطة احتفاظ عاجلة</h3>
+                <p>هذا الموظف معرض بدرجة كبيرة لخطر الاستقالة ويتطلب اهتمامًا فوريًا واستراتيجية احتفاظ مخصصة.</p>
+            </div>
+            """
+        elif employee['Risk_Category'] == 'Medium':
+            recommendations += """
+            <div style="padding: 15px; background-color: #fff8ee; border-radius: 5px; margin-bottom: 15px;">
+                <h3>خطة احتفاظ متوسطة الأولوية</h3>
+                <p>هذا الموظف يحتاج إلى مراقبة وخطة تطوير مخصصة لتعزيز رضاه الوظيفي وتقليل احتمالية تركه للعمل.</p>
+            </div>
+            """
+        else:
+            recommendations += """
+            <div style="padding: 15px; background-color: #eeffee; border-radius: 5px; margin-bottom: 15px;">
+                <h3>خطة تطوير مستمرة</h3>
+                <p>مخاطر استقالة هذا الموظف منخفضة، ولكن يجب الاستمرار في خطط التطوير والتحفيز الروتينية.</p>
+            </div>
+            """
+            
+        recommendations += "<ul>"
+        
+        # Generate tailored recommendations based on employee data
+        rec_list = []
+        
+        # Add specific recommendations based on identified reasons
+        for reason in reasons:
+            if "العوامل المالية" in reason:
+                rec_list.append("إجراء مراجعة فورية للراتب وتعديله بما يتناسب مع أداء الموظف وقيمته في السوق")
+                rec_list.append("تقديم مكافآت مالية مرتبطة بالأداء ومزايا إضافية لتحسين التعويض الإجمالي")
+            
+            if "عبء العمل" in reason:
+                rec_list.append("مراجعة عبء العمل وتوزيع المهام بشكل أكثر توازناً")
+                rec_list.append("النظر في برامج العمل المرنة أو العمل عن بعد لتحسين التوازن بين الحياة المهنية والشخصية")
+            
+            if "فرص التطور" in reason:
+                rec_list.append("تطوير خطة مسار وظيفي واضحة مع خطوات الترقية المحتملة والمهارات المطلوبة")
+                rec_list.append("توفير فرص للتدريب وتطوير المهارات في مجالات جديدة لتوسيع آفاق التطور المهني")
+            
+            if "قسم المبيعات" in reason:
+                rec_list.append("مراجعة أهداف المبيعات لضمان واقعيتها وتحقيق التوازن بين التحدي وإمكانية الإنجاز")
+                rec_list.append("تطوير نظام دعم أفضل لفريق المبيعات وتحسين أدوات العمل")
+            
+            if "سوق العمل التقني" in reason:
+                rec_list.append("تحديث حزمة التعويضات والمزايا لتكون منافسة في سوق تكنولوجيا المعلومات")
+                rec_list.append("توفير فرص العمل على أحدث التقنيات والمشاريع المبتكرة للحفاظ على الاهتمام المهني")
+            
+            if "الموارد البشرية" in reason:
+                rec_list.append("تقديم الدعم الإضافي لفريق الموارد البشرية وتبسيط العمليات الإدارية")
+                rec_list.append("توفير فرص التدريب المتخصص في مجالات متقدمة من إدارة الموارد البشرية")
+        
+        # Add general recommendations if we don't have enough specific ones
+        if len(rec_list) < 3:
+            if employee['Risk_Category'] == 'High':
+                rec_list.append("إجراء مقابلة احتفاظ عاجلة مع الموظف للاستماع إلى مخاوفه واحتياجاته")
+                rec_list.append("تطوير حزمة تعويضات مخصصة تشمل مكافآت مالية ومزايا إضافية")
+                rec_list.append("تقديم فرص للعمل على مشاريع مهمة ومرئية تعزز من مكانة الموظف في المؤسسة")
+            elif employee['Risk_Category'] == 'Medium':
+                rec_list.append("جدولة مقابلات دورية للتطوير المهني ومتابعة رضا الموظف")
+                rec_list.append("تقديم فرص تدريبية وتطويرية تتماشى مع اهتمامات الموظف")
+            else:
+                rec_list.append("الحفاظ على التواصل المنتظم واستمرار برامج التطوير الحالية")
+        
+        # Add recommendations to HTML
+        for r in rec_list:
+            recommendations += f"<li>{r}</li>\n"
+        
+        recommendations += "</ul>"
+        
+        # Add action plan section
+        recommendations += """
+        <h3>خطة العمل المقترحة</h3>
+        <div style="padding: 15px; background-color: #f0f8ff; border-radius: 5px;">
+            <p><strong>الخطوات التالية:</strong></p>
+            <ol>
+                <li>جدولة اجتماع مباشر مع الموظف خلال الأسبوع القادم</li>
+                <li>مناقشة مسار التطور المهني وتوثيق أهداف الموظف</li>
+                <li>مراجعة حزمة التعويضات والمزايا مع الإدارة</li>
+                <li>تطوير خطة تطوير مهني مخصصة بالتعاون مع الموظف</li>
+                <li>جدولة متابعة دورية كل ثلاثة أشهر لقياس فعالية الخطة</li>
+            </ol>
+        </div>
+        """
+        
+        # Complete the report
+        report_html = f"{css}{header}{print_button}{employee_details}{risk_assessment}{reasons_section}{recommendations}"
+        
+    elif department is not None:
+        # Department level report
+        dept_metrics = department_metrics(predictions, department)
+        
+        # Header
+        header = f"""
+        <div class="header">
+            <h1>تقرير مخاطر ترك العمل للقسم</h1>
+            <p><strong>القسم:</strong> {department}</p>
+            <p><strong>تاريخ التقرير:</strong> {datetime.now().strftime('%Y-%m-%d')}</p>
+        </div>
+        """
+        
+        # Department metrics
+        dept_summary = f"""
+        <h2>ملخص القسم</h2>
+        <div class="metrics">
+            <div class="metric-box">
+                <p>عدد الموظفين</p>
+                <div class="metric-value">{dept_metrics['total_employees']}</div>
+            </div>
+            <div class="metric-box">
+                <p>نسبة المخاطر العالية</p>
+                <div class="metric-value">{dept_metrics['high_risk_percentage']:.1%}</div>
+            </div>
+            <div class="metric-box">
+                <p>متوسط احتمالية ترك العمل</p>
+                <div class="metric-value">{dept_metrics['avg_probability']:.2f}</div>
+            </div>
+            <div class="metric-box">
+                <p>متوسط سنوات الخدمة</p>
+                <div class="metric-value">{dept_metrics['avg_years']:.1f}</div>
+            </div>
+        </div>
+        """
+        
+        # High risk employees table
+        high_risk = high_risk_employees(predictions, department)
+        
+        high_risk_table = """
+        <h2>الموظفون ذوو المخاطر العالية</h2>
+        """
+        
+        if len(high_risk) > 0:
+            high_risk_table += render_table(
+                ["رقم الموظف", "المسمى الوظيفي", "احتمالية ترك العمل", "درجة الأداء", "سنوات الخدمة"],
+                high_risk,
+                [('Employee_ID', None), ('Job_Title', None), ('Turnover_Probability', '.1%'),
+                 ('Performance_Score', None), ('Years_At_Company', '.1f')],
+                row_classes=['risk-high'] * len(high_risk)
+            )
+        else:
+            high_risk_table += "<p>لا يوجد موظفون ذوو مخاطر عالية في هذا القسم.</p>"
+        
+        # Job title risk section
+        job_risk = job_title_risk(predictions, department)
+        
+        job_risk = job_risk.assign(Risk_Level=assign_risk_categories(job_risk['Turnover_Probability']))
+        
+        job_risk_table = """
+        <h2>مخاطر ترك العمل حسب المسمى الوظيفي</h2>
+        """ + render_table(
+            ["المسمى الوظيفي", "متوسط احتمالية ترك العمل", "مستوى المخاطرة"],
+            job_risk,
+            [('Job_Title', None), ('Turnover_Probability', '.1%'), ('Risk_Level', None)],
+            row_classes=category_classes(job_risk['Risk_Level'])
+        )
+        
+        # Recommendations
+        recommendations = """
+        <h2>توصيات للقسم</h2>
+        """
+        
+        if dept_metrics['high_risk_percentage'] > 0.3:
+            recommendations += """
+            <div style="padding: 15px; background-color: #ffcccc; border-radius: 5px;">
+                <h3>مخاطر عالية للقسم</h3>
+                <p>هذا القسم يواجه مخاطر عالية لترك الموظفين. يجب اتخاذ إجراءات فورية لتحسين الاحتفاظ بالموظفين.</p>
+            </div>
+            <ul>
+                <li>إجراء مراجعة شاملة لسياسات الرواتب والتعويضات في القسم</li>
+                <li>تقييم عبء العمل وتوازن الحياة المهنية للموظفين</li>
+                <li>تحسين برامج التطوير المهني وفرص الترقية</li>
+                <li>معالجة قضايا الثقافة التنظيمية والقيادة</li>
+                <li>تنفيذ برامج احتفاظ خاصة للموظفين ذوي المخاطر العالية</li>
+            </ul>
+            """
+        elif dept_metrics['high_risk_percentage'] > 0.15:
+            recommendations += """
+            <div style="padding: 15px; background-color: #fff4cc; border-radius: 5px;">
+                <h3>مخاطر متوسطة للقسم</h3>
+                <p>هذا القسم يواجه بعض المخاطر المتعلقة بترك الموظفين. هناك حاجة إلى تحسينات محددة.</p>
+            </div>
+            <ul>
+                <li>تحليل أسباب مخاطر ترك العمل بين المسميات الوظيفية المختلفة</li>
+                <li>تحسين برامج التقدير والمكافآت</li>
+                <li>تقديم فرص تدريبية إضافية وبرامج تطوير المهارات</li>
+                <li>تعزيز التواصل وجمع التغذية الراجعة من الموظفين</li>
+            </ul>
+            """
+        else:
+            recommendations += """
+            <div style="padding: 15px; background-color: #ccffcc; border-radius: 5px;">
+                <h3>مخاطر منخفضة للقسم</h3>
+                <p>هذا القسم يتمتع بمعدل احتفاظ جيد بالموظفين. استمر في الممارسات الحالية مع التحسين المستمر.</p>
+            </div>
+            <ul>
+                <li>الحفاظ على التواصل المنتظم مع الموظفين</li>
+                <li>الاستمرار في تقديم فرص النمو والتطوير</li>
+                <li>مشاركة أفضل الممارسات مع الأقسام الأخرى</li>
+            </ul>
+            """
+        
+        # Complete the report
+        report_html = f"{css}{header}{print_button}{dept_summary}{high_risk_table}{job_risk_table}{recommendations}"
+        
+    else:
+        # Overall report for all data
+        # Header
+        header = f"""
+        <div class="header">
+            <h1>تقرير تحليل مخاطر ترك العمل</h1>
+            <p><strong>تاريخ التقرير:</strong> {datetime.now().strftime('%Y-%m-%d')}</p>
+        </div>
+        """
+        
+        # Overall metrics
+        total_employees = len(predictions)
+        counts = risk_counts(predictions)
+        high_risk = counts['High']
+        medium_risk = counts['Medium']
+        low_risk = counts['Low']
+        
+        overall_metrics = f"""
+        <h2>الملخص العام</h2>
+        <div class="metrics">
+            <div class="metric-box">
+                <p>إجمالي الموظفين</p>
+                <div class="metric-value">{total_employees}</div>
+            </div>
+            <div class="metric-box">
+                <p>موظفون بمخاطر عالية</p>
+                <div class="metric-value">{high_risk} ({high_risk/total_employees:.1%})</div>
+            </div>
+            <div class="metric-box">
+                <p>موظفون بمخاطر متوسطة</p>
+                <div class="metric-value">{medium_risk} ({medium_risk/total_employees:.1%})</div>
+            </div>
+            <div class="metric-box">
+                <p>موظفون بمخاطر منخفضة</p>
+                <div class="metric-value">{low_risk} ({low_risk/total_employees:.1%})</div>
+            </div>
+        </div>
+        """
+        
+        # Department breakdown
+        dept_table = department_summary(predictions)
+        
+        dept_breakdown = """
+        <h2>تحليل القسم</h2>
+        """ + render_table(
+            ["القسم", "عدد الموظفين", "نسبة المخاطر العالية", "متوسط احتمالية ترك العمل"],
+            dept_table,
+            [('Department', None), ('total_employees', None), ('high_risk_percentage', '.1%'),
+             ('avg_probability', '.2f')],
+            row_classes=threshold_classes(dept_table['high_risk_percentage'], 0.3, 0.15)
+        )
+        
+        # Top high-risk employees, read from the cached probability order
+        top_risk = prediction_page(predictions, page_size=10)
+        
+        top_risk_table = """
+        <h2>أعلى 10 موظفين من حيث مخاطر ترك العمل</h2>
+        """ + render_table(
+            ["رقم الموظف", "القسم", "المسمى الوظيفي", "احتمالية ترك العمل", "درجة الأداء", "سنوات الخدمة"],
+            top_risk,
+            [('Employee_ID', None), ('Department', None), ('Job_Title', None),
+             ('Turnover_Probability', '.1%'), ('Performance_Score', None), ('Years_At_Company', '.1f')],
+            row_classes=np.where(top_risk['Risk_Category'] == 'High', 'risk-high', 'risk-medium')
+        )
+        
+        # Summary
+        summary = """
+        <h2>ملخص وتوصيات</h2>
+        <p>
+            يقدم هذا التقرير تحليلاً شاملاً لمخاطر ترك العمل داخل المنظمة. 
+            الإجراءات الموصى بها تشمل:
+        </p>
+        <ul>
+            <li>إعطاء الأولوية للتدخلات في الأقسام ذات نسب المخاطر العالية</li>
+            <li>وضع خطط احتفاظ مخصصة للموظفين ذوي القيمة العالية والمخاطر العالية</li>
+            <li>معالجة العوامل الرئيسية المؤثرة على ترك العمل وفقًا لتحليل النظام</li>
+            <li>تنفيذ برامج تحسين مستمرة وجمع التغذية الراجعة من الموظفين</li>
+            <li>متابعة مقاييس الاحتفاظ بالموظفين بشكل دوري ومراجعة التقدم</li>
+        </ul>
+        """
+        
+        # Complete the report
+        report_html = f"{css}{header}{print_button}{overall_metrics}{dept_breakdown}{top_risk_table}{summary}"
+    
+    return report_html
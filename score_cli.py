@@ -0,0 +1,255 @@
+"""
+Command-line batch scoring outside Streamlit.
+
+Scores a CSV or Parquet file with a saved model and streams the predictions
+to the output file chunk by chunk, so nightly refreshes over the full
+workforce can run unattended:
+
+    python score_cli.py employees.csv predictions.csv --model-type XGBoost
+    python score_cli.py employees.parquet predictions.parquet --model-id 3 --as-of 2025-01-01
+
+Unless --no-session is given, the run is also recorded as a prediction
+session that can be opened from the app's sidebar.
+"""
+import argparse
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
+
+import database
+from models import predict_turnover
+from utils.data_processor import DEFAULT_CHUNKSIZE, apply_column_dtypes, concat_chunks, HR_COLUMN_DTYPES
+from utils.utils import assign_risk_categories
+
+def iter_input_chunks(path, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Read an input file in chunks with the HR column schema.
+    
+    Args:
+        path: Path to a CSV or Parquet file
+        chunksize: Rows per chunk
+    
+    Returns:
+        Iterator of DataFrames
+    """
+    if path.endswith('.csv'):
+        with pd.read_csv(path, dtype=HR_COLUMN_DTYPES, chunksize=chunksize) as reader:
+            yield from reader
+    elif path.endswith('.parquet'):
+        # pyarrow is only needed for Parquet files
+        import pyarrow.parquet as pq
+        
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield apply_column_dtypes(batch.to_pandas())
+    else:
+        raise ValueError("Unsupported file format. Please use a CSV or Parquet file.")
+
+class PredictionWriter:
+    """
+    Append prediction chunks to a CSV or Parquet file.
+    """
+    
+    def __init__(self, path):
+        if not path.endswith(('.csv', '.parquet')):
+            raise ValueError("Unsupported output format. Please use a CSV or Parquet file.")
+        
+        self.path = path
+        self._parquet_writer = None
+        self._wrote_header = False
+    
+    def write(self, chunk):
+        """
+        Append one chunk of predictions.
+        
+        Args:
+            chunk: DataFrame with predictions
+        """
+        if self.path.endswith('.csv'):
+            chunk.to_csv(self.path, mode='a' if self._wrote_header else 'w',
+                         header=not self._wrote_header, index=False)
+            self._wrote_header = True
+            return
+        
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        # Each chunk has its own categories, so write plain values to keep
+        # one schema across row groups
+        chunk = chunk.astype({
+            col: chunk[col].cat.categories.dtype
+            for col in chunk.columns if isinstance(chunk[col].dtype, pd.CategoricalDtype)
+        })
+        
+        if self._parquet_writer is None:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+        else:
+            table = pa.Table.from_pandas(chunk, schema=self._parquet_writer.schema, preserve_index=False)
+        
+        self._parquet_writer.write_table(table)
+    
+    def close(self):
+        """
+        Finish the output file.
+        """
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+def resolve_model(model_id=None, model_type=None):
+    """
+    Load a saved model by ID, or the latest model of a type.
+    
+    Args:
+        model_id: ID of the saved model
+        model_type: Model type whose latest model should be used
+    
+    Returns:
+        Tuple of (model_id, model, preprocessor, feature_names, model_type)
+    """
+    if model_id is None:
+        model_id = database.get_latest_model_id_by_type(model_type)
+        if model_id is None:
+            raise ValueError(f"No saved model of type '{model_type}'")
+    
+    model, preprocessor, feature_names, metrics, model_type = database.load_trained_model(model_id)
+    if model is None:
+        raise ValueError(f"No saved model with ID {model_id}")
+    
+    return model_id, model, preprocessor, feature_names, model_type
+
+def score_file(input_path, output_path, model, preprocessor, feature_names, as_of_date=None,
+               chunksize=DEFAULT_CHUNKSIZE, n_jobs=1, executor='thread', keep_predictions=False,
+               progress_callback=None):
+    """
+    Score an input file chunk by chunk and stream the predictions to disk.
+    
+    Args:
+        input_path: CSV or Parquet file with employee data
+        output_path: CSV or Parquet file for the predictions
+        model: Trained prediction model
+        preprocessor: Fitted data preprocessor
+        feature_names: Feature names used during training
+        as_of_date: Reference date for derived tenure, shared by all chunks
+        chunksize: Rows read and scored per chunk
+        n_jobs: Number of parallel scoring workers per chunk
+        executor: 'thread' or 'process' pool when n_jobs > 1
+        keep_predictions: Also return all predictions as one DataFrame
+        progress_callback: Called as progress_callback(rows_scored) after each chunk
+    
+    Returns:
+        Tuple of (rows scored, high-risk count, predictions DataFrame or None)
+    """
+    # Pin the reference date so every chunk is measured against the same day
+    as_of_date = pd.Timestamp(as_of_date) if as_of_date is not None else pd.Timestamp(datetime.now())
+    
+    writer = PredictionWriter(output_path)
+    kept = []
+    rows_scored = 0
+    high_risk = 0
+    
+    try:
+        for chunk in iter_input_chunks(input_path, chunksize):
+            predictions = predict_turnover(chunk, model, preprocessor, feature_names,
+                                           as_of_date=as_of_date, n_jobs=n_jobs, executor=executor)
+            predictions['Risk_Category'] = assign_risk_categories(predictions['Turnover_Probability'])
+            
+            writer.write(predictions)
+            if keep_predictions:
+                kept.append(predictions)
+            
+            rows_scored += len(predictions)
+            high_risk += int((predictions['Risk_Category'] == 'High').sum())
+            
+            if progress_callback is not None:
+                progress_callback(rows_scored)
+    finally:
+        writer.close()
+    
+    return rows_scored, high_risk, concat_chunks(kept) if kept else None
+
+def build_parser():
+    """
+    Build the command-line argument parser.
+    """
+    parser = argparse.ArgumentParser(description="Score employee turnover risk with a saved model.")
+    parser.add_argument('input', help="CSV or Parquet file with employee data")
+    parser.add_argument('output', help="CSV or Parquet file to write predictions to")
+    
+    model_group = parser.add_mutually_exclusive_group(required=True)
+    model_group.add_argument('--model-id', type=int, help="ID of the saved model to use")
+    model_group.add_argument('--model-type', help="Use the latest saved model of this type (e.g. XGBoost)")
+    
+    parser.add_argument('--as-of', help="Reference date for tenure (YYYY-MM-DD, defaults to today)")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help="Rows scored per chunk")
+    parser.add_argument('--n-jobs', type=int, default=1, help="Parallel scoring workers")
+    parser.add_argument('--executor', choices=['thread', 'process'], default='thread',
+                        help="Pool type used when --n-jobs is above 1")
+    parser.add_argument('--db', help="Database path (defaults to HR_ANALYTICS_DB or hr_analytics.db)")
+    parser.add_argument('--session-name', help="Name of the prediction session to record")
+    parser.add_argument('--no-session', action='store_true',
+                        help="Do not record a session (keeps memory bounded by the chunk size)")
+    parser.add_argument('--quiet', action='store_true', help="Do not report progress")
+    
+    return parser
+
+def main(argv=None):
+    """
+    Run batch scoring from the command line.
+    
+    Args:
+        argv: Argument list (defaults to sys.argv)
+    
+    Returns:
+        Process exit code
+    """
+    args = build_parser().parse_args(argv)
+    
+    if args.db:
+        database.set_db_path(args.db)
+    database.create_tables()
+    
+    try:
+        model_id, model, preprocessor, feature_names, model_type = resolve_model(args.model_id, args.model_type)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    
+    progress = None
+    if not args.quiet:
+        progress = lambda rows: print(f"scored {rows:,} rows", file=sys.stderr)
+    
+    start = time.perf_counter()
+    rows, high_risk, predictions = score_file(
+        args.input, args.output, model, preprocessor, feature_names,
+        as_of_date=args.as_of, chunksize=args.chunksize, n_jobs=args.n_jobs,
+        executor=args.executor, keep_predictions=not args.no_session,
+        progress_callback=progress
+    )
+    elapsed = time.perf_counter() - start
+    
+    if predictions is not None:
+        session_name = args.session_name or f"Batch scoring {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+        data = predictions.drop(columns=['Turnover_Probability', 'Risk_Category'])
+        database.save_session(
+            session_name,
+            data,
+            predictions,
+            None,  # Don't save model in prediction session
+            preprocessor,
+            feature_names,
+            model_type,
+            False,  # Not a training session
+            model_id,
+            f"Batch scoring of {rows} records with model {model_id} ({model_type})"
+        )
+    
+    print(f"{rows:,} rows scored with model {model_id} ({model_type}) in {elapsed:.1f}s; "
+          f"{high_risk:,} high risk -> {args.output}")
+    
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
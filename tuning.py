@@ -0,0 +1,273 @@
+"""
+Hyperparameter tuning with stratified cross-validation.
+
+The data is preprocessed once and every fold and candidate reuses the same
+matrix. Candidates are drawn at random (or raced with successive halving)
+and evaluated in parallel; XGBoost candidates stop early on a validation
+split of each training fold. On large datasets the search runs on a
+stratified sample of at most MAX_TUNING_ROWS rows, and the best
+configuration is then refitted on all rows.
+"""
+import time
+import numpy as np
+from scipy.stats import loguniform, randint, uniform
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.metrics import (accuracy_score, precision_score, recall_score,
+                             f1_score, roc_auc_score, confusion_matrix)
+from sklearn.model_selection import (StratifiedKFold, RandomizedSearchCV, HalvingRandomSearchCV,
+                                     cross_validate, train_test_split)
+
+from data_processing import has_categorical_columns
+from database import save_trained_model
+from explanations import store_feature_means
+from models import build_model
+
+# Rows used for the search; larger datasets are sampled down (stratified)
+MAX_TUNING_ROWS = 50_000
+
+# Search spaces per model type
+PARAM_DISTRIBUTIONS = {
+    "XGBoost": {
+        'max_depth': randint(3, 10),
+        'learning_rate': loguniform(0.01, 0.3),
+        'subsample': uniform(0.6, 0.4),
+        'colsample_bytree': uniform(0.6, 0.4),
+        'min_child_weight': randint(1, 10),
+        'reg_lambda': loguniform(0.01, 10)
+    },
+    "Random Forest": {
+        'n_estimators': randint(100, 500),
+        'max_depth': [None, 5, 10, 20],
+        'min_samples_split': randint(2, 20),
+        'min_samples_leaf': randint(1, 10),
+        'max_features': ['sqrt', 'log2', 0.5]
+    },
+    "Logistic Regression": {
+        'C': loguniform(1e-3, 100),
+        'penalty': ['l1', 'l2']
+    }
+}
+
+class EarlyStoppingXGBClassifier(ClassifierMixin, BaseEstimator):
+    """
+    XGBoost classifier that holds out part of its training data and stops
+    adding trees once the validation log loss stops improving.
+    
+    Used as the search estimator so that every fold picks its own number
+    of trees; the fitted booster is available as model_.
+    """
+    
+    def __init__(self, max_depth=5, learning_rate=0.1, subsample=0.8, colsample_bytree=0.8,
+                 min_child_weight=1, reg_lambda=1.0, n_estimators=1000, early_stopping_rounds=20,
+                 validation_fraction=0.1, random_state=42, n_jobs=1):
+        self.max_depth = max_depth
+        self.learning_rate = learning_rate
+        self.subsample = subsample
+        self.colsample_bytree = colsample_bytree
+        self.min_child_weight = min_child_weight
+        self.reg_lambda = reg_lambda
+        self.n_estimators = n_estimators
+        self.early_stopping_rounds = early_stopping_rounds
+        self.validation_fraction = validation_fraction
+        self.random_state = random_state
+        self.n_jobs = n_jobs
+    
+    def fit(self, X, y):
+        """
+        Fit on a stratified training split, stopping early on the rest.
+        
+        Args:
+            X: Training features
+            y: Training target
+        
+        Returns:
+            self
+        """
+        X_fit, X_val, y_fit, y_val = train_test_split(
+            X, y, test_size=self.validation_fraction, stratify=y, random_state=self.random_state
+        )
+        
+        self.model_ = build_model(
+            "XGBoost",
+            native_categorical=has_categorical_columns(X),
+            n_jobs=self.n_jobs,
+            max_depth=self.max_depth,
+            learning_rate=self.learning_rate,
+            subsample=self.subsample,
+            colsample_bytree=self.colsample_bytree,
+            min_child_weight=self.min_child_weight,
+            reg_lambda=self.reg_lambda,
+            n_estimators=self.n_estimators,
+            early_stopping_rounds=self.early_stopping_rounds,
+            random_state=self.random_state
+        )
+        self.model_.fit(X_fit, y_fit, eval_set=[(X_val, y_val)], verbose=False)
+        
+        self.classes_ = self.model_.classes_
+        self.best_iteration_ = self.model_.best_iteration
+        
+        return self
+    
+    def predict_proba(self, X):
+        """
+        Predict class probabilities with the best number of trees.
+        """
+        return self.model_.predict_proba(X)
+    
+    def predict(self, X):
+        """
+        Predict class labels with the best number of trees.
+        """
+        return self.model_.predict(X)
+
+def _search_estimator(model_type, early_stopping_rounds, random_state):
+    """
+    Create the estimator searched over for a model type.
+    
+    Estimators are single-threaded; parallelism comes from running folds
+    and candidates concurrently.
+    """
+    if model_type == "XGBoost":
+        return EarlyStoppingXGBClassifier(early_stopping_rounds=early_stopping_rounds,
+                                          random_state=random_state, n_jobs=1)
+    
+    return build_model(model_type, n_jobs=1, random_state=random_state)
+
+def _sample_rows(X, y, max_rows, random_state):
+    """
+    Draw a stratified sample of at most max_rows rows.
+    """
+    if max_rows is None or len(y) <= max_rows:
+        return X, y
+    
+    X_sample, _, y_sample, _ = train_test_split(X, y, train_size=max_rows, stratify=y,
+                                                random_state=random_state)
+    return X_sample, y_sample
+
+def _out_of_fold_metrics(X, y, estimator, cv, n_jobs):
+    """
+    Cross-validate one configuration and score its out-of-fold predictions.
+    
+    Returns:
+        Dictionary with accuracy, precision, recall, f1, auc and
+        confusion_matrix over all folds, plus the spread of the fold AUCs
+    """
+    results = cross_validate(estimator, X, y, cv=cv, scoring='roc_auc', n_jobs=n_jobs,
+                             return_estimator=True, return_indices=True)
+    
+    y = np.asarray(y)
+    probabilities = np.empty(len(y), dtype=np.float64)
+    for fold_estimator, test_index in zip(results['estimator'], results['indices']['test']):
+        X_test = X.iloc[test_index] if hasattr(X, 'iloc') else X[test_index]
+        probabilities[test_index] = fold_estimator.predict_proba(X_test)[:, 1]
+    predicted = (probabilities >= 0.5).astype(int)
+    
+    return {
+        "accuracy": accuracy_score(y, predicted),
+        "precision": precision_score(y, predicted, zero_division=0),
+        "recall": recall_score(y, predicted, zero_division=0),
+        "f1": f1_score(y, predicted, zero_division=0),
+        "auc": roc_auc_score(y, probabilities),
+        "confusion_matrix": confusion_matrix(y, predicted).tolist(),
+        "cv_auc_mean": float(np.mean(results['test_score'])),
+        "cv_auc_std": float(np.std(results['test_score']))
+    }
+
+def tune_model(X, y, model_type="XGBoost", search="random", n_iter=20, cv=5, n_jobs=1,
+               max_rows=MAX_TUNING_ROWS, early_stopping_rounds=20, random_state=42):
+    """
+    Search hyperparameters with stratified k-fold cross-validation.
+    
+    Args:
+        X: Preprocessed features (from preprocess_data), shared by all folds
+        y: Target
+        model_type: Type of model to tune
+        search: 'random' for randomized search or 'halving' for successive
+            halving, which evaluates candidates on growing row samples
+        n_iter: Number of candidate configurations
+        cv: Number of stratified folds
+        n_jobs: Number of folds and candidates evaluated in parallel
+        max_rows: Rows used for the search (None uses all rows)
+        early_stopping_rounds: Rounds without improvement before XGBoost stops
+        random_state: Seed for sampling, folds and candidates
+    
+    Returns:
+        Dictionary with model_type, model (refitted on all rows), best_params,
+        metrics (out-of-fold metrics of the best configuration together with
+        the search settings) and tuning_seconds
+    """
+    if model_type not in PARAM_DISTRIBUTIONS:
+        raise ValueError(f"Unsupported model type: {model_type}")
+    if search not in ('random', 'halving'):
+        raise ValueError(f"Unsupported search: {search}")
+    if has_categorical_columns(X) and model_type != "XGBoost":
+        raise ValueError(f"{model_type} requires one-hot encoded features")
+    
+    start = time.perf_counter()
+    
+    X_search, y_search = _sample_rows(X, y, max_rows, random_state)
+    folds = StratifiedKFold(n_splits=cv, shuffle=True, random_state=random_state)
+    estimator = _search_estimator(model_type, early_stopping_rounds, random_state)
+    
+    if search == 'halving':
+        searcher = HalvingRandomSearchCV(
+            estimator, PARAM_DISTRIBUTIONS[model_type], n_candidates=n_iter, cv=folds,
+            scoring='roc_auc', n_jobs=n_jobs, random_state=random_state, refit=False
+        )
+    else:
+        searcher = RandomizedSearchCV(
+            estimator, PARAM_DISTRIBUTIONS[model_type], n_iter=n_iter, cv=folds,
+            scoring='roc_auc', n_jobs=n_jobs, random_state=random_state, refit=False
+        )
+    searcher.fit(X_search, y_search)
+    best_params = searcher.best_params_
+    
+    # Out-of-fold metrics of the best configuration on the search rows
+    best_estimator = estimator.set_params(**best_params)
+    metrics = _out_of_fold_metrics(X_search, y_search, best_estimator, folds, n_jobs)
+    
+    # Refit on all rows with every core; the early-stopped booster is stored unwrapped
+    model = best_estimator.set_params(n_jobs=n_jobs).fit(X, y)
+    if isinstance(model, EarlyStoppingXGBClassifier):
+        metrics['best_iteration'] = int(model.best_iteration_)
+        model = model.model_
+    store_feature_means(model, X)
+    
+    metrics.update({
+        "best_params": best_params,
+        "search": search,
+        "cv_folds": cv,
+        "n_candidates": n_iter,
+        "tuning_rows": len(y_search)
+    })
+    
+    return {
+        'model_type': model_type,
+        'model': model,
+        'best_params': best_params,
+        'metrics': metrics,
+        'tuning_seconds': time.perf_counter() - start
+    }
+
+def save_tuned_model(result, name, preprocessor, feature_names, training_data_size=None):
+    """
+    Save the best configuration found by tune_model to trained_models.
+    
+    Args:
+        result: Dictionary returned by tune_model
+        name: Model name
+        preprocessor: Fitted preprocessor the features were produced with
+        feature_names: List of feature names
+        training_data_size: Size of the training dataset
+    
+    Returns:
+        ID of the saved model
+    """
+    metrics = result['metrics']
+    notes = (f"Tuned with {metrics['search']} search: {metrics['n_candidates']} candidates, "
+             f"{metrics['cv_folds']}-fold CV on {metrics['tuning_rows']} rows "
+             f"(AUC {metrics['cv_auc_mean']:.3f} ± {metrics['cv_auc_std']:.3f})")
+    
+    return save_trained_model(name, result['model_type'], result['model'], preprocessor,
+                              feature_names, metrics, training_data_size, notes)
@@ -26,23 +26,6 @@ def calculate_years_at_company(hire_date):
         # Return NaN if calculation fails
         return np.nan
 
-def assign_risk_category(probability):
-    """
-    Assign risk category based on turnover probability.
-    
-    Args:
-        probability: Turnover probability
-    
-    Returns:
-        Risk category as string
-    """
-    if probability >= 0.6:
-        return 'High'
-    elif probability >= 0.3:
-        return 'Medium'
-    else:
-        return 'Low'
-
 def calculate_department_metrics(dept_data):
     """
     Calculate department-level metrics.
@@ -1,35 +1,332 @@
+import os
+
 import pandas as pd
 import numpy as np
+from pandas.api.types import union_categoricals
+import scipy.sparse as sp
 from datetime import datetime
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.impute import SimpleImputer
 
-def load_data(file):
+# Rows read per chunk when streaming CSV files
+DEFAULT_CHUNKSIZE = 100_000
+
+# Storage types for the known HR columns. Low-cardinality text columns are
+# held as categories and scores as float32 (which, unlike small integer
+# types, can still hold missing values). Employee_ID and Resigned are left
+# to inference because their formats differ between exports.
+HR_COLUMN_DTYPES = {
+    'Department': 'category',
+    'Job_Title': 'category',
+    'Gender': 'category',
+    'Education_Level': 'category',
+    'Age': 'float32',
+    'Years_At_Company': 'float32',
+    'Performance_Score': 'float32',
+    'Monthly_Salary': 'float32',
+    'Work_Hours_Per_Week': 'float32',
+    'Projects_Handled': 'float32',
+    'Overtime_Hours': 'float32',
+    'Sick_Days': 'float32',
+    'Remote_Work_Frequency': 'float32',
+    'Team_Size': 'float32',
+    'Training_Hours': 'float32',
+    'Promotions': 'float32',
+    'Employee_Satisfaction_Score': 'float32'
+}
+
+class MissingColumnsError(ValueError):
+    """
+    Raised when an uploaded file lacks required columns.
+    """
+    
+    def __init__(self, missing_columns):
+        """
+        Initialize the error
+        
+        Args:
+            missing_columns (list): Required columns not found in the file
+        """
+        super().__init__(f"Missing required columns: {', '.join(missing_columns)}")
+        self.missing_columns = missing_columns
+
+def _validate_columns(columns, required_columns):
+    """
+    Raise a MissingColumnsError if any required column is missing
+    
+    Args:
+        columns: Columns present in the data
+        required_columns: Columns the caller needs (or None)
+    """
+    if not required_columns:
+        return
+    
+    missing_columns = [col for col in required_columns if col not in columns]
+    if missing_columns:
+        raise MissingColumnsError(missing_columns)
+
+def _file_size(file):
+    """
+    Get the size of a file for progress reporting
+    
+    Args:
+        file: A path or file object
+        
+    Returns:
+        int: Size in bytes, or None if it cannot be determined
+    """
+    if isinstance(file, (str, os.PathLike)):
+        return os.path.getsize(file)
+    
+    size = getattr(file, 'size', None)
+    if size is None and hasattr(file, 'seek'):
+        position = file.tell()
+        size = file.seek(0, os.SEEK_END)
+        file.seek(position)
+    
+    return size or None
+
+def concat_chunks(chunks):
+    """
+    Concatenate chunks into one frame, keeping categorical columns categorical
+    
+    Each chunk only knows the categories it has seen, so the categories are
+    unified first; otherwise concat would fall back to object columns.
+    
+    Args:
+        chunks: List of DataFrames with the same columns
+        
+    Returns:
+        pd.DataFrame: The combined dataframe
+    """
+    if len(chunks) == 1:
+        return chunks[0]
+    
+    for col in chunks[0].columns:
+        if isinstance(chunks[0][col].dtype, pd.CategoricalDtype):
+            categories = union_categoricals([chunk[col] for chunk in chunks]).categories
+            for chunk in chunks:
+                chunk[col] = chunk[col].cat.set_categories(categories)
+    
+    return pd.concat(chunks, ignore_index=True)
+
+def apply_column_dtypes(df, dtypes=None):
+    """
+    Convert the known HR columns of a dataframe to their storage types
+    
+    Args:
+        df (pd.DataFrame): The input dataframe
+        dtypes (dict): Column to dtype mapping (defaults to HR_COLUMN_DTYPES)
+        
+    Returns:
+        pd.DataFrame: The dataframe with converted columns
+    """
+    dtypes = HR_COLUMN_DTYPES if dtypes is None else dtypes
+    present = {col: dtype for col, dtype in dtypes.items() if col in df.columns}
+    
+    return df.astype(present) if present else df
+
+def load_data(file, chunksize=DEFAULT_CHUNKSIZE, required_columns=None, progress_callback=None, dtypes=None):
     """
     Load data from a CSV or Excel file
     
+    CSV files are streamed in chunks and parsed straight into the column
+    storage types, so the whole file is never held as object columns.
+    Required columns are checked on the first chunk, before the rest of
+    the file is read.
+    
     Args:
-        file: The uploaded file object
+        file: The uploaded file object or a path
+        chunksize (int): Rows read per chunk for CSV files
+        required_columns (list): Columns that must be present
+        progress_callback: Called as progress_callback(rows_loaded, fraction)
+            after each chunk; fraction is None when the size is unknown
+        dtypes (dict): Column to dtype mapping (defaults to HR_COLUMN_DTYPES)
         
     Returns:
         pd.DataFrame: The loaded dataframe
     """
-    if file.name.endswith('.csv'):
-        return pd.read_csv(file)
-    elif file.name.endswith(('.xls', '.xlsx')):
-        return pd.read_excel(file)
+    dtypes = HR_COLUMN_DTYPES if dtypes is None else dtypes
+    name = str(getattr(file, 'name', file))
+    
+    if name.endswith('.csv'):
+        total_bytes = _file_size(file)
+        handle = open(file, 'rb') if isinstance(file, (str, os.PathLike)) else file
+        chunks = []
+        rows_loaded = 0
+        
+        try:
+            with pd.read_csv(handle, dtype=dtypes, chunksize=chunksize) as reader:
+                for chunk in reader:
+                    if not chunks:
+                        _validate_columns(chunk.columns, required_columns)
+                    chunks.append(chunk)
+                    rows_loaded += len(chunk)
+                    
+                    if progress_callback is not None:
+                        fraction = min(handle.tell() / total_bytes, 1.0) if total_bytes else None
+                        progress_callback(rows_loaded, fraction)
+        finally:
+            if handle is not file:
+                handle.close()
+        
+        return concat_chunks(chunks)
+    elif name.endswith(('.xls', '.xlsx')):
+        # Excel readers cannot stream, so the schema is applied after reading
+        df = apply_column_dtypes(pd.read_excel(file), dtypes)
+        _validate_columns(df.columns, required_columns)
+        
+        if progress_callback is not None:
+            progress_callback(len(df), 1.0)
+        
+        return df
     else:
         raise ValueError("Unsupported file format. Please upload a CSV or Excel file.")
 
-def preprocess_data(df, target_column='Resigned'):
+# pandas 3 never copies when concatenating (Copy-on-Write) and deprecates the keyword
+_CONCAT_NO_COPY = {} if int(pd.__version__.split('.')[0]) >= 3 else {'copy': False}
+
+def append_columns(data, columns):
+    """
+    Append new columns to a dataframe without copying the existing ones
+    
+    Args:
+        data (pd.DataFrame): The dataframe to extend
+        columns: Dictionary of arrays aligned with the rows, or a dataframe
+            with the same index
+        
+    Returns:
+        pd.DataFrame: A new dataframe sharing the original columns' data
+    """
+    # Columns being recomputed (e.g. when rescoring predictions) are replaced
+    existing = [col for col in columns if col in data.columns]
+    if existing:
+        data = data.drop(columns=existing)
+    
+    new_columns = columns if isinstance(columns, pd.DataFrame) else pd.DataFrame(columns, index=data.index)
+    
+    return pd.concat([data, new_columns], axis=1, **_CONCAT_NO_COPY)
+
+def frame_memory_mb(df):
+    """
+    Calculate the memory held by a dataframe, including string contents
+    
+    Args:
+        df (pd.DataFrame): The dataframe
+        
+    Returns:
+        float: Memory usage in megabytes
+    """
+    return df.memory_usage(deep=True).sum() / 2**20
+
+def optimize_dtypes(df, max_category_ratio=0.5):
+    """
+    Convert a dataframe to compact storage types
+    
+    Text columns with few distinct values become categories and numeric
+    columns are downcast to the smallest type that holds their values.
+    Text columns that are mostly unique (names, IDs) are left as they are.
+    
+    Args:
+        df (pd.DataFrame): The input dataframe
+        max_category_ratio (float): Largest ratio of distinct values to rows
+            for a text column to become a category
+        
+    Returns:
+        pd.DataFrame: The dataframe with compact column types
+    """
+    conversions = {}
+    
+    for col in df.columns:
+        column = df[col]
+        if isinstance(column.dtype, pd.CategoricalDtype) or pd.api.types.is_bool_dtype(column):
+            continue
+        
+        if pd.api.types.is_integer_dtype(column):
+            conversions[col] = pd.to_numeric(column, downcast='integer')
+        elif pd.api.types.is_float_dtype(column):
+            conversions[col] = pd.to_numeric(column, downcast='float')
+        elif pd.api.types.is_object_dtype(column) or pd.api.types.is_string_dtype(column):
+            if len(column) and column.nunique() <= max_category_ratio * len(column):
+                conversions[col] = column.astype('category')
+    
+    # Only columns whose type actually changed are replaced
+    conversions = {col: values for col, values in conversions.items() if values.dtype != df[col].dtype}
+    
+    return df.assign(**conversions) if conversions else df
+
+def thin_predictions(predictions, data, key_column='Employee_ID'):
+    """
+    Reduce a predictions frame to the key column and the columns not in the data
+    
+    The result is joined back to the data with join_predictions, so the
+    original columns are not held twice.
+    
+    Args:
+        predictions (pd.DataFrame): Predictions with the original data columns
+        data (pd.DataFrame): The data the predictions were made on
+        key_column (str): Column identifying each employee
+        
+    Returns:
+        pd.DataFrame: The thin predictions (or the input if the rows do not
+            line up with the data)
+    """
+    if data is None or len(predictions) != len(data) or not predictions.index.equals(data.index):
+        return predictions
+    
+    new_columns = [col for col in predictions.columns if col not in data.columns]
+    keep = ([key_column] if key_column in predictions.columns else []) + new_columns
+    
+    return predictions[keep]
+
+def join_predictions(data, predictions, key_column='Employee_ID'):
+    """
+    Join thin predictions back to the data they were made on
+    
+    Rows that line up with the data are joined by position without copying
+    either frame; otherwise they are matched on the key column.
+    
+    Args:
+        data (pd.DataFrame): The data the predictions were made on
+        predictions (pd.DataFrame): Thin or full predictions
+        key_column (str): Column identifying each employee
+        
+    Returns:
+        pd.DataFrame: Predictions with the original data columns
+    """
+    if data is None or predictions is None:
+        return predictions
+    
+    if all(col in predictions.columns for col in data.columns):
+        # Already a full frame
+        return predictions
+    
+    has_key = key_column in predictions.columns and key_column in data.columns
+    new_columns = predictions[[col for col in predictions.columns if col not in data.columns]]
+    
+    aligned = len(data) == len(predictions) and data.index.equals(predictions.index)
+    if aligned and has_key:
+        aligned = np.array_equal(data[key_column].to_numpy(), predictions[key_column].to_numpy())
+    
+    if aligned:
+        return append_columns(data, new_columns)
+    if has_key:
+        return data.merge(predictions[[key_column] + list(new_columns.columns)], on=key_column, how='inner')
+    
+    return predictions
+
+def preprocess_data(df, target_column='Resigned', sparse=False, sparse_threshold=0.3):
     """
     Preprocess the data for model training
     
     Args:
         df (pd.DataFrame): The input dataframe
         target_column (str): The name of the target column
+        sparse: False for a dense feature matrix, True for CSR, or 'auto'
+            for CSR only when the density is below sparse_threshold
+        sparse_threshold (float): Density below which 'auto' produces CSR
         
     Returns:
         tuple: (X, y, preprocessor, feature_names)
@@ -38,6 +335,9 @@ def preprocess_data(df, target_column='Resigned'):
             - preprocessor: The preprocessing pipeline
             - feature_names: List of feature names after preprocessing
     """
+    if sparse not in (False, True, 'auto'):
+        raise ValueError(f"Unsupported sparse mode: {sparse}")
+    
     # Make a copy to avoid modifying the original
     data = df.copy()
     
@@ -73,8 +373,8 @@ def preprocess_data(df, target_column='Resigned'):
                 pass
     
     # Identify column types
-    numerical_columns = data.select_dtypes(include=['int64', 'float64']).columns.tolist()
-    categorical_columns = data.select_dtypes(include=['object', 'category']).columns.tolist()
+    numerical_columns = data.select_dtypes(include='number').columns.tolist()
+    categorical_columns = data.select_dtypes(include=['object', 'category', 'string']).columns.tolist()
     
     # Create preprocessing pipeline
     numerical_transformer = Pipeline(steps=[
@@ -84,7 +384,7 @@ def preprocess_data(df, target_column='Resigned'):
     
     categorical_transformer = Pipeline(steps=[
         ('imputer', SimpleImputer(strategy='most_frequent')),
-        ('onehot', OneHotEncoder(handle_unknown='ignore', sparse_output=False))
+        ('onehot', OneHotEncoder(handle_unknown='ignore', sparse_output=bool(sparse)))
     ])
     
     preprocessor = ColumnTransformer(
@@ -92,11 +392,14 @@ def preprocess_data(df, target_column='Resigned'):
             ('num', numerical_transformer, numerical_columns),
             ('cat', categorical_transformer, categorical_columns)
         ],
-        remainder='drop'  # Drop columns that are not specified
+        remainder='drop',  # Drop columns that are not specified
+        sparse_threshold=sparse_threshold if sparse == 'auto' else 1.0
     )
     
     # Fit and transform the data
     X = preprocessor.fit_transform(data)
+    if sparse is True and not sp.issparse(X):
+        X = sp.csr_matrix(X)
     
     # Get feature names
     onehot_columns = []
@@ -131,7 +434,7 @@ def calculate_data_statistics(df):
     stats['missing_percentage'] = (df.isna().sum().sum() / (df.shape[0] * df.shape[1])) * 100
     
     # Column types
-    stats['numerical_columns'] = df.select_dtypes(include=['int64', 'float64']).columns.tolist()
+    stats['numerical_columns'] = df.select_dtypes(include='number').columns.tolist()
     stats['categorical_columns'] = df.select_dtypes(include=['object', 'category']).columns.tolist()
     stats['datetime_columns'] = df.select_dtypes(include=['datetime64']).columns.tolist()
     
@@ -157,7 +460,7 @@ def identify_outliers(df, columns=None):
         dict: Dictionary mapping column names to outlier indices
     """
     if columns is None:
-        columns = df.select_dtypes(include=['int64', 'float64']).columns
+        columns = df.select_dtypes(include='number').columns
     
     outliers = {}
     
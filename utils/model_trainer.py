@@ -7,6 +7,7 @@ from xgboost import XGBClassifier
 from sklearn.linear_model import LogisticRegression
 # Removed SHAP dependency due to compatibility issues
 # import shap
+from explanations import feature_contributions, contribution_units, store_feature_means
 import pickle
 import os
 
@@ -42,6 +43,7 @@ def train_model(X, y, model_type='xgboost', test_size=0.2, random_state=42, **mo
     
     # Train model
     model.fit(X_train, y_train)
+    store_feature_means(model, X_train)
     
     return model, X_train, X_test, y_train, y_test
 
@@ -112,52 +114,31 @@ def get_feature_importance(model, X, feature_names):
 
 def get_shap_values(model, X, feature_names):
     """
-    Alternative to SHAP values using feature importance
+    SHAP values for a sample of rows
     
     Args:
         model: The trained model
-        X: Feature matrix for which to compute importance values
+        X: Feature matrix for which to compute SHAP values
         feature_names: List of feature names
         
     Returns:
-        tuple: (importance_values, feature_names)
-            - importance_values: Feature importance values for each sample
-            - feature_names: List of feature names
+        tuple: (shap_values, explainer)
+            - shap_values: Contributions of each feature for each sampled row
+            - explainer: Dictionary with the feature names, the method used
+              and the expected value the contributions add up from
     """
-    # Get feature importance
-    importance_df = get_feature_importance(model, X, feature_names)
-    
-    # Create a simplified "SHAP-like" value for each sample
-    # This is a basic approximation - not real SHAP values
     sample_size = min(1000, X.shape[0])
     sample_indices = np.random.choice(X.shape[0], sample_size, replace=False)
-    sample_data = X[sample_indices]
+    sample_data = X.iloc[sample_indices] if hasattr(X, 'iloc') else X[sample_indices]
     
-    # Store feature names and their importance values
-    feature_names_ordered = importance_df['feature'].values
-    importance_values = importance_df['importance'].values
+    # Exact attributions: TreeSHAP for tree models, linear contributions otherwise
+    shap_values, expected_value = feature_contributions(model, sample_data)
     
     # Create an explainer-like object (just a dictionary for compatibility)
-    explainer = {"features": feature_names_ordered, "method": "feature_importance"}
-    
-    # Expand importance values for each sample (simplified approach)
-    # This creates array of shape (n_samples, n_features) like SHAP would
-    sample_importance = np.tile(importance_values, (sample_size, 1))
-    
-    # Scale by the feature values to approximate directional impact
-    for i, feat in enumerate(feature_names_ordered):
-        if i < sample_data.shape[1]:  # Safety check
-            # Scale importance by normalized feature value
-            feat_idx = list(feature_names).index(feat) if feat in feature_names else i
-            if feat_idx < sample_data.shape[1]:
-                feat_values = sample_data[:, feat_idx]
-                # Normalize to [-1, 1] range to mimic SHAP's directional effect
-                if np.std(feat_values) > 0:
-                    norm_values = (feat_values - np.mean(feat_values)) / np.std(feat_values)
-                    # Apply sign to the importance based on feature value
-                    sample_importance[:, i] = sample_importance[:, i] * np.sign(norm_values)
-    
-    return sample_importance, explainer
+    explainer = {"features": np.asarray(feature_names), "method": "shap",
+                 "units": contribution_units(model), "expected_value": expected_value}
+    
+    return shap_values, explainer
 
 def save_model(model, filepath='model.pkl'):
     """
@@ -5,47 +5,161 @@ from datetime import datetime
 import pandas as pd
 import numpy as np
 
-def calculate_years_at_company(hire_date):
+def compute_years_at_company(hire_dates, as_of_date=None):
+    """
+    Calculate years at company for a whole column of hire dates.
+    
+    Dates are parsed in one pass and compared against a single reference
+    date, so every employee is measured against the same day.
+    
+    Args:
+        hire_dates: Series (or array-like) of hire dates as strings or datetimes
+        as_of_date: Reference date; pin it for reproducible scoring
+            (defaults to the current date and time)
+    
+    Returns:
+        Series of years at company as floats rounded to one decimal
+        (NaN where the hire date cannot be parsed)
+    """
+    hire_dates = pd.Series(hire_dates)
+    if isinstance(hire_dates.dtype, pd.CategoricalDtype):
+        # Parse each distinct date once and expand through the category codes
+        parsed = pd.to_datetime(pd.Series(hire_dates.cat.categories), errors='coerce').to_numpy()
+        codes = hire_dates.cat.codes.to_numpy()
+        if len(parsed) == 0:
+            # No categories: every value is missing
+            dates = pd.Series(np.datetime64('NaT', 'ns'), index=hire_dates.index)
+        else:
+            dates = pd.Series(np.where(codes >= 0, parsed[codes], np.datetime64('NaT')), index=hire_dates.index)
+    else:
+        dates = pd.to_datetime(hire_dates, errors='coerce')
+    reference = pd.Timestamp(as_of_date) if as_of_date is not None else pd.Timestamp(datetime.now())
+    
+    years = (reference - dates).dt.days / 365.25
+    
+    return years.round(1)
+
+def calculate_years_at_company(hire_date, as_of_date=None):
     """
     Calculate years at company based on hire date.
     
     Args:
         hire_date: Hire date string
+        as_of_date: Reference date (defaults to the current date and time)
     
     Returns:
         Years at company as float
     """
-    try:
-        # Convert string to datetime
-        if isinstance(hire_date, str):
-            hire_date = pd.to_datetime(hire_date)
-        
-        # Calculate years at company
-        today = datetime.now()
-        years = (today - hire_date).days / 365.25
-        
-        return round(years, 1)
-    except:
-        # Return NaN if calculation fails
-        return np.nan
+    return float(compute_years_at_company([hire_date], as_of_date).iloc[0])
+
+# Risk levels ordered by increasing turnover probability, and the lower
+# probability bound of each level above 'Low'
+RISK_LEVELS = ['Low', 'Medium', 'High']
+RISK_THRESHOLDS = {'Medium': 0.3, 'High': 0.6}
 
 def assign_risk_category(probability):
     """
     Assign risk category based on turnover probability.
     
+    Uses the same thresholds as assign_risk_categories.
+    
     Args:
         probability: Turnover probability
     
     Returns:
         Risk category as string
     """
-    if probability >= 0.6:
+    if probability >= RISK_THRESHOLDS['High']:
         return 'High'
-    elif probability >= 0.3:
+    elif probability >= RISK_THRESHOLDS['Medium']:
         return 'Medium'
     else:
         return 'Low'
 
+def assign_risk_categories(probabilities):
+    """
+    Vectorized version of assign_risk_category for a whole column.
+    
+    Args:
+        probabilities: Series or array of turnover probabilities
+    
+    Returns:
+        Categorical Series (or pd.Categorical for array input) with the
+        categories 'Low', 'Medium' and 'High'
+    """
+    values = np.asarray(probabilities, dtype=float)
+    
+    codes = np.select(
+        [values >= RISK_THRESHOLDS['High'], values >= RISK_THRESHOLDS['Medium']],
+        [2, 1],
+        default=0
+    ).astype(np.int8)
+    categories = pd.Categorical.from_codes(codes, categories=RISK_LEVELS)
+    
+    if isinstance(probabilities, pd.Series):
+        return pd.Series(categories, index=probabilities.index, name='Risk_Category')
+    return categories
+
+def _grouped_mean(codes, values, n_groups):
+    """
+    Mean of values per group code, ignoring missing values.
+    """
+    values = np.asarray(values, dtype=float)
+    present = ~np.isnan(values)
+    sums = np.bincount(codes[present], weights=values[present], minlength=n_groups)
+    counts = np.bincount(codes[present], minlength=n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+def calculate_department_metrics_table(predictions, department_column='Department'):
+    """
+    Calculate metrics for all departments in a single pass.
+    
+    Equivalent to calling calculate_department_metrics for every department,
+    but the department column is factorized once and every metric is computed
+    with one grouped reduction instead of re-filtering the frame per department.
+    
+    Args:
+        predictions: DataFrame with predictions
+        department_column: Name of the department column
+    
+    Returns:
+        DataFrame with one row per department (in order of first appearance)
+        and the columns of calculate_department_metrics, plus avg_performance,
+        avg_salary and avg_work_hours when the source columns are available
+    """
+    codes, departments = pd.factorize(predictions[department_column])
+    
+    # Rows without a department are left out, as in groupby
+    valid = codes >= 0
+    codes = codes[valid]
+    n_groups = len(departments)
+    
+    totals = np.bincount(codes, minlength=n_groups)
+    high_risk = (predictions['Risk_Category'] == 'High').to_numpy()[valid]
+    high_risk_counts = np.bincount(codes, weights=high_risk, minlength=n_groups).astype(int)
+    
+    table = pd.DataFrame({
+        department_column: departments,
+        'total_employees': totals,
+        'high_risk_count': high_risk_counts,
+        'avg_probability': _grouped_mean(codes, predictions['Turnover_Probability'].to_numpy()[valid], n_groups)
+    })
+    
+    optional_means = {
+        'avg_years': 'Years_At_Company',
+        'avg_performance': 'Performance_Score',
+        'avg_salary': 'Monthly_Salary',
+        'avg_work_hours': 'Work_Hours_Per_Week'
+    }
+    for metric, column in optional_means.items():
+        if column in predictions.columns:
+            table[metric] = _grouped_mean(codes, predictions[column].to_numpy()[valid], n_groups)
+    
+    table['high_risk_percentage'] = table['high_risk_count'] / table['total_employees']
+    
+    return table
+
 def calculate_department_metrics(dept_data):
     """
     Calculate department-level metrics.
@@ -108,7 +108,7 @@ def plot_risk_by_category(df, category_column, risk_column, t=None):
         t = lambda x: x
     
     # Group by category and calculate metrics
-    category_stats = df.groupby(category_column).agg({
+    category_stats = df.groupby(category_column, observed=True).agg({
         risk_column: ['mean', 'count']
     }).reset_index()
     
@@ -116,7 +116,7 @@ def plot_risk_by_category(df, category_column, risk_column, t=None):
     category_stats = category_stats.sort_values('avg_risk', ascending=False)
     
     # Calculate high risk percentage
-    category_stats['high_risk_count'] = df[df[risk_column] >= 0.7].groupby(category_column).size().reindex(category_stats[category_column]).fillna(0)
+    category_stats['high_risk_count'] = df[df[risk_column] >= 0.7].groupby(category_column, observed=True).size().reindex(category_stats[category_column]).fillna(0)
     category_stats['high_risk_pct'] = (category_stats['high_risk_count'] / category_stats['count'] * 100).round(1)
     
     # Create plot
@@ -155,7 +155,7 @@ def plot_correlation_heatmap(df, columns=None):
     """
     if columns is None:
         # Select numerical columns
-        numerical_cols = df.select_dtypes(include=['int64', 'float64']).columns
+        numerical_cols = df.select_dtypes(include='number').columns
         
         # Limit to 15 columns to avoid too large heatmaps
         if len(numerical_cols) > 15:
@@ -337,7 +337,7 @@ def create_department_dashboard(df, risk_column, t=None):
     fig1 = plot_risk_by_category(df, 'Department', risk_column, t)
     
     # 2. Risk distribution by department
-    dept_counts = df.groupby(['Department', 'Risk_Level']).size().unstack(fill_value=0)
+    dept_counts = df.groupby(['Department', 'Risk_Level'], observed=True).size().unstack(fill_value=0)
     if 'High' not in dept_counts.columns:
         dept_counts['High'] = 0
     if 'Medium' not in dept_counts.columns:
@@ -355,7 +355,7 @@ def create_department_dashboard(df, risk_column, t=None):
     )
     
     # 3. Department size comparison
-    dept_size = df.groupby('Department').size().reset_index(name='count')
+    dept_size = df.groupby('Department', observed=True).size().reset_index(name='count')
     fig3 = px.pie(
         dept_size, 
         values='count', 
@@ -1,9 +1,10 @@
 import matplotlib.pyplot as plt
 import plotly.express as px
 import plotly.graph_objects as go
-import numpy as np
-import pandas as pd
 from sklearn.pipeline import Pipeline
+from aggregates import department_summary
+from explanations import top_contributions
+from models import explain_turnover
 
 def plot_feature_importance(feature_importance_df, x_label, y_label, top_n=15):
     """
@@ -55,8 +56,8 @@ def plot_department_turnover(predictions, translation_func):
     Returns:
         Plotly figure
     """
-    # Group by department
-    dept_risk = predictions.groupby('Department')['Turnover_Probability'].agg(['mean', 'count']).reset_index()
+    # Department rollup from the shared aggregate cache
+    dept_risk = department_summary(predictions)[['Department', 'avg_probability', 'total_employees']]
     dept_risk.columns = ['Department', 'Average_Risk', 'Employee_Count']
     dept_risk = dept_risk.sort_values('Average_Risk', ascending=False)
     
@@ -194,9 +195,10 @@ def plot_employee_analysis(values, metrics, translation_func):
     
     return fig
 
-def plot_shap_values(model, preprocessor, employee_data, feature_names, model_type, translation_func):
+def plot_shap_values(model, preprocessor, employee_data, feature_names, model_type, translation_func,
+                     contributions=None):
     """
-    Create feature importance visualization for an employee.
+    Create feature contribution (SHAP) visualization for an employee.
     
     Args:
         model: Trained model
@@ -205,39 +207,33 @@ def plot_shap_values(model, preprocessor, employee_data, feature_names, model_ty
         feature_names: Feature names
         model_type: Type of model
         translation_func: Function for text translation
+        contributions: The employee's precomputed contributions (from
+            explain_turnover); computed from employee_data when omitted,
+            raising if the row cannot be explained
     
     Returns:
         Matplotlib figure
     """
-    # Transform employee data
-    X_emp = preprocessor.transform(employee_data.drop('Resigned', axis=1) if 'Resigned' in employee_data.columns else employee_data)
-    
-    # Get feature importance from the model
-    if hasattr(model, 'feature_importances_'):
-        # For tree-based models
-        importances = model.feature_importances_
-    elif hasattr(model, 'coef_'):
-        # For linear models
-        importances = np.abs(model.coef_[0])
-    else:
-        # Fallback - equal importance
-        importances = np.ones(len(feature_names))
-    
-    # Predict probability for this employee
-    pred_proba = model.predict_proba(X_emp)[0, 1] if hasattr(model, 'predict_proba') else model.predict(X_emp)[0]
-    
-    # Scale the importances by the prediction probability to show impact on this prediction
-    scaled_importances = importances * pred_proba
-    
-    # Create a DataFrame with feature names and importance values
-    imp_df = pd.DataFrame({
-        'Feature': feature_names,
-        'Importance': scaled_importances
-    })
-    
-    # Sort by absolute importance
-    imp_df['Abs_Importance'] = np.abs(imp_df['Importance'])
-    imp_df = imp_df.sort_values('Abs_Importance', ascending=False).head(10)
+    if contributions is None:
+        # Explain this single row with the same derived features as scoring
+        contributions = explain_turnover(employee_data, model, preprocessor)[0][0]
+    
+    # Keep the largest contributions by magnitude
+    return plot_contributions(top_contributions(contributions, feature_names, k=10), translation_func)
+
+def plot_contributions(contributions_df, translation_func):
+    """
+    Plot an employee's largest feature contributions.
+    
+    Args:
+        contributions_df: DataFrame with Feature and Contribution columns
+            (e.g. from ExplanationIndex.top_contributions)
+        translation_func: Function for text translation
+    
+    Returns:
+        Matplotlib figure
+    """
+    imp_df = contributions_df.rename(columns={'Contribution': 'Importance'})
     
     # Create figure and axis
     fig, ax = plt.subplots(figsize=(8, 6))